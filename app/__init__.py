@@ -1,25 +1,31 @@
+import time
+_IMPORT_STARTED = time.perf_counter()
+
 import os
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from dotenv import load_dotenv
-from authlib.integrations.flask_client import OAuth
+
+# Authlib (Google Login) dan Flask-Migrate/Alembic (`flask db`) baru diimport
+# saat dipakai, lihat app/google_auth.py dan app/startup.py
+_IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
 
 # ====================================
 # GLOBAL EXTENSIONS
 # ====================================
 db = SQLAlchemy()
-migrate = Migrate()
-oauth = OAuth()  # untuk Google Login
 
 # ====================================
 # APP FACTORY
 # ====================================
-def create_app():
-    load_dotenv()  # load .env
+def create_app(config=None):
+    """config: dict opsional untuk menimpa config bawaan (dipakai benchmark/CLI)."""
+    from app.startup import StartupTimer
+    timer = StartupTimer(imports=_IMPORT_SECONDS)
 
     BASE_DIR = os.path.abspath(os.path.dirname(__file__))        # /app
     ROOT_DIR = os.path.abspath(os.path.join(BASE_DIR, ".."))     # root project
+    load_dotenv(os.path.join(ROOT_DIR, ".env"))  # path langsung, tanpa mencari ke atas
     TEMPLATE_DIR = os.path.join(ROOT_DIR, "templates")
     STATIC_DIR   = os.path.join(ROOT_DIR, "static")
 
@@ -35,7 +41,12 @@ def create_app():
     # ====================================
     # DATABASE CONFIG
     # ====================================
-    if os.getenv("FLY_APP_NAME"):     # Running on Fly.io
+    # DATABASE_URL (postgres://...) = PostgreSQL bersama untuk banyak mesin;
+    # tanpa itu SQLite di volume Fly / folder instance
+    if os.getenv("DATABASE_URL"):
+        from app.database import normalize_url
+        app.config['SQLALCHEMY_DATABASE_URI'] = normalize_url(os.getenv("DATABASE_URL"))
+    elif os.getenv("FLY_APP_NAME"):     # Running on Fly.io
         app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:////data/data.db'
     else:                              # Running locally
         local_db = os.path.join(ROOT_DIR, "instance", "data.db")
@@ -44,6 +55,14 @@ def create_app():
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['SECRET_KEY'] = os.getenv("SECRET_KEY", "supersecretkey")
 
+    # Pool koneksi PostgreSQL per proses (lihat app/database.py); diabaikan untuk SQLite.
+    # Default cukup untuk gunicorn 4 thread + thread job per worker
+    app.config["DB_POOL_SIZE"] = int(os.getenv("DB_POOL_SIZE", 5))
+    app.config["DB_POOL_OVERFLOW"] = int(os.getenv("DB_POOL_OVERFLOW", 5))
+    app.config["DB_POOL_TIMEOUT"] = float(os.getenv("DB_POOL_TIMEOUT", 10))
+    app.config["DB_POOL_RECYCLE"] = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    app.config["DB_CONNECT_TIMEOUT"] = int(os.getenv("DB_CONNECT_TIMEOUT", 5))
+
     # ====================================
     # SESSION SETTINGS (Google OAuth WAJIB)
     # ====================================
@@ -60,28 +79,191 @@ def create_app():
     else:
         app.config["UPLOAD_FOLDER"] = os.path.join(ROOT_DIR, "static", "uploads")
 
+    # Body request di atas batas ini langsung ditolak (413) sebelum dibaca
+    app.config["MAX_CONTENT_LENGTH"] = int(os.getenv("MAX_UPLOAD_MB", 10)) * 1024 * 1024
+
+    # Opsional: biarkan proxy (nginx X-Accel-Redirect / X-Sendfile) yang kirim file foto
+    app.config["UPLOAD_ACCEL"] = os.getenv("UPLOAD_ACCEL")              # x-accel-redirect | x-sendfile
+    app.config["UPLOAD_ACCEL_PREFIX"] = os.getenv("UPLOAD_ACCEL_PREFIX", "/protected-uploads/")
+
+    # Turunan foto (thumbnail/medium) dibuat oleh job background (app/jobs.py)
+    app.config["IMAGE_FORMAT"] = os.getenv("IMAGE_FORMAT", "webp")      # webp | jpeg
+    app.config["IMAGE_QUALITY"] = int(os.getenv("IMAGE_QUALITY", 80))
+
+    # Sweeper file yatim di UPLOAD_FOLDER (detik; 0 = hanya lewat `flask uploads sweep`)
+    app.config["UPLOAD_SWEEP_INTERVAL"] = int(os.getenv("UPLOAD_SWEEP_INTERVAL", 6 * 3600))
+    app.config["UPLOAD_SWEEP_MIN_AGE"] = int(os.getenv("UPLOAD_SWEEP_MIN_AGE", 3600))
+    app.config["UPLOAD_SWEEP_BATCH"] = int(os.getenv("UPLOAD_SWEEP_BATCH", 200))
+    app.config["UPLOAD_SWEEP_PAUSE"] = float(os.getenv("UPLOAD_SWEEP_PAUSE", 1.0))
+
+    # ====================================
+    # PAGINATION
+    # ====================================
+    app.config["REPORTS_PER_PAGE"] = int(os.getenv("REPORTS_PER_PAGE", 24))
+    app.config["REPORTS_MAX_PER_PAGE"] = int(os.getenv("REPORTS_MAX_PER_PAGE", 100))
+    # API JSON di-stream, jadi halaman besar tetap hemat memori
+    app.config["API_MAX_PER_PAGE"] = int(os.getenv("API_MAX_PER_PAGE", 500))
+    # Daftar admin juga di-stream (app/streaming.py)
+    app.config["ADMIN_MAX_PER_PAGE"] = int(os.getenv("ADMIN_MAX_PER_PAGE", 1000))
+    app.config["STREAM_TEMPLATES"] = os.getenv("STREAM_TEMPLATES", "1") == "1"
+    app.config["STREAM_CHUNK_BYTES"] = int(os.getenv("STREAM_CHUNK_BYTES", 8 * 1024))
+
+    # ====================================
+    # PAGE CACHE (fragment daftar laporan di /)
+    # ====================================
+    # memory = per proses; sqlite = dibagi semua worker gunicorn di satu mesin
+    app.config["PAGE_CACHE_BACKEND"] = os.getenv("PAGE_CACHE_BACKEND", "memory")
+    app.config["PAGE_CACHE_PATH"] = os.getenv("PAGE_CACHE_PATH")
+    app.config["PAGE_CACHE_TTL"] = int(os.getenv("PAGE_CACHE_TTL", 60))
+    app.config["PAGE_CACHE_MAX_ENTRIES"] = int(os.getenv("PAGE_CACHE_MAX_ENTRIES", 512))
+    app.config["PAGE_CACHE_MAX_BYTES"] = int(os.getenv("PAGE_CACHE_MAX_MB", 16)) * 1024 * 1024
+
+    # ====================================
+    # LOST <-> FOUND MATCHING
+    # ====================================
+    app.config["MATCH_TOP_N"] = int(os.getenv("MATCH_TOP_N", 5))
+    app.config["MATCH_MIN_SCORE"] = float(os.getenv("MATCH_MIN_SCORE", 0.3))
+    app.config["MATCH_TIME_DECAY_DAYS"] = float(os.getenv("MATCH_TIME_DECAY_DAYS", 14))
+
+    # ====================================
+    # PENCARIAN TERSIMPAN (notifikasi laporan baru, app/alerts.py)
+    # ====================================
+    app.config["ALERTS_MAX_PER_USER"] = int(os.getenv("ALERTS_MAX_PER_USER", 10))
+    app.config["ALERTS_PROFILE_LIMIT"] = int(os.getenv("ALERTS_PROFILE_LIMIT", 30))
+
+    # ====================================
+    # SARAN PENCARIAN (typeahead, index di memori per worker)
+    # ====================================
+    app.config["SUGGEST_MAX_TERMS"] = int(os.getenv("SUGGEST_MAX_TERMS", 20000))
+    app.config["SUGGEST_LIMIT"] = int(os.getenv("SUGGEST_LIMIT", 8))
+    # Seberapa sering worker mengecek perubahan dari worker lain (data_version)
+    app.config["SUGGEST_REFRESH_SECONDS"] = int(os.getenv("SUGGEST_REFRESH_SECONDS", 30))
+
+    # ====================================
+    # BACKGROUND JOBS (antrean di database, app/jobs.py)
+    # ====================================
+    # Thread worker per proses web; 0 = job hanya dijalankan `flask jobs work`
+    app.config["JOBS_WORKERS"] = int(os.getenv("JOBS_WORKERS", 2))
+    app.config["JOBS_POLL_SECONDS"] = float(os.getenv("JOBS_POLL_SECONDS", 5))
+    # Job running lebih lama dari ini dianggap ditinggal worker-nya dan diulang
+    app.config["JOBS_LEASE_SECONDS"] = int(os.getenv("JOBS_LEASE_SECONDS", 300))
+    app.config["JOBS_MAX_ATTEMPTS"] = int(os.getenv("JOBS_MAX_ATTEMPTS", 5))
+    app.config["JOBS_BACKOFF_SECONDS"] = float(os.getenv("JOBS_BACKOFF_SECONDS", 10))
+    app.config["JOBS_BACKOFF_MAX_SECONDS"] = float(os.getenv("JOBS_BACKOFF_MAX_SECONDS", 3600))
+    app.config["JOBS_KEEP_DAYS"] = int(os.getenv("JOBS_KEEP_DAYS", 7))
+    app.config["JOBS_SHUTDOWN_SECONDS"] = float(os.getenv("JOBS_SHUTDOWN_SECONDS", 10))
+
+    # ====================================
+    # ARSIP (laporan selesai / lama dipindah ke report_archive, app/archive.py)
+    # ====================================
+    app.config["ARCHIVE_RESOLVED_DAYS"] = int(os.getenv("ARCHIVE_RESOLVED_DAYS", 90))
+    app.config["ARCHIVE_STALE_DAYS"] = int(os.getenv("ARCHIVE_STALE_DAYS", 365))
+    app.config["ARCHIVE_BATCH"] = int(os.getenv("ARCHIVE_BATCH", 500))
+    app.config["ARCHIVE_PAUSE"] = float(os.getenv("ARCHIVE_PAUSE", 0.5))
+    # Halaman SQLite (4 KB) yang dikembalikan ke disk per run; 0 = tanpa VACUUM
+    app.config["ARCHIVE_VACUUM_PAGES"] = int(os.getenv("ARCHIVE_VACUUM_PAGES", 2000))
+    # Dijalankan sebagai job berkala; 0 = hanya lewat `flask reports archive`
+    app.config["ARCHIVE_INTERVAL_HOURS"] = float(os.getenv("ARCHIVE_INTERVAL_HOURS", 24))
+
+    # ====================================
+    # METRICS
+    # ====================================
+    app.config["METRICS_ENABLED"] = os.getenv("METRICS_ENABLED", "1") == "1"
+    # 0 = log request lambat dimatikan
+    app.config["METRICS_SLOW_REQUEST_MS"] = int(os.getenv("METRICS_SLOW_REQUEST_MS", 0))
+    app.config["METRICS_N_PLUS_ONE"] = int(os.getenv("METRICS_N_PLUS_ONE", 10))
+    app.config["METRICS_TOKEN"] = os.getenv("METRICS_TOKEN")
+
+    # ====================================
+    # ADMISSION CONTROL (rate limit + batas konkurensi, app/ratelimit.py)
+    # ====================================
+    app.config["RATELIMIT_ENABLED"] = os.getenv("RATELIMIT_ENABLED", "1") == "1"
+    # Ubah/tambah aturan: "endpoint[:METHOD][?arg]=per_ip,per_user[,kelompok];..." ("off" = hapus)
+    app.config["RATELIMITS"] = os.getenv("RATELIMITS", "")
+    # Request mahal yang boleh jalan bersamaan per proses, lalu antre maksimal QUEUE_SECONDS
+    app.config["RATELIMIT_CONCURRENCY"] = os.getenv("RATELIMIT_CONCURRENCY", "search=2,upload=2")
+    app.config["RATELIMIT_QUEUE_SECONDS"] = float(os.getenv("RATELIMIT_QUEUE_SECONDS", 2))
+    # memory = per proses; sqlite = dibagi semua worker gunicorn di satu mesin
+    app.config["RATELIMIT_STORE"] = os.getenv("RATELIMIT_STORE", "memory")
+    app.config["RATELIMIT_STORE_PATH"] = os.getenv("RATELIMIT_STORE_PATH")
+    # IP asli klien dari header proxy (Fly mengisi Fly-Client-IP); kosong = remote_addr
+    app.config["RATELIMIT_IP_HEADER"] = os.getenv(
+        "RATELIMIT_IP_HEADER", "Fly-Client-IP" if os.getenv("FLY_APP_NAME") else "")
+
+    # ====================================
+    # PASSWORD HASHING
+    # ====================================
+    # Naikkan/turunkan biaya di sini; hash lama di-upgrade otomatis saat login
+    app.config["PASSWORD_METHOD"] = os.getenv("PASSWORD_METHOD", "scrypt:32768:8:1")
+    app.config["PASSWORD_SALT_LENGTH"] = int(os.getenv("PASSWORD_SALT_LENGTH", 16))
+    # 0 = hashing langsung di thread request (dev)
+    app.config["PASSWORD_WORKERS"] = int(os.getenv("PASSWORD_WORKERS", 1))
+    app.config["PASSWORD_MAX_QUEUE"] = int(os.getenv("PASSWORD_MAX_QUEUE", 8))
+    app.config["PASSWORD_TIMEOUT"] = float(os.getenv("PASSWORD_TIMEOUT", 10))
+
+    # ====================================
+    # GOOGLE AUTH & COLD START
+    # ====================================
+    app.config["GOOGLE_CLIENT_ID"] = os.getenv("GOOGLE_CLIENT_ID")
+    app.config["GOOGLE_CLIENT_SECRET"] = os.getenv("GOOGLE_CLIENT_SECRET")
+    # Dokumen discovery OpenID disimpan di volume supaya boot berikutnya tidak fetch ulang
+    app.config["GOOGLE_DISCOVERY_CACHE"] = os.getenv(
+        "GOOGLE_DISCOVERY_CACHE", os.path.join(app.instance_path, "google-openid-configuration.json"))
+    app.config["GOOGLE_DISCOVERY_TTL"] = int(os.getenv("GOOGLE_DISCOVERY_TTL", 24 * 3600))
+    # Bytecode template Jinja (diisi saat build: flask templates compile); kosong = mati
+    app.config["JINJA_CACHE_DIR"] = os.getenv("JINJA_CACHE_DIR", os.path.join(app.instance_path, "jinja_cache"))
+    app.config["WARMUP_MAX_BYTES"] = int(os.getenv("WARMUP_MAX_MB", 32)) * 1024 * 1024
+
+    if config:
+        app.config.update(config)
+
     os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
+    timer.mark("config")
 
 
     # ====================================
     # INIT EXTENSIONS
     # ====================================
+    from app import database
+    if "SQLALCHEMY_ENGINE_OPTIONS" not in app.config:
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = database.engine_options(app.config)
     db.init_app(app)
-    migrate.init_app(app, db)
-    oauth.init_app(app)
 
-    # ====================================
-    # GOOGLE AUTH CONFIG
-    # ====================================
-    oauth.register(
-        name="google",
-        client_id=os.getenv("GOOGLE_CLIENT_ID"),
-        client_secret=os.getenv("GOOGLE_CLIENT_SECRET"),
-        server_metadata_url="https://accounts.google.com/.well-known/openid-configuration",
-        client_kwargs={
-            "scope": "openid email profile"
-        }
-)
+    database.init_app(app)    # PRAGMA SQLite (WAL, busy_timeout, dst.)
+
+    from app import metrics
+    metrics.init_app(app)     # paling awal: hook request-nya membungkus hook lain
+
+    from app import ratelimit
+    ratelimit.init_app(app)   # request yang ditolak (429/503) tidak menjalankan hook lain
+
+    from app import passwords
+    passwords.init_app(app)
+
+    from app import data_version
+    data_version.init_app(app)    # versi data untuk ETag/Last-Modified API
+
+    from app import stats
+    stats.init_app(app)           # counter laporan per user/global (report_stat)
+
+    from app import jobs
+    jobs.init_app(app)            # antrean job; handler didaftarkan modul di bawah
+
+    from app import matching, images, storage, assets, cache, audit, suggest, archive, dbcopy, transfer, alerts
+    matching.init_app(app)
+    alerts.init_app(app)          # notifikasi pencarian tersimpan
+    suggest.init_app(app)
+    cache.init_app(app)
+    audit.init_app(app)
+    images.init_app(app)
+    storage.init_app(app)
+    archive.init_app(app)         # juga grup CLI `flask reports` (impor/ekspor: app/transfer.py)
+    dbcopy.init_app(app)          # flask database copy (SQLite -> PostgreSQL)
+    assets.init_app(app)
+
+    from app import startup
+    startup.init_app(app, timer)
+    timer.mark("extensions")
 
 
     # ====================================
@@ -93,6 +275,7 @@ def create_app():
     from app.project.routes import project_bp
     from app.profiles.routes import profiles_bp
     from app.admin.routes import admin_bp
+    from app.api.routes import api_bp
 
     app.register_blueprint(main_bp)
     app.register_blueprint(auth_bp,      url_prefix="/auth")
@@ -100,5 +283,10 @@ def create_app():
     app.register_blueprint(project_bp,   url_prefix="/project")
     app.register_blueprint(profiles_bp,  url_prefix="/profile")
     app.register_blueprint(admin_bp,     url_prefix="/admin")
+    app.register_blueprint(api_bp,       url_prefix="/api/v1")
+    timer.mark("blueprints")
+
+    timer.export(app.extensions["metrics"])
+    app.logger.info("Startup: %s", timer.summary())
 
     return app
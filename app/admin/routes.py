@@ -1,6 +1,8 @@
-from flask import Blueprint, render_template, session, redirect, url_for, flash
-from app.models import db, Report
-from datetime import datetime
+from flask import Blueprint, Response, abort, request, session, redirect, url_for, flash, current_app
+from app.models import Report
+from app import metrics, moderation, streaming
+from app.pagination import get_per_page, keyset_stream
+import hmac
 
 admin_bp = Blueprint('admin_bp', __name__, template_folder='templates')
 
@@ -15,25 +17,86 @@ def admin_reports():
         flash("Akses ditolak! Kamu bukan admin.", "danger")
         return redirect(url_for('main_bp.index'))
 
-    reports = Report.query.order_by(Report.id.desc()).all()
-    return render_template('admin/reports.html', reports=reports)
+    # Halaman besar (?per_page=1000) tetap ringan: baris dibaca per batch saat dirender
+    per_page = get_per_page(current_app.config.get('ADMIN_MAX_PER_PAGE', 1000))
+    page = keyset_stream(Report.query, [Report.id], request.args.get('cursor'), per_page)
+    return streaming.render_page('admin/reports.html', reports=page, statuses=moderation.STATUSES,
+                                 report_types=moderation.REPORT_TYPES)
 
 # --- DELETE REPORT ---
-@admin_bp.route('/reports/delete/<int:report_id>')
+@admin_bp.route('/reports/delete/<int:report_id>', methods=['GET', 'POST'])
 def admin_delete_report(report_id):
     if not is_admin():
         flash("Akses ditolak!", "danger")
         return redirect(url_for('main_bp.index'))
 
-    report = Report.query.get(report_id)
-
-    if not report:
+    # Hard delete langsung (foto ikut dibuang kalau sudah tidak dipakai)
+    if not moderation.delete_reports(Report.id == report_id):
         flash("Report tidak ditemukan.", "warning")
         return redirect(url_for('admin_bp.admin_reports'))
 
-    # Hard delete langsung
-    db.session.delete(report)
-    db.session.commit()
-
     flash("Report berhasil dihapus.", "success")
     return redirect(url_for('admin_bp.admin_reports'))
+
+# --- BULK: LAPORAN TERPILIH ---
+@admin_bp.route('/reports/bulk', methods=['POST'])
+def admin_bulk_reports():
+    if not is_admin():
+        flash("Akses ditolak!", "danger")
+        return redirect(url_for('main_bp.index'))
+
+    ids = request.form.getlist('ids', type=int)
+    action = request.form.get('action')
+    if not ids:
+        flash("Pilih minimal satu laporan.", "warning")
+        return redirect(url_for('admin_bp.admin_reports'))
+
+    condition = Report.id.in_(ids)
+    if action == 'delete':
+        deleted = moderation.delete_reports(condition)
+        flash(f"{len(deleted)} laporan dihapus.", "success")
+    elif action == 'status' and request.form.get('status') in moderation.STATUSES:
+        updated = moderation.update_status(condition, request.form['status'])
+        flash(f"Status {len(updated)} laporan diubah.", "success")
+    else:
+        flash("Aksi tidak dikenal.", "danger")
+    return redirect(url_for('admin_bp.admin_reports'))
+
+# --- BULK: HAPUS BERDASARKAN FILTER ---
+@admin_bp.route('/reports/delete-by-filter', methods=['POST'])
+def admin_delete_by_filter():
+    if not is_admin():
+        flash("Akses ditolak!", "danger")
+        return redirect(url_for('main_bp.index'))
+
+    try:
+        condition = moderation.filter_condition(
+            user_id=request.form.get('user_id', type=int),
+            date_from=moderation.parse_date(request.form.get('date_from')),
+            date_to=moderation.parse_date(request.form.get('date_to')),
+            report_type=request.form.get('report_type') or None,
+            status=request.form.get('status') or None,
+        )
+    except ValueError:
+        flash("Format tanggal harus YYYY-MM-DD.", "danger")
+        return redirect(url_for('admin_bp.admin_reports'))
+
+    if condition is None:
+        flash("Isi minimal satu filter.", "warning")
+        return redirect(url_for('admin_bp.admin_reports'))
+
+    deleted = moderation.delete_reports(condition)
+    flash(f"{len(deleted)} laporan dihapus.", "success")
+    return redirect(url_for('admin_bp.admin_reports'))
+
+# --- METRICS (format Prometheus) ---
+@admin_bp.route('/metrics')
+def admin_metrics():
+    # Scraper Prometheus tidak punya session: boleh pakai "Authorization: Bearer <METRICS_TOKEN>"
+    token = current_app.config.get("METRICS_TOKEN")
+    bearer = request.headers.get("Authorization", "").removeprefix("Bearer ")
+    if not is_admin() and not (token and hmac.compare_digest(bearer, token)):
+        abort(403)
+
+    registry = metrics.get_registry(current_app)
+    return Response(registry.render(), mimetype="text/plain; version=0.0.4")
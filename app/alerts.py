@@ -0,0 +1,289 @@
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone
+from flask import current_app
+from sqlalchemy import delete, func, select, update
+from app import data_version, jobs
+from app.database import dialect_insert
+from app.models import db, Notification, Report, SavedSearch
+from app.signals import reports_saving
+from app.text import normalize
+
+# Sama seperti search.build_match_query: maksimal 8 kata, semuanya wajib ada (prefix)
+MAX_TERMS = 8
+VERSION_NAME = "saved_search"
+
+_DEFAULT_STATUS = Report.__table__.c.status.default.arg
+
+
+class SearchRejected(Exception):
+    """Pencarian tidak bisa disimpan. Pesan siap ditampilkan ke user."""
+
+
+def terms(query):
+    """'Dompet  KULIT dompet' -> ('dompet', 'kulit')."""
+    return tuple(dict.fromkeys(normalize(query).split()))[:MAX_TERMS]
+
+
+def _now(now=None):
+    # Disimpan UTC tanpa tzinfo, sama seperti created_at laporan
+    return (now or datetime.now(timezone.utc)).replace(tzinfo=None)
+
+
+def _prefixes(report):
+    """Semua awalan setiap kata laporan (kolom yang sama dengan index FTS)."""
+    words = set(normalize(" ".join(
+        filter(None, [report.item_name, report.location, report.description])
+    )).split())
+    return {word[:i] for word in words for i in range(1, len(word) + 1)}
+
+
+# ====================================
+# INDEX PENCARIAN TERSIMPAN
+# ====================================
+class _Search:
+    __slots__ = ("id", "user_id", "terms", "key", "report_type", "status", "location")
+
+    def __init__(self, row):
+        self.id = row.id
+        self.user_id = row.user_id
+        self.terms = terms(row.keywords)
+        # Kata posting: yang terpanjang, biasanya paling jarang
+        self.key = max(self.terms, key=len) if self.terms else None
+        self.report_type = row.report_type
+        self.status = row.status
+        self.location = row.location
+
+    def accepts(self, report, prefixes):
+        return (report.user_id != self.user_id
+                and self.report_type in (None, report.report_type)
+                and self.status in (None, report.status or _DEFAULT_STATUS)
+                and self.location in (None, report.location)
+                and all(term in prefixes for term in self.terms))
+
+
+class AlertIndex:
+    """Inverted index kata -> pencarian tersimpan, di memori per worker.
+
+    Setiap pencarian didaftarkan di bawah satu katanya saja (yang terpanjang,
+    biasanya paling jarang). Laporan baru cukup mencari setiap awalan katanya
+    di index lalu memeriksa syarat lain kandidat yang ketemu: satu lintasan
+    untuk semua pencarian, bukan satu query per pencarian.
+
+    Kalau data_version 'saved_search' berubah (pencarian disimpan / dihapus,
+    dari worker mana pun) index diperbarui sebagian lewat apply(): hanya
+    pencarian baru yang dibaca, yang dihapus dibuang.
+    """
+
+    # Lebih dari ini pencarian baru sekaligus: bangun ulang saja
+    MAX_APPLY = 500
+
+    def __init__(self):
+        self.version = None
+        self._postings = {}     # kata -> [_Search, ...]
+        self._searches = {}     # id -> _Search (termasuk yang tanpa kata kunci)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def ids(self):
+        return set(self._searches)
+
+    def load(self, rows, version=None):
+        postings = defaultdict(list)
+        searches = {}
+        for row in rows:
+            search = searches[row.id] = _Search(row)
+            if search.key:
+                postings[search.key].append(search)
+        size = sum(map(len, postings.values()))
+        # Diganti sekaligus: thread yang sedang match tetap memakai index lama
+        self._postings, self._searches, self._size, self.version = (
+            dict(postings), searches, size, version)
+
+    def apply(self, rows, removed, version=None):
+        """Tambahkan pencarian baru (rows) dan buang id di removed tanpa membangun ulang."""
+        postings = self._postings
+        # List posting diganti, bukan diubah di tempat, supaya aman untuk match()
+        for search_id in removed:
+            search = self._searches.pop(search_id, None)
+            if search is not None and search.key:
+                remaining = [other for other in postings[search.key] if other.id != search_id]
+                if remaining:
+                    postings[search.key] = remaining
+                else:
+                    del postings[search.key]
+                self._size -= 1
+        for row in rows:
+            if row.id in self._searches:
+                continue
+            search = self._searches[row.id] = _Search(row)
+            if search.key:
+                postings[search.key] = [*postings.get(search.key, ()), search]
+                self._size += 1
+        self.version = version
+
+    def match(self, report):
+        """Pencarian tersimpan yang cocok dengan laporan: [_Search, ...]."""
+        postings = self._postings
+        prefixes = _prefixes(report)
+        return [search for prefix in prefixes for search in postings.get(prefix, ())
+                if search.accepts(report, prefixes)]
+
+
+def _search_rows(*where):
+    return db.session.execute(
+        select(SavedSearch.id, SavedSearch.user_id, SavedSearch.keywords,
+               SavedSearch.report_type, SavedSearch.status, SavedSearch.location)
+        .where(*where)
+        .execution_options(yield_per=2000)
+    )
+
+
+def get_index():
+    """Index proses ini, diperbarui dulu kalau pencarian tersimpan berubah."""
+    app = current_app._get_current_object()
+    index = app.extensions["alerts"]
+    # Versi dibaca dulu: perubahan selama build membuat index dianggap basi lagi
+    version = data_version.current(VERSION_NAME)[0]
+    if index.version != version:
+        with app.extensions["alerts_build_lock"]:
+            if index.version != version:
+                _refresh(index, version)
+    return index
+
+
+def _refresh(index, version):
+    if index.version is None:
+        index.load(_search_rows(), version)
+        return
+    # Pencarian tidak pernah diedit, hanya disimpan / dihapus: cukup bandingkan
+    # id (primary key saja), baris lengkap dibaca untuk pencarian baru saja
+    ids = set(db.session.scalars(select(SavedSearch.id)))
+    known = index.ids()
+    added = ids - known
+    if len(added) > index.MAX_APPLY:
+        index.load(_search_rows(), version)
+    else:
+        rows = _search_rows(SavedSearch.id.in_(added)) if added else ()
+        index.apply(rows, known - ids, version)
+
+
+# ====================================
+# PENGIRIMAN NOTIFIKASI
+# ====================================
+def deliver(report_ids, now=None):
+    """Cocokkan laporan ke semua pencarian tersimpan, simpan notifikasinya dengan
+    satu INSERT massal. Aman diulang (notifikasi yang sudah ada dilewati).
+    Return jumlah pasangan (pencarian, laporan) yang cocok."""
+    index = get_index()
+    if not len(index):
+        return 0
+    reports = db.session.execute(
+        select(Report.id, Report.user_id, Report.item_name, Report.description,
+               Report.location, Report.report_type, Report.status)
+        .where(Report.id.in_(report_ids))
+    ).all()
+    created_at = _now(now)
+    rows = [
+        {"user_id": search.user_id, "saved_search_id": search.id, "report_id": report.id,
+         "item_name": report.item_name, "location": report.location,
+         "report_type": report.report_type, "created_at": created_at}
+        for report in reports for search in index.match(report)
+    ]
+    if rows:
+        # Pencarian yang baru dihapus (index belum dibangun ulang) bisa membuat INSERT
+        # ini gagal di PostgreSQL (foreign key); job diulang dengan index baru
+        insert = dialect_insert(db.session.get_bind().dialect.name)
+        stmt = insert(Notification.__table__).on_conflict_do_nothing(
+            index_elements=["saved_search_id", "report_id"])
+        db.session.execute(stmt, rows)
+        db.session.commit()
+    return len(rows)
+
+
+@jobs.handler("alerts.match")
+def _match_job(payload):
+    delivered = deliver(payload["ids"])
+    metrics = current_app.extensions.get("metrics")
+    if metrics is not None and delivered:
+        metrics.inc("lostnfound_alerts_total", delivered)
+
+
+def _on_reports_saving(app, ids, created=False, **extra):
+    # Hanya laporan baru (satu job per laporan / per batch impor); edit tidak
+    # mengirim notifikasi ulang
+    if created:
+        jobs.enqueue("alerts.match", {"ids": sorted(ids)})
+
+
+# ====================================
+# PENCARIAN TERSIMPAN & NOTIFIKASI USER
+# ====================================
+def save_search(user_id, query, filters):
+    """Simpan (kata kunci + filter) untuk user; pencarian yang sama tidak disimpan dua kali.
+    Filter waktu (since) diabaikan: yang dicocokkan selalu laporan baru.
+    Return SavedSearch (belum di-commit); raise SearchRejected."""
+    keywords = " ".join(query.split())[:SavedSearch.keywords.type.length]
+    if not terms(keywords):
+        raise SearchRejected("Isi kata kunci dulu sebelum menyimpan pencarian.")
+
+    fields = dict(user_id=user_id, keywords=keywords, report_type=filters.report_type,
+                  status=filters.status, location=filters.location)
+    existing = SavedSearch.query.filter_by(**fields).first()
+    if existing is not None:
+        return existing
+
+    limit = current_app.config.get("ALERTS_MAX_PER_USER", 10)
+    count = db.session.scalar(
+        select(func.count()).select_from(SavedSearch).where(SavedSearch.user_id == user_id))
+    if count >= limit:
+        raise SearchRejected(f"Maksimal {limit} pencarian tersimpan; hapus salah satu dulu.")
+
+    search = SavedSearch(**fields)
+    db.session.add(search)
+    return search
+
+
+def delete_search(user_id, search_id):
+    """Hapus pencarian milik user beserta notifikasinya. Return False kalau tidak ada."""
+    search = db.session.get(SavedSearch, search_id)
+    if search is None or search.user_id != user_id:
+        return False
+    db.session.execute(delete(Notification).where(Notification.saved_search_id == search.id),
+                       execution_options={"synchronize_session": False})
+    db.session.delete(search)
+    return True
+
+
+def saved_searches(user_id):
+    return SavedSearch.query.filter_by(user_id=user_id).order_by(SavedSearch.id).all()
+
+
+def notifications(user_id, limit=None):
+    """Notifikasi terbaru user (range scan ix_notification_user_id_id)."""
+    if limit is None:
+        limit = current_app.config.get("ALERTS_PROFILE_LIMIT", 30)
+    return (Notification.query.filter_by(user_id=user_id)
+            .order_by(Notification.id.desc()).limit(limit).all())
+
+
+def mark_read(user_id, now=None):
+    """Tandai semua notifikasi user sudah dibaca. Return jumlahnya (belum di-commit)."""
+    return db.session.execute(
+        update(Notification)
+        .where(Notification.user_id == user_id, Notification.read_at.is_(None))
+        .values(read_at=_now(now)),
+        execution_options={"synchronize_session": False},
+    ).rowcount
+
+
+def init_app(app):
+    app.extensions["alerts"] = AlertIndex()
+    app.extensions["alerts_build_lock"] = threading.Lock()
+    metrics = app.extensions.get("metrics")
+    if metrics is not None:
+        metrics.describe("lostnfound_alerts_total", "counter",
+                         "Notifikasi pencarian tersimpan yang dikirim (pasangan pencarian-laporan).")
+    reports_saving.connect(_on_reports_saving)
@@ -0,0 +1,199 @@
+import json
+from datetime import timezone
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context, url_for
+from sqlalchemy import select
+from werkzeug.http import is_resource_modified
+from app import data_version, suggest
+from app.models import db, Report
+from app.pagination import decode_cursor, encode_cursor, get_per_page, keyset_after
+from app.search import search_ids
+
+api_bp = Blueprint('api_bp', __name__)
+
+# Kolom yang boleh diminta lewat ?fields=
+FIELDS = ("id", "name", "item_name", "description", "location", "contact", "status",
+          "report_type", "created_at", "image_url", "user_id")
+
+# Respons dikirim per potongan ~8 KB, bukan per baris
+CHUNK_SIZE = 8 * 1024
+
+
+# ====================================
+# HELPERS
+# ====================================
+def _error(message, status):
+    return jsonify(error=message), status
+
+
+def _fields():
+    """?fields=item_name,status -> kolom yang di-SELECT (id selalu ikut). None kalau tidak valid."""
+    raw = request.args.get('fields')
+    if not raw:
+        return list(FIELDS)
+    requested = [f.strip() for f in raw.split(',') if f.strip()]
+    if any(f not in FIELDS for f in requested):
+        return None
+    return ['id'] + [f for f in dict.fromkeys(requested) if f != 'id']
+
+
+def _columns(fields):
+    return [Report.__table__.c[f] for f in fields]
+
+
+def _serialize(row, fields):
+    item = {}
+    for field in fields:
+        value = row[field]
+        if field == 'created_at' and value is not None:
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=timezone.utc)
+            value = value.isoformat()
+        elif field == 'image_url' and value:
+            value = url_for('main_bp.uploaded_file', filename=value, _external=True)
+        item[field] = value
+    return item
+
+
+def _validators():
+    """(etag, last_modified) dari tabel data_version (satu lookup primary key).
+
+    Versi dibaca sebelum data, jadi paling buruk klien menerima data yang
+    lebih baru dari ETag-nya dan akan revalidasi ulang di request berikutnya.
+    """
+    version, updated_at = data_version.current()
+    return f"r{version}", updated_at
+
+
+def _cacheable(response, etag, last_modified):
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # Boleh disimpan, tapi wajib revalidasi (If-None-Match -> 304)
+    response.headers['Cache-Control'] = 'public, no-cache'
+    return response
+
+
+def _not_modified(etag, last_modified):
+    """Respons 304 kalau klien sudah punya versi terbaru, tanpa menyentuh tabel report."""
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return None
+    return _cacheable(Response(status=304), etag, last_modified)
+
+
+def _json_stream(rows, fields, per_page=None, next_cursor=None):
+    """Tulis {"items": [...], "next_cursor": ...} sambil membaca baris.
+
+    Kalau per_page diberikan, baris ke per_page+1 hanya dipakai sebagai tanda
+    masih ada halaman berikutnya (cursor = id baris terakhir yang dikirim).
+    """
+    buffer = ['{"items":[']
+    size = 0
+    last = None
+    for i, row in enumerate(rows):
+        if per_page is not None and i == per_page:
+            next_cursor = encode_cursor([last['id']])
+            break
+        part = ('' if i == 0 else ',') + json.dumps(_serialize(row, fields), ensure_ascii=False,
+                                                    separators=(',', ':'))
+        buffer.append(part)
+        size += len(part)
+        if size >= CHUNK_SIZE:
+            yield ''.join(buffer)
+            buffer, size = [], 0
+        last = row
+    buffer.append('],"next_cursor":' + json.dumps(next_cursor) + '}')
+    yield ''.join(buffer)
+
+
+def _stream_response(body, etag, last_modified):
+    response = Response(stream_with_context(body), mimetype='application/json')
+    return _cacheable(response, etag, last_modified)
+
+
+# ====================================
+# ENDPOINTS
+# ====================================
+@api_bp.route('/reports')
+def list_reports():
+    """Daftar laporan terbaru, atau hasil pencarian kalau ada ?q=."""
+    fields = _fields()
+    if fields is None:
+        return _error(f"fields tidak dikenal; pilihan: {', '.join(FIELDS)}", 400)
+
+    etag, last_modified = _validators()
+    not_modified = _not_modified(etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    per_page = get_per_page(current_app.config.get('API_MAX_PER_PAGE', 500))
+    cursor = request.args.get('cursor')
+    query = request.args.get('q', '').strip()
+    if cursor and decode_cursor(cursor) is None:
+        return _error("cursor tidak valid", 400)
+
+    if query:
+        # Urutan relevansi dari index pencarian, kolomnya diambil sekali jalan
+        page = search_ids(query, cursor, per_page)
+        rows = db.session.execute(
+            select(*_columns(fields)).where(Report.id.in_(page.items))
+        ).mappings().all()
+        by_id = {row['id']: row for row in rows}
+        ranked = [by_id[i] for i in page.items if i in by_id]
+        return _stream_response(_json_stream(ranked, fields, next_cursor=page.next_cursor),
+                                etag, last_modified)
+
+    stmt = select(*_columns(fields))
+    for name in ('report_type', 'status'):
+        if request.args.get(name):
+            stmt = stmt.where(Report.__table__.c[name] == request.args[name])
+    if request.args.get('user_id', type=int) is not None:
+        stmt = stmt.where(Report.user_id == request.args.get('user_id', type=int))
+
+    values = decode_cursor(cursor, [Report.id])
+    if cursor and values is None:
+        return _error("cursor tidak valid", 400)
+    if values is not None:
+        stmt = stmt.where(keyset_after([Report.id], values))
+    stmt = stmt.order_by(Report.id.desc()).limit(per_page + 1).execution_options(yield_per=200)
+
+    def rows():
+        # Baris dibaca bertahap dari cursor database selama respons dikirim. Query baru
+        # jalan di sini, bukan di view (seperti StreamPage): Flask menutup db.session
+        # view sebelum body dikirim, dan cursor server PostgreSQL ikut tertutup
+        yield from db.session.execute(stmt).mappings()
+
+    return _stream_response(_json_stream(rows(), fields, per_page=per_page), etag, last_modified)
+
+
+@api_bp.route('/reports/<int:report_id>')
+def get_report(report_id):
+    fields = _fields()
+    if fields is None:
+        return _error(f"fields tidak dikenal; pilihan: {', '.join(FIELDS)}", 400)
+
+    etag, last_modified = _validators()
+    not_modified = _not_modified(etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    row = db.session.execute(
+        select(*_columns(fields)).where(Report.id == report_id)
+    ).mappings().first()
+    if row is None:
+        return _error("Laporan tidak ditemukan.", 404)
+
+    return _cacheable(jsonify(_serialize(row, fields)), etag, last_modified)
+
+
+@api_bp.route('/suggest')
+def suggest_terms():
+    """Saran typeahead untuk kotak pencarian: ?q=dom -> nama barang & lokasi paling sering."""
+    prefix = request.args.get('q', '').strip()
+    limit = request.args.get('limit', current_app.config.get('SUGGEST_LIMIT', 8), type=int)
+    limit = max(1, min(limit, 20))
+    items = [{"text": text, "kind": kind, "count": count}
+             for text, kind, count in suggest.get_index().suggest(prefix, limit)]
+    response = jsonify(q=prefix, suggestions=items)
+    # Dipanggil tiap ketikan: boleh di-cache browser sebentar
+    response.headers['Cache-Control'] = 'public, max-age=30'
+    return response
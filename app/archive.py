@@ -0,0 +1,267 @@
+import time
+from datetime import datetime, timedelta, timezone
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import and_, delete, func, insert, or_, select
+from app import jobs, search
+from app.models import db, ArchivedReport, Report, ReportMatch
+from app.pagination import Page, get_per_page, keyset_paginate
+from app.signals import reports_deleted
+
+reports_cli = AppGroup("reports", help="Kelola data laporan.")
+
+OPEN = "Belum ditemukan"
+JOB_KEY = "reports.archive"
+
+
+def _now(now=None):
+    # created_at disimpan UTC tanpa tzinfo
+    return (now or datetime.now(timezone.utc)).replace(tzinfo=None)
+
+
+# ====================================
+# PEMINDAHAN KE ARSIP
+# ====================================
+def candidates(resolved_days, stale_days, now=None):
+    """Kondisi WHERE laporan yang siap diarsip.
+
+    - sudah selesai (status bukan "Belum ditemukan") dan dibuat > resolved_days hari lalu,
+    - atau apa pun statusnya, dibuat > stale_days hari lalu.
+    Tidak ada kolom waktu selesai, jadi umur dihitung dari created_at.
+    """
+    now = _now(now)
+    resolved_before = now - timedelta(days=resolved_days)
+    stale_before = now - timedelta(days=stale_days)
+    return and_(
+        # Range ix_report_created_at yang mencakup kedua syarat di bawah
+        Report.created_at < max(resolved_before, stale_before),
+        or_(and_(Report.status != OPEN, Report.created_at < resolved_before),
+            Report.created_at < stale_before),
+    )
+
+
+def summarize(condition):
+    """[(report_type, status, jumlah)] laporan yang cocok (untuk --dry-run)."""
+    return db.session.execute(
+        select(Report.report_type, Report.status, func.count())
+        .where(condition)
+        .group_by(Report.report_type, Report.status)
+        .order_by(Report.report_type, Report.status)
+    ).all()
+
+
+def archive_batch(condition, batch_size, now=None):
+    """Pindahkan maksimal batch_size laporan (paling lama dulu) ke report_archive.
+
+    Satu transaksi per batch: DELETE ... RETURNING dari report lalu INSERT ke
+    arsip, jadi proses yang terhenti di tengah tidak pernah meninggalkan
+    laporan ganda atau hilang, dan cukup dijalankan ulang untuk melanjutkan.
+    Refcount foto tidak berubah: laporan arsip tetap memakai fotonya.
+    """
+    ids = list(db.session.scalars(
+        select(Report.id).where(condition)
+        .order_by(Report.created_at, Report.id).limit(batch_size)
+    ))
+    if not ids:
+        db.session.rollback()
+        return []
+
+    db.session.execute(
+        delete(ReportMatch).where(or_(ReportMatch.lost_id.in_(ids), ReportMatch.found_id.in_(ids))),
+        execution_options={"synchronize_session": False},
+    )
+    rows = db.session.execute(
+        delete(Report).where(Report.id.in_(ids), condition).returning(*Report.__table__.columns),
+        execution_options={"synchronize_session": False},
+    ).mappings().all()
+    moved = [dict(row) for row in rows]
+    if moved:
+        archived_at = _now(now)
+        db.session.execute(insert(ArchivedReport), [{**row, "archived_at": archived_at} for row in moved])
+    db.session.commit()
+    return moved
+
+
+def archive_reports(resolved_days, stale_days, batch_size=500, pause=0.5, progress=None):
+    """Arsipkan semua kandidat per batch. progress(moved, total) dipanggil tiap batch.
+
+    Counter report_stat tidak diubah: statistik menghitung laporan aktif + arsip.
+    Return jumlah laporan yang dipindah.
+    """
+    app = current_app._get_current_object()
+    condition = candidates(resolved_days, stale_days)
+    total = db.session.scalar(select(func.count()).select_from(Report).where(condition))
+    moved = 0
+    while True:
+        batch = archive_batch(condition, batch_size)
+        if not batch:
+            break
+        moved += len(batch)
+        # Index matching & saran membuang laporan ini, cache halaman di-invalidasi
+        reports_deleted.send(app, reports=batch)
+        if progress is not None:
+            progress(moved, max(total, moved))
+        if pause:
+            time.sleep(pause)
+    return moved
+
+
+# ====================================
+# ANALYZE & VACUUM
+# ====================================
+def compact(vacuum_pages):
+    """ANALYZE (dibatasi analysis_limit) lalu incremental VACUUM maksimal vacuum_pages halaman.
+
+    Return (halaman dikembalikan ke OS, mode auto_vacuum). incremental_vacuum
+    hanya bekerja kalau auto_vacuum = INCREMENTAL (2); database lama perlu
+    sekali `flask reports archive --full-vacuum`.
+    """
+    if db.engine.dialect.name != "sqlite":
+        with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.exec_driver_sql("ANALYZE")
+        return 0, None
+
+    with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql("PRAGMA analysis_limit=1000")
+        for table in ("report", "report_archive"):
+            conn.exec_driver_sql(f"ANALYZE {table}")
+
+        mode = conn.exec_driver_sql("PRAGMA auto_vacuum").scalar()
+        if mode != 2 or not vacuum_pages:
+            return 0, mode
+        before = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+        # Satu halaman dibebaskan per langkah statement, dan execute() modul sqlite3
+        # hanya melangkah sekali untuk pragma tanpa kolom; executescript() sampai habis
+        conn.connection.driver_connection.executescript(
+            f"PRAGMA incremental_vacuum({int(vacuum_pages)});")
+        after = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+    return before - after, mode
+
+
+def full_vacuum():
+    """Aktifkan auto_vacuum=INCREMENTAL lalu VACUUM penuh (menulis ulang seluruh file,
+    mengunci database selama berjalan). Cukup sekali per database."""
+    with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if conn.dialect.name != "sqlite":
+            # PostgreSQL: VACUUM biasa (tanpa FULL) tidak mengunci tabel
+            conn.exec_driver_sql("VACUUM (ANALYZE) report, report_archive")
+            return
+        conn.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.exec_driver_sql("VACUUM")
+
+
+# ====================================
+# PENCARIAN ARSIP (SESUAI PERMINTAAN)
+# ====================================
+def search_archive(query, cursor=None, per_page=None):
+    """Seperti search.search_reports, tapi atas report_archive."""
+    if per_page is None:
+        per_page = get_per_page()
+
+    match = search.build_match_query(query)
+    if match and search.fts_available(ArchivedReport):
+        try:
+            rows, next_cursor = search.fts_rows(match, cursor, per_page, model=ArchivedReport)
+            return Page(search.ranked_objects(ArchivedReport, rows), next_cursor)
+        except search.FTS_ERRORS:
+            db.session.rollback()
+            search.mark_fts_unavailable(ArchivedReport)
+
+    archived = ArchivedReport.query.filter(search.ilike_filter(query, ArchivedReport))
+    return keyset_paginate(archived, [ArchivedReport.id], cursor, per_page)
+
+
+# ====================================
+# JOB BERKALA
+# ====================================
+def _run(echo=None):
+    config = current_app.config
+    moved = archive_reports(
+        resolved_days=config.get("ARCHIVE_RESOLVED_DAYS", 90),
+        stale_days=config.get("ARCHIVE_STALE_DAYS", 365),
+        batch_size=config.get("ARCHIVE_BATCH", 500),
+        pause=config.get("ARCHIVE_PAUSE", 0.5),
+        progress=echo,
+    )
+    freed, mode = compact(config.get("ARCHIVE_VACUUM_PAGES", 2000))
+    return moved, freed, mode
+
+
+def _interval():
+    return current_app.config.get("ARCHIVE_INTERVAL_HOURS", 24) * 3600
+
+
+@jobs.handler("reports.archive")
+def _archive_job(payload):
+    try:
+        moved, freed, _ = _run()
+        if moved or freed:
+            current_app.logger.info("Arsip: %d laporan dipindah, %d halaman dibebaskan", moved, freed)
+    finally:
+        # Jadwal berikutnya disimpan di tabel job, jadi tetap jalan walau mesin sempat mati
+        if _interval() > 0:
+            jobs.enqueue("reports.archive", key=JOB_KEY, delay=_interval())
+            db.session.commit()
+
+
+@jobs.on_worker_start
+def _schedule():
+    # Job yang sudah antre (dari boot sebelumnya) tidak diubah jadwalnya
+    if _interval() > 0:
+        jobs.enqueue("reports.archive", key=JOB_KEY, delay=_interval())
+        db.session.commit()
+
+
+# ====================================
+# CLI
+# ====================================
+@reports_cli.command("archive")
+@click.option("--dry-run", is_flag=True, help="Hanya tampilkan yang akan diarsip.")
+@click.option("--resolved-days", type=int, help="Default ARCHIVE_RESOLVED_DAYS.")
+@click.option("--stale-days", type=int, help="Default ARCHIVE_STALE_DAYS.")
+@click.option("--batch-size", type=int, help="Default ARCHIVE_BATCH.")
+@click.option("--full-vacuum", "full", is_flag=True,
+              help="Sekali saja: aktifkan auto_vacuum=INCREMENTAL lalu VACUUM penuh (mengunci database).")
+def archive_command(dry_run, resolved_days, stale_days, batch_size, full):
+    """Pindahkan laporan selesai / lama ke report_archive, lalu ANALYZE + incremental VACUUM.
+
+    Aman dihentikan kapan saja (Ctrl+C): batch yang sudah commit tetap di
+    arsip, sisanya dilanjutkan saat perintah dijalankan lagi.
+    """
+    config = current_app.config
+    if resolved_days is not None:
+        config["ARCHIVE_RESOLVED_DAYS"] = resolved_days
+    if stale_days is not None:
+        config["ARCHIVE_STALE_DAYS"] = stale_days
+    if batch_size is not None:
+        config["ARCHIVE_BATCH"] = batch_size
+
+    if dry_run:
+        condition = candidates(config.get("ARCHIVE_RESOLVED_DAYS", 90), config.get("ARCHIVE_STALE_DAYS", 365))
+        rows = summarize(condition)
+        for report_type, status, count in rows:
+            click.echo(f"  {report_type:<6} {status or '-':<16} {count}")
+        click.echo(f"{sum(r[2] for r in rows)} laporan akan diarsip (dry run, tidak ada yang diubah).")
+        return
+
+    def progress(moved, total):
+        click.echo(f"  {moved}/{total} laporan dipindah ({moved * 100 // total}%)")
+
+    moved, freed, mode = _run(progress)
+    click.echo(f"{moved} laporan diarsip.")
+    if full:
+        click.echo("VACUUM penuh...")
+        started = time.perf_counter()
+        full_vacuum()
+        click.echo(f"Selesai dalam {time.perf_counter() - started:.1f} detik; "
+                   "selanjutnya cukup incremental VACUUM.")
+    elif mode is not None and mode != 2:
+        click.echo("auto_vacuum belum INCREMENTAL: ruang kosong belum dikembalikan ke disk. "
+                   "Jalankan sekali dengan --full-vacuum.")
+    else:
+        click.echo(f"ANALYZE selesai, {freed} halaman dikembalikan ke disk.")
+
+
+def init_app(app):
+    app.cli.add_command(reports_cli)
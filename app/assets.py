@@ -0,0 +1,90 @@
+import hashlib
+import os
+import re
+from flask import request
+
+ONE_YEAR = 365 * 24 * 3600
+ONE_DAY = 24 * 3600
+
+# Nama file upload = sha256 isinya, jadi isinya tidak akan pernah berubah
+_CONTENT_HASHED = re.compile(r"^[0-9a-f]{64}\.\w+$")
+
+
+def is_content_hashed(filename):
+    return bool(_CONTENT_HASHED.match(filename))
+
+
+def file_digest(path, length=12):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b""):
+            sha.update(chunk)
+    return sha.hexdigest()[:length]
+
+
+def build_manifest(static_folder, skip=("uploads",)):
+    """Peta 'css/tailwind.css' -> hash isi file, dibangun sekali saat startup."""
+    manifest = {}
+    for root, dirs, files in os.walk(static_folder):
+        if root == static_folder:
+            dirs[:] = [d for d in dirs if d not in skip]
+        for name in files:
+            path = os.path.join(root, name)
+            rel = os.path.relpath(path, static_folder).replace(os.sep, "/")
+            manifest[rel] = file_digest(path)
+    return manifest
+
+
+# ====================================
+# HOOKS
+# ====================================
+def _fingerprint_static(app):
+    manifest = app.extensions["asset_manifest"]
+
+    def add_version(endpoint, values):
+        # url_for('static', filename=...) -> /static/...?v=<hash>
+        if endpoint == "static" and "v" not in values:
+            digest = manifest.get(values.get("filename"))
+            if digest:
+                values["v"] = digest
+
+    return add_version
+
+
+def _cache_headers(app):
+    manifest = app.extensions["asset_manifest"]
+
+    def set_headers(response):
+        if response.status_code not in (200, 304):
+            return response
+
+        if request.endpoint == "static":
+            filename = request.view_args.get("filename")
+            version = request.args.get("v")
+            if version and manifest.get(filename) == version:
+                response.headers["Cache-Control"] = f"public, max-age={ONE_YEAR}, immutable"
+            else:
+                # Tanpa fingerprint: tetap boleh di-cache tapi wajib revalidasi (ETag -> 304)
+                response.headers["Cache-Control"] = "public, no-cache"
+
+        elif request.endpoint == "main_bp.uploaded_file":
+            filename = request.view_args.get("filename", "")
+            if is_content_hashed(filename):
+                response.headers["Cache-Control"] = f"public, max-age={ONE_YEAR}, immutable"
+            else:
+                # Turunan (thumb/md) dan file lama bernama uuid
+                response.headers["Cache-Control"] = f"public, max-age={ONE_DAY}"
+
+        return response
+
+    return set_headers
+
+
+def init_app(app):
+    manifest = {}
+    if app.config.get("ASSET_FINGERPRINT", True) and not app.debug:
+        manifest = build_manifest(app.static_folder)
+    app.extensions["asset_manifest"] = manifest
+
+    app.url_defaults(_fingerprint_static(app))
+    app.after_request(_cache_headers(app))
@@ -0,0 +1,164 @@
+import re
+import threading
+from urllib.parse import quote
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import event
+from app.models import db, Report, User
+from app.pagination import encode_cursor
+
+audit_cli = AppGroup("audit", help="Audit performa query.")
+
+_LIMIT_RE = re.compile(r"\bLIMIT\b", re.IGNORECASE)
+_WHERE_RE = re.compile(r"\bWHERE\b", re.IGNORECASE)
+
+# Scan yang memang disengaja: hitungan facet membaca seluruh index sempit
+# ini sekali, lalu hasilnya di-cache (app/facets.py)
+ALLOWED_SCANS = ("SCAN report USING COVERING INDEX ix_report_facets",)
+
+
+def _routes(report_id, user_id, location="Perpustakaan"):
+    """Halaman yang diaudit: (nama, url, user_id di session atau None).
+
+    Tambahkan di sini setiap kali ada route/query baru di blueprint.
+    """
+    cursor = encode_cursor([report_id + 1])
+    return [
+        ("home", "/", None),
+        ("home page 2", f"/?cursor={cursor}", None),
+        ("search", "/?q=dompet", None),
+        ("facet type+status", "/?report_type=lost&status=Belum+ditemukan", None),
+        ("facet location", f"/?location={location}", None),
+        ("facet date", "/?since=7d", None),
+        ("search + facet", "/?q=dompet&report_type=found", None),
+        ("archive", "/arsip", None),
+        ("archive search", "/arsip?q=dompet", None),
+        ("report form", "/report/", user_id),
+        ("report form page 2", f"/report/?cursor={cursor}", user_id),
+        ("edit report", f"/report/edit/{report_id}", user_id),
+        ("profile", "/profile/", user_id),
+        ("admin reports", "/admin/reports", 1),
+        ("admin reports page 2", f"/admin/reports?cursor={cursor}", 1),
+        ("api list", "/api/v1/reports", None),
+        ("api list page 2", f"/api/v1/reports?cursor={cursor}&fields=item_name", None),
+        ("api list filtered", "/api/v1/reports?report_type=lost&status=Belum+ditemukan", None),
+        ("api search", "/api/v1/reports?q=dompet", None),
+        ("api report", f"/api/v1/reports/{report_id}", None),
+    ]
+
+
+def is_full_scan(detail, statement):
+    """True kalau baris EXPLAIN QUERY PLAN berarti membaca seluruh tabel/index.
+
+    SCAN berurutan tanpa WHERE tapi dengan LIMIT (halaman pertama feed, urut
+    rowid) berhenti setelah LIMIT baris, jadi tidak dihitung full scan.
+    """
+    if not detail.startswith("SCAN ") or detail in ALLOWED_SCANS:
+        return False
+    # "SCAN (subquery-N)" membaca hasil subquery (mis. daftar id IN), bukan tabel
+    if "VIRTUAL TABLE" in detail or detail.startswith(("SCAN CONSTANT ROW", "SCAN sqlite_", "SCAN (subquery-")):
+        return False
+    bounded = _LIMIT_RE.search(statement) and not _WHERE_RE.search(statement)
+    return not bounded
+
+
+def explain(connection, statement, parameters):
+    rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+    return [row[-1] for row in rows]
+
+
+def capture_queries(app, url, user_id=None):
+    """Jalankan satu request lewat test client, kembalikan semua (sql, params) yang dieksekusi."""
+    captured = []
+    # Listener dipasang di engine (semua thread): query thread lain (job, sweeper) dilewati
+    thread = threading.get_ident()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if threading.get_ident() != thread:
+            return
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            captured.append((statement, parameters))
+
+    # CLI sudah punya app context (dan session) sendiri yang dipakai ulang oleh
+    # test client; kosongkan identity map supaya query route tidak terlewat
+    db.session.expunge_all()
+
+    engine = db.engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        client = app.test_client()
+        if user_id is not None:
+            with client.session_transaction() as session:
+                session["user_id"] = user_id
+                session["username"] = "audit"
+        response = client.get(url)
+        try:
+            # Halaman streaming baru menjalankan query daftar saat body dibaca
+            response.get_data()
+        finally:
+            # close() menjalankan call_on_close: slot konkurensi (app/ratelimit.py) dilepas
+            response.close()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return response.status_code, captured
+
+
+@audit_cli.command("queries")
+@click.option("--verbose", "-v", is_flag=True, help="Tampilkan plan semua query.")
+def audit_queries(verbose):
+    """EXPLAIN QUERY PLAN untuk setiap query yang dikirim route; gagal kalau ada full scan."""
+    app = current_app._get_current_object()
+    if db.engine.dialect.name != "sqlite":
+        raise click.ClickException("Audit ini khusus SQLite (EXPLAIN QUERY PLAN).")
+
+    report = Report.query.order_by(Report.id.desc()).first()
+    user = db.session.get(User, report.user_id) if report and report.user_id else User.query.first()
+    if report is None or user is None:
+        raise click.ClickException("Butuh minimal satu user dan satu laporan di database.")
+
+    # Cache fragment dimatikan supaya query benar-benar jalan
+    page_cache = app.extensions.get("page_cache")
+    cache_enabled = page_cache.enabled if page_cache else None
+    if page_cache:
+        page_cache.enabled = False
+
+    problems = []
+    failed = []
+    seen = set()
+    try:
+        for name, url, user_id in _routes(report.id, user.id, quote(report.location)):
+            status, queries = capture_queries(app, url, user_id)
+            click.echo(f"[{status}] {name}: {url} ({len(queries)} query)")
+            # Redirect / error / ditolak rate limit: query halaman aslinya tidak teraudit
+            if not 200 <= status < 300:
+                failed.append(name)
+            with db.engine.connect() as connection:
+                for statement, parameters in queries:
+                    if statement in seen:
+                        continue
+                    seen.add(statement)
+                    plan = explain(connection, statement, parameters)
+                    scans = [d for d in plan if is_full_scan(d, statement)]
+                    if scans:
+                        problems.append((name, statement, plan))
+                    if verbose or scans:
+                        flag = "FULL SCAN" if scans else "ok"
+                        click.echo(f"    {flag}: {' '.join(statement.split())[:160]}")
+                        for detail in plan:
+                            click.echo(f"        {detail}")
+    finally:
+        if page_cache:
+            page_cache.enabled = cache_enabled
+
+    if failed:
+        click.echo(f"\n{len(failed)} route tidak membalas 2xx: {', '.join(failed)}.", err=True)
+    if problems:
+        click.echo(f"\n{len(problems)} query melakukan full scan.", err=True)
+    if failed or problems:
+        raise SystemExit(1)
+    click.echo(f"\nSemua {len(seen)} query memakai index.")
+
+
+def init_app(app):
+    app.cli.add_command(audit_cli)
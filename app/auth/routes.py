@@ -1,10 +1,17 @@
-import os
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session
-from app import oauth
+from app.google_auth import google
+from app.passwords import HashingBusy
 from app.models import db, User
 
 auth_bp = Blueprint('auth_bp', __name__)
 
+
+def _busy(template):
+    # Antrian hashing penuh: tolak cepat, klien diminta coba lagi sebentar lagi
+    flash('Server sedang sibuk, coba lagi beberapa detik lagi.', 'warning')
+    return render_template(template), 503, {'Retry-After': '5'}
+
+
 @auth_bp.route('/signup', methods=['GET', 'POST'])
 def signup():
     if request.method == 'POST':
@@ -17,7 +24,10 @@ def signup():
             return redirect(url_for('auth_bp.signup'))
 
         new_user = User(username=username, email=email)
-        new_user.set_password(password)
+        try:
+            new_user.set_password(password)
+        except HashingBusy:
+            return _busy('auth/signup.html')
         db.session.add(new_user)
         db.session.commit()
 
@@ -28,13 +38,15 @@ def signup():
 @auth_bp.route("/login/google")
 def google_login():
     redirect_uri = url_for("auth_bp.google_callback", _external=True)
-    return oauth.google.authorize_redirect(redirect_uri)
+    return google().authorize_redirect(redirect_uri)
 
 
 @auth_bp.route("/google/callback")
 def google_callback():
-    token = oauth.google.authorize_access_token()
-    user_info = oauth.google.userinfo()
+    client = google()
+    token = client.authorize_access_token()
+    # Scope openid: klaim user sudah ada di id_token, tidak perlu request userinfo lagi
+    user_info = token.get("userinfo") or client.userinfo()
 
     email = user_info.get("email")
     name = user_info.get("name")
@@ -45,7 +57,7 @@ def google_callback():
     if not user:
     # auto-register untuk user dari Google
         user = User(username=name, email=email)
-        user.set_password(os.urandom(16).hex())  # password dummy biar tidak null
+        user.set_unusable_password()  # login hanya lewat Google, tanpa hashing
         db.session.add(user)
         db.session.commit()
 
@@ -65,7 +77,14 @@ def login():
         password = request.form['password']
 
         user = User.query.filter_by(email=email).first()
-        if user and user.check_password(password):
+        try:
+            valid = user is not None and user.check_password(password)
+        except HashingBusy:
+            return _busy('auth/login.html')
+        if valid:
+            # Hash lama di-upgrade oleh check_password kalau PASSWORD_METHOD berubah
+            if db.session.is_modified(user):
+                db.session.commit()
             session['user_id'] = user.id
             session['username'] = user.username
             flash(f'Selamat datang, {user.username}!', 'success')
@@ -0,0 +1,200 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from markupsafe import Markup
+from app.signals import report_saved, reports_created, reports_deleted, reports_updated
+
+
+# ====================================
+# BACKENDS
+# ====================================
+class MemoryBackend:
+    """LRU dengan TTL, batas jumlah entri dan total ukuran. Hanya untuk satu proses."""
+
+    def __init__(self, max_entries=512, max_bytes=16 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()    # key -> (expires_at, value)
+        self._bytes = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                self._pop(key)
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._pop(key)
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._bytes += size
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                self._pop(next(iter(self._data)))
+
+    def _pop(self, key):
+        _, value = self._data.pop(key)
+        self._bytes -= len(value)
+
+    def generation(self):
+        return self._generation
+
+    def bump_generation(self):
+        with self._lock:
+            self._generation += 1
+            # Entri generasi lama tidak akan pernah dibaca lagi
+            self._data.clear()
+            self._bytes = 0
+            return self._generation
+
+
+class SQLiteBackend:
+    """Cache bersama untuk semua worker di satu mesin (file SQLite terpisah dari data utama)."""
+
+    def __init__(self, path, max_entries=2048):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("CREATE TABLE IF NOT EXISTS page_cache "
+                     "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS page_cache_meta "
+                     "(name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        conn.execute("INSERT OR IGNORE INTO page_cache_meta VALUES ('generation', 0)")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=2, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._conn().execute(
+            "SELECT value FROM page_cache WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key, value, ttl):
+        conn = self._conn()
+        conn.execute("INSERT OR REPLACE INTO page_cache VALUES (?, ?, ?)",
+                     (key, value, time.time() + ttl))
+        # Buang entri kedaluwarsa / paling cepat habis kalau sudah melebihi batas
+        conn.execute("DELETE FROM page_cache WHERE key IN (SELECT key FROM page_cache "
+                     "ORDER BY expires_at DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+
+    def generation(self):
+        return self._conn().execute(
+            "SELECT value FROM page_cache_meta WHERE name = 'generation'"
+        ).fetchone()[0]
+
+    def bump_generation(self):
+        conn = self._conn()
+        conn.execute("UPDATE page_cache_meta SET value = value + 1 WHERE name = 'generation'")
+        conn.execute("DELETE FROM page_cache")
+        return self.generation()
+
+
+# ====================================
+# PAGE CACHE
+# ====================================
+class PageCache:
+    """Cache potongan HTML publik (tanpa flash message / data session).
+
+    Key selalu diawali generation counter; setiap create/edit/delete laporan
+    menaikkan generation sehingga semua entri lama otomatis tidak terpakai.
+    """
+
+    def __init__(self, backend, ttl=60, enabled=True):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+
+    def key(self, *parts):
+        return f"g{self.backend.generation()}:" + "|".join(str(p) for p in parts)
+
+    def fragment(self, parts, render):
+        """Ambil fragment dari cache, atau panggil render() lalu simpan."""
+        if not self.enabled:
+            return Markup(render())
+        key = self.key(*parts)
+        html = self.backend.get(key)
+        if html is None:
+            html = str(render())
+            self.backend.set(key, html, self.ttl)
+        return Markup(html)
+
+    def stream_fragment(self, parts, stream):
+        """Seperti fragment, tapi stream() menghasilkan potongan HTML.
+
+        Cache hit dikirim sekaligus; kalau miss, potongan diteruskan ke
+        browser sambil dikumpulkan dan baru disimpan setelah lengkap.
+        """
+        if not self.enabled:
+            for chunk in stream():
+                yield Markup(chunk)
+            return
+        key = self.key(*parts)
+        html = self.backend.get(key)
+        if html is not None:
+            yield Markup(html)
+            return
+        collected = []
+        for chunk in stream():
+            collected.append(chunk)
+            yield Markup(chunk)
+        self.backend.set(key, "".join(collected), self.ttl)
+
+    def invalidate(self):
+        return self.backend.bump_generation()
+
+
+def get_cache(app):
+    return app.extensions["page_cache"]
+
+
+def _invalidate(app, **extra):
+    cache = app.extensions.get("page_cache")
+    if cache is not None:
+        cache.invalidate()
+
+
+def init_app(app):
+    backend_name = app.config.get("PAGE_CACHE_BACKEND", "memory")
+    if backend_name == "sqlite":
+        path = app.config.get("PAGE_CACHE_PATH") or os.path.join(app.instance_path, "page_cache.db")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        backend = SQLiteBackend(path, max_entries=app.config.get("PAGE_CACHE_MAX_ENTRIES", 2048))
+    elif backend_name == "memory":
+        backend = MemoryBackend(
+            max_entries=app.config.get("PAGE_CACHE_MAX_ENTRIES", 512),
+            max_bytes=app.config.get("PAGE_CACHE_MAX_BYTES", 16 * 1024 * 1024),
+        )
+    else:
+        # Backend lain (mis. Redis) cukup punya get/set/generation/bump_generation
+        backend = backend_name
+
+    app.extensions["page_cache"] = PageCache(
+        backend,
+        ttl=app.config.get("PAGE_CACHE_TTL", 60),
+        enabled=app.config.get("PAGE_CACHE_ENABLED", True),
+    )
+    report_saved.connect(_invalidate)
+    reports_deleted.connect(_invalidate)
+    reports_updated.connect(_invalidate)
+    reports_created.connect(_invalidate)
@@ -0,0 +1,68 @@
+from datetime import datetime, timezone
+from sqlalchemy import event, select
+from app.database import dialect_insert
+from app.models import db, DataVersion, Report, SavedSearch
+
+# Tabel yang dilacak: model -> nama baris di data_version
+# saved_search: index notifikasi di tiap worker diperbarui kalau versinya berubah
+TRACKED = {Report: "report", SavedSearch: "saved_search"}
+
+
+def _upsert(name):
+    insert = dialect_insert(db.session.get_bind().dialect.name)
+    table = DataVersion.__table__
+    now = datetime.now(timezone.utc)
+    return insert(table).values(name=name, version=1, updated_at=now).on_conflict_do_update(
+        index_elements=["name"],
+        set_={"version": table.c.version + 1, "updated_at": now},
+    )
+
+
+def _bump(session, names):
+    connection = session.connection()
+    for name in sorted(names):
+        connection.execute(_upsert(name))
+
+
+def _after_flush(session, flush_context):
+    # Perubahan lewat unit of work (add / edit / delete objek)
+    changed = {
+        TRACKED[type(obj)] for obj in (*session.new, *session.dirty, *session.deleted)
+        if type(obj) in TRACKED
+    }
+    if changed:
+        _bump(session, changed)
+
+
+def _do_orm_execute(state):
+    # INSERT/UPDATE/DELETE massal (session.execute(delete(Report)...), seeding, moderasi)
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return None
+    mapper = state.bind_mapper
+    name = TRACKED.get(mapper.class_) if mapper is not None else None
+    if name is None:
+        return None
+    result = state.invoke_statement()
+    _bump(state.session, {name})
+    return result
+
+
+def current(name="report"):
+    """(version, updated_at) terakhir yang sudah di-commit. Satu lookup primary key."""
+    row = db.session.execute(
+        select(DataVersion.version, DataVersion.updated_at).where(DataVersion.name == name)
+    ).first()
+    if row is None:
+        return 0, None
+    updated_at = row.updated_at
+    if updated_at is not None and updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    return row.version, updated_at
+
+
+def init_app(app):
+    # Listener dipasang di kelas session (global), jadi cukup sekali per proses
+    session_class = db.session.session_factory.class_
+    if not event.contains(session_class, "after_flush", _after_flush):
+        event.listen(session_class, "after_flush", _after_flush)
+        event.listen(session_class, "do_orm_execute", _do_orm_execute)
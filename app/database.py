@@ -0,0 +1,84 @@
+from sqlalchemy import event
+from app import db
+
+# PRAGMA untuk setiap koneksi SQLite baru. Bisa ditimpa lewat config SQLITE_PRAGMAS.
+DEFAULT_SQLITE_PRAGMAS = {
+    # Paling awal: hanya berlaku untuk database baru (sebelum ada tabel); ruang
+    # bekas arsip dikembalikan lewat PRAGMA incremental_vacuum (app/archive.py)
+    "auto_vacuum": "INCREMENTAL",
+    # Pembaca tidak pernah menunggu penulis (dan sebaliknya)
+    "journal_mode": "WAL",
+    # Tunggu lock maksimal 5 detik, bukan langsung "database is locked"
+    "busy_timeout": 5000,
+    # Aman di mode WAL, fsync jauh lebih sedikit
+    "synchronous": "NORMAL",
+    # 128 MB di-mmap, cache halaman 16 MB per koneksi (nilai negatif = KiB)
+    "mmap_size": 128 * 1024 * 1024,
+    "cache_size": -16000,
+    "temp_store": "MEMORY",
+}
+
+
+def normalize_url(url):
+    """DATABASE_URL -> URI SQLAlchemy. postgres:// (format Fly/Heroku) dan postgresql://
+    tanpa driver diarahkan ke psycopg 3."""
+    for prefix in ("postgres://", "postgresql://"):
+        if url.startswith(prefix):
+            return "postgresql+psycopg://" + url[len(prefix):]
+    return url
+
+
+def engine_options(config):
+    """Opsi create_engine untuk PostgreSQL dari config DB_POOL_*; SQLite tidak diubah.
+
+    Satu pool per proses: koneksi maksimal ke server =
+    (DB_POOL_SIZE + DB_POOL_OVERFLOW) x worker gunicorn x jumlah mesin.
+    """
+    uri = config.get("SQLALCHEMY_DATABASE_URI") or ""
+    if not uri.startswith("postgresql"):
+        return {}
+    return {
+        "pool_size": config.get("DB_POOL_SIZE", 5),
+        "max_overflow": config.get("DB_POOL_OVERFLOW", 5),
+        # Tunggu koneksi bebas maksimal sekian detik, lalu error (bukan antre tanpa batas)
+        "pool_timeout": config.get("DB_POOL_TIMEOUT", 10),
+        # Koneksi yang diputus server / proxy (mis. restart, idle timeout) dibuang sebelum dipakai
+        "pool_pre_ping": True,
+        "pool_recycle": config.get("DB_POOL_RECYCLE", 1800),
+        "connect_args": {
+            "connect_timeout": config.get("DB_CONNECT_TIMEOUT", 5),
+            # Kolom DateTime disimpan UTC tanpa zona waktu, sama seperti di SQLite
+            "options": "-c timezone=UTC",
+            "application_name": config.get("DB_APPLICATION_NAME", "lostnfound"),
+        },
+    }
+
+
+def dialect_insert(dialect_name):
+    """insert() yang punya on_conflict_do_update (upsert) untuk dialect ini."""
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+def _apply_sqlite_pragmas(pragmas):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    return on_connect
+
+
+def init_app(app):
+    """Pasang hook koneksi ke engine yang sudah dibuat db.init_app()."""
+    pragmas = {**DEFAULT_SQLITE_PRAGMAS, **app.config.get("SQLITE_PRAGMAS", {})}
+    with app.app_context():
+        engine = db.engine
+        if engine.dialect.name == "sqlite":
+            event.listen(engine, "connect", _apply_sqlite_pragmas(pragmas))
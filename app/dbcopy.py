@@ -0,0 +1,200 @@
+import time
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import create_engine, func, or_, select, text, tuple_
+from sqlalchemy.engine import make_url
+from app.database import dialect_insert, engine_options, normalize_url
+from app.models import db
+
+database_cli = AppGroup("database", help="Salin data ke database lain (mis. SQLite -> PostgreSQL).")
+
+
+# ====================================
+# SUMBER & TARGET
+# ====================================
+def target_engine(url):
+    """Engine ke database target dengan opsi pool yang sama seperti app."""
+    url = normalize_url(url)
+    return create_engine(url, **engine_options({**current_app.config, "SQLALCHEMY_DATABASE_URI": url}))
+
+
+def migrate_target(url):
+    """Skema target dibuat / di-upgrade lewat migrasi, sama seperti `flask db upgrade`."""
+    from flask_migrate import upgrade
+    from app import create_app
+    from app.startup import init_migrate
+
+    target_app = create_app({"SQLALCHEMY_DATABASE_URI": normalize_url(url), "JOBS_WORKERS": 0})
+    with target_app.app_context():
+        init_migrate(target_app)
+        upgrade()
+        db.engine.dispose()
+
+
+def snapshot(engine):
+    """Koneksi baca yang melihat satu snapshot selama seluruh penyalinan."""
+    conn = engine.connect()
+    if engine.dialect.name == "sqlite":
+        # pysqlite tidak membuka transaksi untuk SELECT. Selama snapshot terbuka,
+        # checkpoint WAL tertahan (file -wal membesar), tapi penulis tidak terblokir
+        conn.exec_driver_sql("BEGIN")
+    else:
+        conn = conn.execution_options(isolation_level="REPEATABLE READ")
+    return conn
+
+
+def _pk(table):
+    return list(table.primary_key.columns)
+
+
+# ====================================
+# PENYALINAN
+# ====================================
+def prune_table(source, target, table, batch_size):
+    """Hapus baris target yang sudah tidak ada di sumber. Return jumlahnya."""
+    pk = _pk(table)
+    keys = {tuple(row) for row in source.execute(select(*pk))}
+    stale = [tuple(row) for row in target.execute(select(*pk)) if tuple(row) not in keys]
+    for i in range(0, len(stale), batch_size):
+        target.execute(table.delete().where(tuple_(*pk).in_(stale[i:i + batch_size])))
+        target.commit()
+    return len(stale)
+
+
+def copy_table(source, target, table, batch_size, progress=None):
+    """Upsert semua baris sumber ke target per batch (satu transaksi per batch).
+
+    Baris yang isinya sama tidak ditulis ulang, jadi salinan ulang hanya
+    menulis perubahan sejak salinan sebelumnya. Return jumlah baris dibaca.
+    """
+    pk = _pk(table)
+    others = [c for c in table.columns if not c.primary_key]
+    stmt = dialect_insert(target.dialect.name)(table)
+    if others:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=pk,
+            set_={c.name: stmt.excluded[c.name] for c in others},
+            where=or_(*(c.is_distinct_from(stmt.excluded[c.name]) for c in others)),
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=pk)
+
+    result = source.execute(select(table).order_by(*pk).execution_options(yield_per=batch_size))
+    copied = 0
+    for rows in result.partitions():
+        target.execute(stmt, [dict(row._mapping) for row in rows])
+        target.commit()
+        copied += len(rows)
+        if progress is not None:
+            progress(table.name, copied)
+    return copied
+
+
+# Tabel yang menyimpan id asli tabel lain: sequence-nya tidak boleh mundur di bawah id ini
+SHARED_IDS = {"report": ("report_archive",)}
+
+
+def reset_sequences(target, tables):
+    """Sequence id (SERIAL) PostgreSQL dilanjutkan dari max(id) hasil salinan
+    (untuk report: termasuk id yang sudah dipindah ke report_archive)."""
+    if target.dialect.name != "postgresql":
+        return
+    preparer = target.dialect.identifier_preparer
+    for table in tables:
+        column = table.autoincrement_column
+        if column is None:
+            continue
+        name, quoted = preparer.format_table(table), preparer.quote(column.name)
+        sources = [name] + [preparer.quote(other) for other in SHARED_IDS.get(table.name, ())]
+        highest = ", ".join(f"coalesce((SELECT max({quoted}) FROM {source}), 0)" for source in sources)
+        target.execute(
+            text(f"SELECT setval(pg_get_serial_sequence(:table, :column), "
+                 f"greatest({highest}) + 1, false)"),
+            {"table": name, "column": column.name},
+        )
+    target.commit()
+
+
+def count_rows(conn, table):
+    return conn.scalar(select(func.count()).select_from(table))
+
+
+def copy_database(source_engine, target, batch_size=1000, echo=None):
+    """Samakan isi target dengan satu snapshot sumber. Return [(tabel, sumber, target)]
+    untuk tabel yang jumlah barisnya tidak cocok (kosong = sukses)."""
+    echo = echo or (lambda *args, **kwargs: None)
+    tables = db.metadata.sorted_tables
+
+    with snapshot(source_engine) as source, target.connect() as target_conn:
+        # Hapus dulu (anak sebelum induk, karena foreign key), baru upsert (induk dulu)
+        for table in reversed(tables):
+            removed = prune_table(source, target_conn, table, batch_size)
+            if removed:
+                echo(f"  {table.name}: {removed} baris dihapus dari target")
+
+        def progress(name, copied):
+            echo(f"\r  {name}: {copied} baris...", nl=False)
+
+        for table in tables:
+            started = time.perf_counter()
+            copied = copy_table(source, target_conn, table, batch_size, progress)
+            echo(f"\r  {table.name}: {copied} baris ({time.perf_counter() - started:.1f} detik)")
+
+        reset_sequences(target_conn, tables)
+        counts = [(table.name, count_rows(source, table), count_rows(target_conn, table)) for table in tables]
+    return [(name, expected, actual) for name, expected, actual in counts if expected != actual]
+
+
+# ====================================
+# CLI
+# ====================================
+@database_cli.command("copy")
+@click.argument("target_url", envvar="COPY_TARGET_URL")
+@click.option("--batch-size", type=int, default=1000, show_default=True)
+@click.option("--skip-migrate", is_flag=True, help="Skema target sudah up to date.")
+@click.option("--yes", is_flag=True, help="Tanpa konfirmasi.")
+def copy_command(target_url, batch_size, skip_migrate, yes):
+    """Salin database app (mis. SQLite) ke TARGET_URL (mis. postgresql://user@host/db).
+
+    App boleh tetap berjalan: data dibaca dari satu snapshot dan disalin per
+    batch. Perintah ini bisa diulang; salinan berikutnya hanya menulis
+    perubahan dan menghapus baris yang sudah dihapus di sumber. Pindah:
+
+    \b
+      1. flask database copy URL          (app tetap jalan, salinan awal)
+      2. hentikan penulisan (mis. fly scale count 0), ulangi langkah 1
+      3. set DATABASE_URL=URL, jalankan app lagi
+
+    Target DITIMPA supaya sama dengan sumber; jangan jalankan ke database
+    yang sudah dipakai app.
+    """
+    url = normalize_url(target_url)
+    source_engine = db.engine
+    if make_url(url) == source_engine.url:
+        raise click.UsageError("Target sama dengan database app.")
+    target = target_engine(url)
+    display = target.url.render_as_string(hide_password=True)
+    if not yes:
+        click.confirm(f"Isi {display} akan disamakan dengan {source_engine.url.render_as_string()}. Lanjut?",
+                      abort=True)
+
+    if not skip_migrate:
+        click.echo("Migrasi skema target...")
+        migrate_target(url)
+
+    started = time.perf_counter()
+    try:
+        mismatched = copy_database(source_engine, target, batch_size, echo=click.echo)
+    finally:
+        target.dispose()
+    for name, expected, actual in mismatched:
+        click.echo(f"  {name}: sumber {expected}, target {actual}", err=True)
+    if mismatched:
+        click.echo(f"{len(mismatched)} tabel tidak cocok.", err=True)
+        raise SystemExit(1)
+    click.echo(f"Selesai dalam {time.perf_counter() - started:.1f} detik; semua tabel cocok.")
+
+
+def init_app(app):
+    app.cli.add_command(database_cli)
@@ -0,0 +1,168 @@
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import case, func, select
+from app import search
+from app.models import db, Report
+from app.moderation import REPORT_TYPES, STATUSES
+
+# Rentang tanggal: (kode di URL, label, umur maksimum laporan)
+DATE_RANGES = (
+    ("1d", "24 jam terakhir", timedelta(days=1)),
+    ("7d", "7 hari terakhir", timedelta(days=7)),
+    ("30d", "30 hari terakhir", timedelta(days=30)),
+)
+TOP_LOCATIONS = 10
+
+
+class Filters:
+    """Filter facet dari query string: ?report_type=lost&status=...&location=...&since=7d.
+
+    Nilai yang tidak dikenal diabaikan, jadi URL rusak tetap menampilkan feed.
+    """
+
+    NAMES = ("report_type", "status", "location", "since")
+
+    def __init__(self, report_type=None, status=None, location=None, since=None):
+        self.report_type = report_type if report_type in REPORT_TYPES else None
+        self.status = status if status in STATUSES else None
+        self.location = (location or "").strip()[:100] or None
+        self.since = since if since in {code for code, _, _ in DATE_RANGES} else None
+
+    @classmethod
+    def from_args(cls, args):
+        return cls(**{name: args.get(name) for name in cls.NAMES})
+
+    def params(self, **override):
+        """Query string untuk url_for; override name=None membuang filter itu."""
+        values = {name: getattr(self, name) for name in self.NAMES}
+        values.update(override)
+        return {name: value for name, value in values.items() if value}
+
+    def toggle(self, name, value):
+        """Params untuk link opsi facet: klik lagi opsi yang aktif = lepas filter."""
+        return self.params(**{name: None if getattr(self, name) == value else value})
+
+    def key(self):
+        return tuple(getattr(self, name) or "" for name in self.NAMES)
+
+    def __bool__(self):
+        return any(getattr(self, name) for name in self.NAMES)
+
+    def clauses(self, now=None):
+        """Daftar kondisi WHERE; semuanya bisa dilayani index (lihat Report.__table_args__)."""
+        clauses = []
+        if self.report_type:
+            clauses.append(Report.report_type == self.report_type)
+        if self.status:
+            clauses.append(Report.status == self.status)
+        if self.location:
+            clauses.append(Report.location == self.location)
+        if self.since:
+            age = next(delta for code, _, delta in DATE_RANGES if code == self.since)
+            since = _now(now) - age
+            clauses.append(Report.created_at >= since)
+            # Batas bawah id (selalu benar untuk baris yang lolos filter tanggal) supaya
+            # feed urut id DESC membaca range rowid, bukan scan seluruh tabel.
+            # "id + 0": tanpa itu SQLite mencari MIN lewat urutan rowid dari awal tabel,
+            # bukan lewat ix_report_created_at
+            first_id = select(func.min(Report.id + 0)).where(Report.created_at >= since).scalar_subquery()
+            clauses.append(Report.id >= first_id)
+        return clauses
+
+
+def _now(now=None):
+    # created_at disimpan UTC tanpa tzinfo
+    return (now or datetime.now(timezone.utc)).replace(tzinfo=None)
+
+
+# ====================================
+# HITUNGAN FACET
+# ====================================
+class Facets:
+    """Hitungan per opsi untuk hasil yang sedang tampil: daftar (nilai, jumlah) per facet."""
+
+    def __init__(self, report_type, status, location, since, total):
+        self.report_type = report_type
+        self.status = status
+        self.location = location
+        self.since = since    # (kode, label, jumlah)
+        self.total = total
+
+
+def _grouped(clauses, now):
+    # Umur laporan dipetakan ke bucket DATE_RANGES (0 = paling baru, len = lebih lama)
+    bucket = case(
+        *[(Report.created_at >= now - delta, i) for i, (_, _, delta) in enumerate(DATE_RANGES)],
+        else_=len(DATE_RANGES),
+    )
+    stmt = (
+        select(Report.report_type, Report.status, Report.location, bucket, func.count())
+        .where(*clauses)
+        .group_by(Report.report_type, Report.status, Report.location, bucket)
+    )
+    return db.session.execute(stmt).all()
+
+
+def facet_counts(filters, query=None, now=None):
+    """Semua hitungan facet untuk (kata kunci + filter) dengan satu query GROUP BY.
+
+    Disjunctive faceting: hitungan tiap facet memakai semua filter aktif
+    KECUALI filter facet itu sendiri, jadi setelah memilih satu lokasi,
+    lokasi lain tetap menunjukkan jumlahnya dan bisa dipilih sebagai ganti.
+    Karena itu filter facet tidak dipasang di WHERE; jumlah baris hasil =
+    kombinasi (jenis, status, lokasi, bucket tanggal), bukan jumlah laporan,
+    dan filternya diterapkan di Python.
+    """
+    now = _now(now)
+    try:
+        rows = _grouped([search.search_condition(query)] if query else [], now)
+    except search.FTS_ERRORS:
+        if not query:
+            raise
+        # Index teks tidak ada: sama seperti search_reports, turun ke ilike
+        db.session.rollback()
+        search.mark_fts_unavailable()
+        rows = _grouped([search.search_condition(query)], now)
+
+    # Bucket 0..i = lebih baru dari DATE_RANGES[i]
+    since_bucket = next((i for i, (code, _, _) in enumerate(DATE_RANGES) if code == filters.since), None)
+    wanted = {name: getattr(filters, name) for name in ("report_type", "status", "location")
+              if getattr(filters, name)}
+
+    types, statuses, locations, buckets = Counter(), Counter(), Counter(), Counter()
+    total = 0
+    for report_type, status, location, bucket, n in rows:
+        values = {"report_type": report_type, "status": status, "location": location}
+        failed = {name for name, value in wanted.items() if values[name] != value}
+        if since_bucket is not None and bucket > since_bucket:
+            failed.add("since")
+        if len(failed) > 1:
+            continue
+        # Lolos semua filter, atau hanya gagal di filter facet yang sedang dihitung
+        if not failed:
+            total += n
+        if failed <= {"report_type"}:
+            types[report_type] += n
+        if failed <= {"status"}:
+            statuses[status] += n
+        if failed <= {"location"}:
+            locations[location] += n
+        if failed <= {"since"}:
+            buckets[bucket] += n
+
+    top = [loc for loc, _ in locations.most_common(TOP_LOCATIONS)]
+    if filters.location and filters.location not in top:
+        top.append(filters.location)
+
+    since, cumulative = [], 0
+    for i, (code, label, _) in enumerate(DATE_RANGES):
+        cumulative += buckets[i]
+        since.append((code, label, cumulative))
+
+    return Facets(
+        report_type=[(t, types[t]) for t in REPORT_TYPES],
+        status=[(s, statuses[s]) for s in STATUSES],
+        location=[(loc, locations[loc]) for loc in top],
+        since=since,
+        total=total,
+    )
@@ -0,0 +1,74 @@
+import json
+import os
+import threading
+import time
+from flask import current_app
+
+DISCOVERY_URL = "https://accounts.google.com/.well-known/openid-configuration"
+
+_lock = threading.Lock()
+
+
+def _load_cached_metadata(path, ttl):
+    try:
+        if time.time() - os.path.getmtime(path) > ttl:
+            return None
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_metadata(path, metadata):
+    data = {k: v for k, v in metadata.items() if not k.startswith("_") and k != "jwks"}
+    tmp = f"{path}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    except OSError:
+        current_app.logger.warning("Gagal menyimpan cache discovery Google di %s", path)
+
+
+def _prime_metadata(app, client):
+    """Dokumen discovery OpenID dibaca dari cache di disk; hanya diunduh kalau basi."""
+    path = app.config["GOOGLE_DISCOVERY_CACHE"]
+    cached = _load_cached_metadata(path, app.config.get("GOOGLE_DISCOVERY_TTL", 86400))
+    if cached is not None:
+        client.server_metadata.update(cached)
+        # Penanda authlib bahwa metadata sudah dimuat (tidak fetch ulang)
+        client.server_metadata["_loaded_at"] = time.time()
+        return
+    _save_metadata(path, client.load_server_metadata())
+
+
+def google():
+    """Client OAuth Google, dibuat saat pertama dipakai.
+
+    Authlib (dan requests) baru diimport di sini, jadi boot aplikasi dan
+    request yang tidak login lewat Google tidak ikut membayar biayanya.
+    """
+    app = current_app._get_current_object()
+    client = app.extensions.get("google_oauth")
+    if client is not None:
+        return client
+
+    with _lock:
+        client = app.extensions.get("google_oauth")
+        if client is None:
+            from authlib.integrations.flask_client import OAuth
+
+            oauth = OAuth(app)
+            client = oauth.register(
+                name="google",
+                client_id=app.config.get("GOOGLE_CLIENT_ID"),
+                client_secret=app.config.get("GOOGLE_CLIENT_SECRET"),
+                server_metadata_url=DISCOVERY_URL,
+                client_kwargs={
+                    "scope": "openid email profile"
+                }
+            )
+            _prime_metadata(app, client)
+            app.extensions["google_oauth"] = client
+    return client
@@ -0,0 +1,210 @@
+import os
+import time
+import click
+from flask import current_app, url_for
+from flask.cli import AppGroup
+from app import jobs
+from app.assets import is_content_hashed
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # Pillow opsional: tanpa Pillow foto disajikan apa adanya
+    Image = None
+
+# Isi file tidak bisa dibaca sebagai gambar (rusak, terpotong, atau terlalu besar)
+DECODE_ERRORS = (OSError,) if Image is None else (OSError, Image.DecompressionBombError)
+
+# Lebar maksimum tiap turunan (px). Nama file: <stem>_<size>.<ext>
+SIZES = {"thumb": 480, "md": 1080}
+
+# Ekstensi yang bisa diproses
+SOURCE_EXTENSIONS = {"jpg", "jpeg", "png", "webp", "gif", "bmp"}
+
+images_cli = AppGroup("images", help="Kelola turunan foto laporan.")
+
+
+def enabled():
+    return Image is not None
+
+
+def output_format():
+    fmt = current_app.config.get("IMAGE_FORMAT", "webp").lower()
+    if fmt == "webp" and not features.check("webp"):
+        fmt = "jpeg"
+    return fmt
+
+
+def derivative_name(filename, size, fmt):
+    stem = filename.rsplit(".", 1)[0]
+    ext = "jpg" if fmt == "jpeg" else fmt
+    return f"{stem}_{size}.{ext}"
+
+
+def is_derivative(filename):
+    stem = filename.rsplit(".", 1)[0]
+    return any(stem.endswith(f"_{size}") for size in SIZES)
+
+
+def derivative_names(filename):
+    """Semua kemungkinan nama turunan (webp & jpg) untuk satu foto."""
+    return [derivative_name(filename, size, fmt) for size in SIZES for fmt in ("webp", "jpeg")]
+
+
+# ====================================
+# PROSES GAMBAR
+# ====================================
+def _save_atomic(image, path, fmt, **params):
+    tmp = f"{path}.tmp"
+    image.save(tmp, format=fmt.upper(), **params)
+    os.replace(tmp, path)
+
+
+def _without_exif(source):
+    """(gambar tanpa EXIF dengan orientasi kamera sudah diterapkan, EXIF-nya ada?)"""
+    has_exif = bool(source.getexif())
+    image = ImageOps.exif_transpose(source)
+    image.load()
+    if has_exif and source.format == "JPEG" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    return image, has_exif
+
+
+def strip_metadata(path):
+    """Buang EXIF dari foto di path (ditulis ulang di tempat). Return True kalau isinya berubah.
+    Raise salah satu DECODE_ERRORS kalau file tidak bisa dibaca.
+
+    Dipanggil saat ingest, sebelum file diberi nama sha256 isinya: foto HP
+    sering menyimpan koordinat GPS, dan file bernama hash tidak boleh
+    berubah lagi setelah disajikan (cache immutable).
+    """
+    if not enabled():
+        return False
+    with Image.open(path) as source:
+        source_format = source.format
+        if source_format not in ("JPEG", "PNG", "WEBP"):
+            return False
+        image, has_exif = _without_exif(source)
+    if not has_exif:
+        return False
+    _save_atomic(image, path, source_format, quality=90)
+    return True
+
+
+def process_image(directory, filename, fmt="webp", quality=80):
+    """Buat turunan thumb & md dari foto asli.
+
+    Foto asli bernama sha256 sudah bersih dari EXIF sejak ingest dan tidak
+    pernah ditulis ulang; hanya file lama (nama uuid) yang dibersihkan di sini.
+    """
+    path = os.path.join(directory, filename)
+    if not is_content_hashed(filename):
+        strip_metadata(path)
+    with Image.open(path) as source:
+        image, _ = _without_exif(source)
+
+    if fmt == "jpeg" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    elif image.mode not in ("RGB", "RGBA", "L"):
+        image = image.convert("RGBA")
+
+    for size, width in SIZES.items():
+        derivative = image.copy()
+        if derivative.width > width:
+            height = round(derivative.height * width / derivative.width)
+            derivative = derivative.resize((width, height), Image.LANCZOS)
+        _save_atomic(derivative, os.path.join(directory, derivative_name(filename, size, fmt)),
+                     fmt, quality=quality, optimize=True)
+
+
+@jobs.handler("images.derive")
+def _derive(payload):
+    filename = payload["filename"]
+    directory = current_app.config["UPLOAD_FOLDER"]
+    if not os.path.exists(os.path.join(directory, filename)):
+        return    # sudah dihapus sebelum job sempat jalan
+    started = time.perf_counter()
+    process_image(directory, filename, output_format(),
+                  current_app.config.get("IMAGE_QUALITY", 80))
+    metrics = current_app.extensions.get("metrics")
+    if metrics is not None:
+        metrics.observe("lostnfound_image_process_seconds", time.perf_counter() - started)
+
+
+def schedule(filename):
+    """Antrekan pembuatan turunan foto; jalan di worker job setelah commit."""
+    if not enabled() or not filename:
+        return
+    if filename.rsplit(".", 1)[-1].lower() not in SOURCE_EXTENSIONS:
+        return
+    jobs.enqueue("images.derive", {"filename": filename}, key=f"images:{filename}")
+
+
+def remove_derivatives(directory, filename):
+    for name in derivative_names(filename):
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+# ====================================
+# TEMPLATE HELPERS
+# ====================================
+def _existing(filename, size):
+    directory = current_app.config["UPLOAD_FOLDER"]
+    for fmt in ("webp", "jpeg"):
+        name = derivative_name(filename, size, fmt)
+        if os.path.exists(os.path.join(directory, name)):
+            return name
+    return None
+
+
+def upload_src(filename, size="thumb"):
+    """URL turunan kalau sudah jadi, kalau belum URL foto asli."""
+    name = _existing(filename, size) or filename
+    return url_for("main_bp.uploaded_file", filename=name)
+
+
+def upload_srcset(filename):
+    entries = []
+    for size, width in SIZES.items():
+        name = _existing(filename, size)
+        if name:
+            entries.append(f"{url_for('main_bp.uploaded_file', filename=name)} {width}w")
+    return ", ".join(entries)
+
+
+# ====================================
+# CLI
+# ====================================
+@images_cli.command("backfill")
+@click.option("--force", is_flag=True, help="Buat ulang walaupun turunan sudah ada.")
+def backfill(force):
+    """Buat turunan untuk semua foto lama di UPLOAD_FOLDER."""
+    if not enabled():
+        raise click.ClickException("Pillow belum terpasang.")
+
+    directory = current_app.config["UPLOAD_FOLDER"]
+    fmt = output_format()
+    done = skipped = failed = 0
+    for filename in sorted(os.listdir(directory)):
+        if is_derivative(filename) or filename.rsplit(".", 1)[-1].lower() not in SOURCE_EXTENSIONS:
+            continue
+        if not force and all(
+            os.path.exists(os.path.join(directory, derivative_name(filename, size, fmt)))
+            for size in SIZES
+        ):
+            skipped += 1
+            continue
+        try:
+            process_image(directory, filename, fmt, current_app.config.get("IMAGE_QUALITY", 80))
+            done += 1
+        except Exception as exc:
+            failed += 1
+            click.echo(f"  gagal: {filename} ({exc})", err=True)
+
+    click.echo(f"Selesai: {done} diproses, {skipped} dilewati, {failed} gagal.")
+
+
+def init_app(app):
+    app.jinja_env.globals.update(upload_src=upload_src, upload_srcset=upload_srcset)
+    app.cli.add_command(images_cli)
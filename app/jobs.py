@@ -0,0 +1,438 @@
+import atexit
+import json
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta, timezone
+import click
+from flask import current_app, has_app_context
+from flask.cli import AppGroup
+from sqlalchemy import and_, delete, event, func, or_, select, update
+from app.database import dialect_insert
+from app.models import db, Job
+
+jobs_cli = AppGroup("jobs", help="Antrean pekerjaan background.")
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+# Job selesai dibersihkan paling sering sekali per interval ini (detik)
+PRUNE_INTERVAL = 3600
+ERROR_LENGTH = 2000
+
+_handlers = {}    # nama job -> (fungsi(payload), max_attempts | None)
+_start_hooks = []  # fungsi() yang dijalankan sekali saat pool worker mulai
+
+
+def handler(name, max_attempts=None):
+    """Daftarkan fungsi(payload) sebagai pelaksana job `name`.
+
+    Fungsi dijalankan di app context worker dan boleh dijalankan lebih dari
+    sekali (retry, lease kedaluwarsa), jadi harus idempoten. Exception = retry.
+    """
+    def decorator(func):
+        _handlers[name] = (func, max_attempts)
+        return func
+    return decorator
+
+
+def on_worker_start(func):
+    """Jalankan func() (di app context) setiap kali pool worker mulai, mis. untuk
+    menjadwalkan job berkala yang menjadwalkan ulang dirinya sendiri."""
+    _start_hooks.append(func)
+    return func
+
+
+def _now():
+    # Disimpan UTC tanpa tzinfo, sama seperti created_at laporan
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+# ====================================
+# ENQUEUE
+# ====================================
+def enqueue(name, payload=None, key=None, delay=0, session=None):
+    """Masukkan job ke antrean, di transaksi yang sedang berjalan.
+
+    Job baru terlihat oleh worker setelah pemanggil commit: perubahan data
+    dan pekerjaan lanjutannya tersimpan (atau batal) bersama, dan tidak ada
+    celah di mana data sudah commit tapi job-nya hilang karena proses mati.
+
+    key (idempotency key): selama job dengan key yang sama masih antre,
+    enqueue berikutnya diabaikan. Kalau job itu sedang jalan / sudah
+    selesai / gagal, job-nya dijadwalkan ulang dengan payload baru.
+    """
+    if name not in _handlers:
+        raise LookupError(f"Job {name!r} belum didaftarkan")
+    session = session or db.session
+    now = _now()
+    connection = session.connection()
+    table = Job.__table__
+    stmt = dialect_insert(connection.dialect.name)(table).values(
+        name=name,
+        payload=json.dumps(payload or {}, sort_keys=True),
+        idempotency_key=key,
+        status=QUEUED,
+        attempts=0,
+        max_attempts=_handlers[name][1] or current_app.config.get("JOBS_MAX_ATTEMPTS", 5),
+        run_at=now + timedelta(seconds=delay),
+        created_at=now,
+    )
+    if key is not None:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["idempotency_key"],
+            set_={
+                **{c: stmt.excluded[c] for c in
+                   ("name", "payload", "status", "attempts", "max_attempts", "run_at", "created_at")},
+                # locked_by dikosongkan: worker yang masih menjalankan versi lama
+                # tidak akan menandainya selesai (lihat _finish)
+                "locked_by": None, "locked_until": None, "last_error": None, "finished_at": None,
+            },
+            where=table.c.status != QUEUED,
+        )
+    connection.execute(stmt)
+    session.info["jobs_enqueued"] = True
+
+
+def _after_commit(session):
+    # Bangunkan worker proses ini; worker proses lain menemukannya lewat polling
+    if session.info.pop("jobs_enqueued", False) and has_app_context():
+        worker = current_app.extensions.get("jobs")
+        if worker is not None:
+            worker.wake()
+
+
+def _after_rollback(session):
+    session.info.pop("jobs_enqueued", None)
+
+
+# ====================================
+# CLAIM & EKSEKUSI
+# ====================================
+def _claimable(now):
+    return or_(
+        and_(Job.status == QUEUED, Job.run_at <= now),
+        # Lease lewat: worker-nya mati / mesin berhenti di tengah job
+        and_(Job.status == RUNNING, Job.locked_until < now),
+    )
+
+
+def claim(worker_id, lease):
+    """Ambil satu job yang siap jalan, atau None.
+
+    Kandidat dicari dengan SELECT biasa supaya worker yang menganggur tidak
+    pernah memegang lock tulis SQLite; UPDATE ... RETURNING mengulang
+    syaratnya, jadi satu job tidak bisa diambil dua worker sekaligus.
+    """
+    while True:
+        now = _now()
+        job_id = db.session.scalar(
+            select(Job.id).where(_claimable(now)).order_by(Job.run_at).limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        if job_id is None:
+            db.session.rollback()
+            return None
+        job = db.session.execute(
+            update(Job).where(Job.id == job_id, _claimable(now))
+            .values(status=RUNNING, locked_by=worker_id, attempts=Job.attempts + 1,
+                    locked_until=now + timedelta(seconds=lease))
+            .returning(Job.id, Job.name, Job.payload, Job.attempts, Job.max_attempts),
+            execution_options={"synchronize_session": False},
+        ).first()
+        db.session.commit()
+        if job is not None:
+            return job
+        # Kalah cepat dengan worker lain: cari kandidat berikutnya
+
+
+def backoff(attempts, base, cap):
+    """Jeda sebelum percobaan berikutnya: eksponensial dengan jitter."""
+    delay = min(cap, base * 2 ** (attempts - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def _finish(job, worker_id, **values):
+    db.session.execute(
+        update(Job).where(Job.id == job.id, Job.locked_by == worker_id)
+        .values(locked_by=None, locked_until=None, **values),
+        execution_options={"synchronize_session": False},
+    )
+    db.session.commit()
+
+
+def run(job, worker_id):
+    """Jalankan job yang sudah di-claim. Return "done", "retry", atau "failed"."""
+    app = current_app._get_current_object()
+    func = _handlers.get(job.name, (None, None))[0]
+    started = time.perf_counter()
+    try:
+        if func is None:
+            raise LookupError(f"Job {job.name!r} belum didaftarkan")
+        func(json.loads(job.payload))
+    except Exception:
+        db.session.rollback()
+        error = traceback.format_exc()[-ERROR_LENGTH:]
+        if job.attempts >= job.max_attempts:
+            outcome = FAILED
+            app.logger.error("Job %s #%s gagal permanen setelah %d percobaan:\n%s",
+                             job.name, job.id, job.attempts, error)
+            _finish(job, worker_id, status=FAILED, last_error=error, finished_at=_now())
+        else:
+            outcome = "retry"
+            delay = backoff(job.attempts, app.config.get("JOBS_BACKOFF_SECONDS", 10),
+                            app.config.get("JOBS_BACKOFF_MAX_SECONDS", 3600))
+            app.logger.warning("Job %s #%s gagal (percobaan %d), diulang dalam %.0f detik: %s",
+                               job.name, job.id, job.attempts, delay, error.strip().splitlines()[-1])
+            _finish(job, worker_id, status=QUEUED, last_error=error,
+                    run_at=_now() + timedelta(seconds=delay))
+    else:
+        outcome = DONE
+        _finish(job, worker_id, status=DONE, last_error=None, finished_at=_now())
+
+    metrics = app.extensions.get("metrics")
+    if metrics is not None:
+        metrics.inc("lostnfound_jobs_total", job=job.name, outcome=outcome)
+        metrics.observe("lostnfound_job_duration_seconds", time.perf_counter() - started, job=job.name)
+    return outcome
+
+
+def prune(keep_days):
+    """Hapus job selesai yang lebih tua dari keep_days. Job gagal disimpan untuk diperiksa."""
+    result = db.session.execute(
+        delete(Job).where(Job.status == DONE,
+                          Job.finished_at < _now() - timedelta(days=keep_days)),
+        execution_options={"synchronize_session": False},
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+# ====================================
+# WORKER
+# ====================================
+def _boot_id():
+    try:
+        with open("/proc/sys/kernel/random/boot_id") as f:
+            return f.read().strip()[:8]
+    except OSError:    # bukan Linux: andalkan lease saja
+        return None
+
+
+def reclaim(host, boot_id):
+    """Kembalikan ke antrean job yang dipegang mesin ini sebelum boot terakhir.
+
+    Mesin Fly yang di-auto-stop bisa berhenti di tengah job; setelah start
+    lagi, job itu langsung diulang tanpa menunggu lease-nya habis.
+    """
+    if boot_id is None:
+        return 0
+    result = db.session.execute(
+        update(Job).where(Job.status == RUNNING, Job.locked_by.like(f"{host}:%"),
+                          Job.locked_by.notlike(f"{host}:{boot_id}:%"))
+        .values(status=QUEUED, locked_by=None, locked_until=None),
+        execution_options={"synchronize_session": False},
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+class Worker:
+    """Thread pool yang mengambil job dari database.
+
+    Di proses web dimulai lewat start_worker() dari post_worker_init gunicorn
+    (dan run.py), jadi CLI dan master gunicorn tidak ikut menjalankan job;
+    `flask jobs work` memakai kelas yang sama sebagai proses terpisah.
+    """
+
+    def __init__(self, app, threads=2, poll=5.0, lease=300, keep_days=7):
+        self.app = app
+        self.threads = threads
+        self.poll = poll
+        self.lease = lease
+        self.keep_days = keep_days
+        self.host = socket.gethostname()
+        self.boot_id = _boot_id()
+        self.id = f"{self.host}:{self.boot_id or '-'}:{os.getpid()}"
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._pruned = 0.0
+
+    @property
+    def started(self):
+        return bool(self._threads)
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.threads):
+                thread = threading.Thread(target=self._loop, args=(f"{self.id}:{i}",),
+                                          name=f"jobs-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        atexit.register(self.stop, self.app.config.get("JOBS_SHUTDOWN_SECONDS", 10))
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self, timeout=None):
+        """Berhenti mengambil job baru dan tunggu job yang sedang jalan.
+
+        Job yang belum selesai saat timeout tetap berstatus running dan
+        diulang setelah lease-nya habis (atau saat boot berikutnya).
+        """
+        self._stop.set()
+        self._wake.set()
+        deadline = time.monotonic() + (timeout or 0)
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()) if timeout is not None else None)
+
+    def _maybe_prune(self):
+        now = time.monotonic()
+        if now - self._pruned < PRUNE_INTERVAL:
+            return
+        self._pruned = now
+        prune(self.keep_days)
+
+    def _on_start(self):
+        # Di thread worker, bukan di request pertama yang memulai pool
+        with self.app.app_context():
+            try:
+                reclaimed = reclaim(self.host, self.boot_id)
+                if reclaimed:
+                    self.app.logger.info("%d job dari boot sebelumnya diantrekan ulang", reclaimed)
+                for hook in _start_hooks:
+                    hook()
+            except Exception:
+                db.session.rollback()
+                self.app.logger.exception("Persiapan worker job gagal")
+
+    def _loop(self, worker_id):
+        if worker_id.endswith(":0"):
+            self._on_start()
+        while not self._stop.is_set():
+            try:
+                with self.app.app_context():
+                    job = claim(worker_id, self.lease)
+                    if job is not None:
+                        run(job, worker_id)
+                        continue
+                    self._maybe_prune()
+            except Exception:
+                self.app.logger.exception("Worker job gagal")
+            self._wake.wait(self.poll)
+            self._wake.clear()
+
+
+def start_worker(app):
+    """Mulai pool worker job di proses ini, kalau JOBS_WORKERS > 0.
+
+    Dipanggil eksplisit dari post_worker_init gunicorn dan run.py. Proses
+    lain yang memakai test client (audit, warm-up, bench) tidak pernah
+    memulainya, jadi tidak ada query job yang bercampur dengan request.
+    """
+    worker = app.extensions.get("jobs")
+    if worker is not None and not worker.started:
+        worker.start()
+
+
+# ====================================
+# CLI
+# ====================================
+@jobs_cli.command("work")
+@click.option("--threads", type=int, help="Jumlah thread (default JOBS_WORKERS, minimal 1).")
+@click.option("--once", is_flag=True, help="Jalankan semua job yang sudah siap, lalu keluar.")
+def work_command(threads, once):
+    """Jalankan worker job sebagai proses terpisah."""
+    app = current_app._get_current_object()
+    if once:
+        worker_id = f"{socket.gethostname()}:cli:{os.getpid()}"
+        outcomes = []
+        while (job := claim(worker_id, app.config.get("JOBS_LEASE_SECONDS", 300))) is not None:
+            outcomes.append(run(job, worker_id))
+        click.echo(f"{len(outcomes)} job dijalankan, {outcomes.count(DONE)} berhasil.")
+        return
+
+    worker = Worker(
+        app,
+        threads=threads or max(1, app.config.get("JOBS_WORKERS", 2)),
+        poll=app.config.get("JOBS_POLL_SECONDS", 5.0),
+        lease=app.config.get("JOBS_LEASE_SECONDS", 300),
+        keep_days=app.config.get("JOBS_KEEP_DAYS", 7),
+    )
+    app.extensions["jobs"] = worker
+    worker.start()
+    click.echo(f"Worker {worker.id} jalan dengan {worker.threads} thread. Ctrl+C untuk berhenti.")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        click.echo("Menunggu job yang sedang jalan...")
+        worker.stop(app.config.get("JOBS_SHUTDOWN_SECONDS", 10))
+
+
+@jobs_cli.command("status")
+@click.option("--errors", default=5, show_default=True, help="Jumlah job gagal terakhir yang ditampilkan.")
+def status_command(errors):
+    """Jumlah job per nama dan status, plus error terakhir."""
+    rows = db.session.execute(
+        select(Job.name, Job.status, func.count(), func.min(Job.run_at))
+        .group_by(Job.name, Job.status).order_by(Job.name, Job.status)
+    ).all()
+    if not rows:
+        click.echo("Antrean kosong.")
+    now = _now()
+    for name, status, count, run_at in rows:
+        extra = ""
+        if status == QUEUED and run_at is not None:
+            extra = f" (tertua {max(0, (now - run_at).total_seconds()):.0f} detik lewat jadwal)" \
+                if run_at <= now else f" (berikutnya dalam {(run_at - now).total_seconds():.0f} detik)"
+        click.echo(f"  {name:<20} {status:<8} {count}{extra}")
+
+    failed = db.session.scalars(
+        select(Job).where(Job.status == FAILED).order_by(Job.finished_at.desc()).limit(errors)
+    ).all()
+    for job in failed:
+        last_line = (job.last_error or "").strip().splitlines()[-1:] or [""]
+        click.echo(f"  gagal #{job.id} {job.name} x{job.attempts}: {last_line[0]}")
+
+
+@jobs_cli.command("retry")
+@click.argument("job_ids", nargs=-1, type=int)
+def retry_command(job_ids):
+    """Antrekan ulang job yang gagal (semua, atau hanya JOB_IDS)."""
+    condition = Job.status == FAILED
+    if job_ids:
+        condition = and_(condition, Job.id.in_(job_ids))
+    result = db.session.execute(
+        update(Job).where(condition)
+        .values(status=QUEUED, attempts=0, run_at=_now(), finished_at=None),
+        execution_options={"synchronize_session": False},
+    )
+    db.session.commit()
+    click.echo(f"{result.rowcount} job diantrekan ulang.")
+
+
+def init_app(app):
+    session_class = db.session.session_factory.class_
+    if not event.contains(session_class, "after_commit", _after_commit):
+        event.listen(session_class, "after_commit", _after_commit)
+        event.listen(session_class, "after_rollback", _after_rollback)
+    app.cli.add_command(jobs_cli)
+
+    threads = app.config.get("JOBS_WORKERS", 2)
+    if threads > 0:
+        worker = Worker(
+            app,
+            threads=threads,
+            poll=app.config.get("JOBS_POLL_SECONDS", 5.0),
+            lease=app.config.get("JOBS_LEASE_SECONDS", 300),
+            keep_days=app.config.get("JOBS_KEEP_DAYS", 7),
+        )
+        # Belum jalan: lihat start_worker()
+        app.extensions["jobs"] = worker
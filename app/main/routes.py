@@ -1,6 +1,13 @@
-from flask import Blueprint, render_template, request
-from app.models import Report
-from sqlalchemy import or_
+from flask import Blueprint, current_app, render_template, request, stream_template
+from sqlalchemy import and_
+from app import streaming
+from app.archive import search_archive
+from app.cache import get_cache
+from app.facets import Filters, facet_counts
+from app.models import ArchivedReport, Report
+from app.pagination import keyset_stream, get_per_page
+from app.search import search_reports
+from app.storage import serve_upload
 
 main_bp = Blueprint('main_bp', __name__)
 
@@ -8,18 +15,59 @@ main_bp = Blueprint('main_bp', __name__)
 def index():
     # Ambil parameter pencarian dari query string (misal: ?q=dompet)
     query = request.args.get('q', '').strip()
+    cursor = request.args.get('cursor')
+    per_page = get_per_page()
+    # Filter facet (?report_type=lost&status=...&location=...&since=7d), bisa digabung
+    filters = Filters.from_args(request.args)
+    condition = and_(*filters.clauses()) if filters else None
 
+    def list_context():
+        if query:
+            # Kalau ada keyword, cari pakai full-text index (urut relevansi)
+            page = search_reports(query, cursor, per_page, condition)
+        else:
+            # Kalau gak ada keyword, tampilkan semua laporan
+            # Keyset pagination: halaman berikutnya lanjut dari id terakhir
+            reports_query = Report.query if condition is None else Report.query.filter(condition)
+            page = keyset_stream(reports_query, [Report.id], cursor, per_page)
+        return dict(reports=page, query=query, filters=filters)
+
+    # Daftar laporan sama untuk semua pengunjung -> di-cache per (q, filter, cursor, per_page).
+    # Flash message & navbar tetap dirender per request di index.html.
+    cache = get_cache(current_app)
+    parts = ('index', query, filters.key(), cursor, per_page)
+    if streaming.enabled():
+        report_list = cache.stream_fragment(
+            parts, lambda: stream_template('main/report_list.html', **list_context()))
+    else:
+        report_list = [cache.fragment(
+            parts, lambda: render_template('main/report_list.html', **list_context()))]
+
+    # Hitungan facet tidak tergantung halaman -> satu entri cache per (q, filter).
+    # Dipanggil dari template, jadi ikut di-stream setelah shell halaman terkirim.
+    def facet_panel():
+        return cache.fragment(('facets', query, filters.key()), lambda: render_template(
+            'main/facets.html', facets=facet_counts(filters, query), filters=filters, query=query))
+
+    return streaming.render_page('index.html', report_list=report_list, facet_panel=facet_panel,
+                                 query=query, filters=filters)
+
+
+@main_bp.route('/arsip')
+def archive():
+    # Laporan lama / selesai (report_archive), hanya dibaca kalau user membuka halaman ini
+    query = request.args.get('q', '').strip()
+    cursor = request.args.get('cursor')
+    per_page = get_per_page()
     if query:
-        # Kalau ada keyword, cari berdasarkan item_name ATAU location
-        reports = Report.query.filter(
-            or_(
-                Report.item_name.ilike(f"%{query}%"),
-                Report.location.ilike(f"%{query}%"),
-                Report.description.ilike(f"%{query}%")
-            )
-        ).order_by(Report.id.desc()).all()
+        page = search_archive(query, cursor, per_page)
     else:
-        # Kalau gak ada keyword, tampilkan semua laporan
-        reports = Report.query.order_by(Report.id.desc()).all()
+        page = keyset_stream(ArchivedReport.query, [ArchivedReport.id], cursor, per_page)
+    return streaming.render_page('main/archive.html', reports=page, query=query,
+                                 filters=Filters(), archive=True)
+
 
-    return render_template('index.html', reports=reports, query=query)
+@main_bp.route('/uploads/<path:filename>')
+def uploaded_file(filename):
+    # Foto laporan disajikan dari UPLOAD_FOLDER (volume /data di Fly.io)
+    return serve_upload(filename)
@@ -0,0 +1,296 @@
+import math
+import threading
+from collections import defaultdict
+from flask import current_app
+from sqlalchemy import or_
+from sqlalchemy.orm import joinedload
+from app import jobs
+from app.models import db, Report, ReportMatch
+from app.signals import reports_deleted, reports_saving
+from app.text import tokenize
+
+OPEN_STATUSES = (None, "Belum ditemukan")
+OPPOSITE = {"lost": "found", "found": "lost"}
+
+# Bobot komponen skor
+TEXT_WEIGHT = 0.6
+LOCATION_WEIGHT = 0.25
+TIME_WEIGHT = 0.15
+
+
+def _columns():
+    return (Report.id, Report.user_id, Report.item_name, Report.description,
+            Report.location, Report.report_type, Report.status, Report.created_at)
+
+
+class _Doc:
+    __slots__ = ("report_type", "user_id", "tokens", "location", "created_at")
+
+    def __init__(self, row):
+        self.report_type = row.report_type
+        self.user_id = row.user_id
+        self.tokens = frozenset(tokenize(" ".join(
+            filter(None, [row.item_name, row.description, row.location])
+        )))
+        self.location = frozenset(tokenize(row.location))
+        created_at = row.created_at
+        self.created_at = created_at.replace(tzinfo=None) if created_at else None
+
+
+class MatchIndex:
+    """Inverted index token -> id laporan, dipisah per report_type.
+
+    Dimuat sekali (lazy) lalu diperbarui per laporan, jadi mencari kandidat
+    tidak pernah scan seluruh tabel. Hanya laporan yang masih terbuka
+    (belum ditemukan) yang diindex.
+    """
+
+    def __init__(self, top_n=5, min_score=0.3, time_decay_days=14):
+        self.top_n = top_n
+        self.min_score = min_score
+        self.time_decay_days = time_decay_days
+        self._lock = threading.RLock()
+        self._postings = {t: defaultdict(set) for t in OPPOSITE}
+        self._docs = {}
+        self._last_id = 0
+
+    # ====================================
+    # PEMELIHARAAN INDEX
+    # ====================================
+    def _add(self, report_id, row):
+        if row.report_type not in OPPOSITE or row.status not in OPEN_STATUSES:
+            return
+        doc = _Doc(row)
+        self._docs[report_id] = doc
+        postings = self._postings[doc.report_type]
+        for token in doc.tokens:
+            postings[token].add(report_id)
+
+    def remove(self, report_id):
+        with self._lock:
+            doc = self._docs.pop(report_id, None)
+            if doc is None:
+                return
+            postings = self._postings[doc.report_type]
+            for token in doc.tokens:
+                ids = postings.get(token)
+                if ids is not None:
+                    ids.discard(report_id)
+                    if not ids:
+                        del postings[token]
+
+    def update(self, report):
+        with self._lock:
+            self.remove(report.id)
+            self._add(report.id, report)
+
+    def sync(self):
+        """Tarik laporan dengan id di atas yang terakhir dilihat proses ini.
+
+        Panggilan pertama memuat semua laporan; setelah itu hanya baris baru
+        (termasuk yang dibuat worker lain) yang dibaca lewat primary key.
+        """
+        rows = (
+            db.session.query(*_columns())
+            .filter(Report.id > self._last_id)
+            .order_by(Report.id)
+            .yield_per(500)
+        )
+        with self._lock:
+            for row in rows:
+                self._add(row.id, row)
+                self._last_id = max(self._last_id, row.id)
+
+    # ====================================
+    # SKOR
+    # ====================================
+    def _idf(self, report_type, token):
+        n = max(len(self._docs), 1)
+        df = len(self._postings[report_type].get(token, ()))
+        return math.log(1 + n / (1 + df))
+
+    def _time_score(self, a, b):
+        if a is None or b is None:
+            return 0.0
+        days = abs((a - b).total_seconds()) / 86400
+        return math.exp(-days / self.time_decay_days)
+
+    def top_matches(self, report_id):
+        """Kandidat terbaik dari tipe berlawanan: [(score, report_id), ...]."""
+        with self._lock:
+            doc = self._docs.get(report_id)
+            if doc is None:
+                return []
+            other = OPPOSITE[doc.report_type]
+            postings = self._postings[other]
+
+            weights = {t: self._idf(other, t) for t in doc.tokens}
+            shared = defaultdict(float)
+            for token, weight in weights.items():
+                for candidate_id in postings.get(token, ()):
+                    shared[candidate_id] += weight
+
+            own_total = sum(weights.values())
+            results = []
+            for candidate_id, overlap in shared.items():
+                candidate = self._docs[candidate_id]
+                if doc.user_id is not None and candidate.user_id == doc.user_id:
+                    continue
+
+                candidate_total = sum(self._idf(other, t) for t in candidate.tokens)
+                text_score = 2 * overlap / (own_total + candidate_total)
+
+                location_union = doc.location | candidate.location
+                location_score = (len(doc.location & candidate.location) / len(location_union)
+                                  if location_union else 0.0)
+
+                score = (TEXT_WEIGHT * text_score
+                         + LOCATION_WEIGHT * location_score
+                         + TIME_WEIGHT * self._time_score(doc.created_at, candidate.created_at))
+                if score >= self.min_score:
+                    results.append((round(score, 4), candidate_id))
+
+            results.sort(reverse=True)
+            return results[:self.top_n]
+
+
+# ====================================
+# PENYIMPANAN HASIL
+# ====================================
+def verified_matches(index, report_id, rounds=3):
+    """top_matches dengan kandidat yang sudah dibaca ulang dari database.
+
+    Index proses ini hanya menarik id baru (sync): laporan yang dihapus,
+    diedit, atau ditutup lewat worker lain masih tersimpan versi lamanya.
+    Kandidat diperbarui / dibuang dari index lalu skornya dihitung ulang,
+    sampai semua kandidat teratas sudah dicek.
+    """
+    checked = set()
+    for _ in range(rounds):
+        matches = index.top_matches(report_id)
+        unchecked = {candidate_id for _, candidate_id in matches} - checked
+        if not unchecked:
+            return matches
+        rows = {r.id: r for r in db.session.query(*_columns()).filter(Report.id.in_(unchecked))}
+        for candidate_id in unchecked:
+            row = rows.get(candidate_id)
+            if row is None:
+                index.remove(candidate_id)
+            else:
+                index.update(row)
+        checked |= unchecked
+    return [(score, candidate_id) for score, candidate_id in index.top_matches(report_id)
+            if candidate_id in checked]
+
+
+def store_matches(index, report):
+    """Hitung ulang pasangan untuk satu laporan dan simpan ke report_match."""
+    # Skor dihitung dulu supaya transaksi tulis (lock SQLite) sesingkat mungkin
+    matches = verified_matches(index, report.id)
+
+    ReportMatch.query.filter(
+        or_(ReportMatch.lost_id == report.id, ReportMatch.found_id == report.id)
+    ).delete(synchronize_session=False)
+
+    for score, candidate_id in matches:
+        if report.report_type == "lost":
+            lost_id, found_id = report.id, candidate_id
+        else:
+            lost_id, found_id = candidate_id, report.id
+        db.session.add(ReportMatch(lost_id=lost_id, found_id=found_id, score=score))
+
+    db.session.commit()
+
+
+def matches_for_user(user_id, limit=20):
+    """Pasangan yang melibatkan laporan milik user: [(laporan_user, kandidat, score)]."""
+    own_ids = db.session.query(Report.id).filter(Report.user_id == user_id)
+    rows = (
+        ReportMatch.query
+        .filter(or_(ReportMatch.lost_id.in_(own_ids), ReportMatch.found_id.in_(own_ids)))
+        .options(joinedload(ReportMatch.lost), joinedload(ReportMatch.found))
+        .order_by(ReportMatch.score.desc())
+        .limit(limit)
+        .all()
+    )
+
+    matches = []
+    for m in rows:
+        # Pasangan yatim (laporannya sudah dihapus) dilewati, dibersihkan oleh refresh berikutnya
+        if m.lost is None or m.found is None:
+            continue
+        if m.lost.user_id == user_id:
+            matches.append((m.lost, m.found, m.score))
+        else:
+            matches.append((m.found, m.lost, m.score))
+    return matches
+
+
+# ====================================
+# JOB & SIGNAL HANDLERS
+# ====================================
+def get_index(app):
+    return app.extensions.get("matching")
+
+
+def refresh(index, report_ids):
+    """Baca ulang laporan dari database lalu hitung ulang pasangannya.
+
+    Laporan yang sudah dihapus dibuang dari index; pasangan laporan yang
+    dihapus / sudah ditutup dibuang dengan satu statement untuk semuanya.
+    """
+    index.sync()
+    # Baris kolom (bukan objek ORM): tidak kedaluwarsa oleh commit di store_matches
+    reports = {r.id: r for r in db.session.query(*_columns()).filter(Report.id.in_(report_ids))}
+    closed = []
+    for report_id in report_ids:
+        report = reports.get(report_id)
+        if report is None:
+            # Sudah dihapus: keluar dari index, pasangannya (kalau masih ada) ikut dibuang
+            index.remove(report_id)
+            closed.append(report_id)
+            continue
+        index.update(report)
+        if report.status in OPEN_STATUSES:
+            store_matches(index, report)
+        else:
+            closed.append(report_id)
+    if closed:
+        ReportMatch.query.filter(
+            or_(ReportMatch.lost_id.in_(closed), ReportMatch.found_id.in_(closed))
+        ).delete(synchronize_session=False)
+        db.session.commit()
+
+
+@jobs.handler("matching.refresh")
+def _refresh_job(payload):
+    index = get_index(current_app)
+    if index is not None:
+        refresh(index, payload["ids"])
+
+
+def _on_reports_saving(app, ids, created=False, **extra):
+    if get_index(app) is None:
+        return
+    # Satu job antre per laporan: edit beruntun cukup dihitung sekali.
+    # Batch (moderasi, impor) cukup satu job tanpa key
+    key = f"matching:{ids[0]}" if len(ids) == 1 else None
+    jobs.enqueue("matching.refresh", {"ids": sorted(ids)}, key=key)
+
+
+def _on_reports_deleted(app, reports, **extra):
+    index = get_index(app)
+    if index is None:
+        return
+    for report in reports:
+        index.remove(report["id"])
+
+
+def init_app(app):
+    app.extensions["matching"] = MatchIndex(
+        top_n=app.config.get("MATCH_TOP_N", 5),
+        min_score=app.config.get("MATCH_MIN_SCORE", 0.3),
+        time_decay_days=app.config.get("MATCH_TIME_DECAY_DAYS", 14),
+    )
+    reports_saving.connect(_on_reports_saving)
+    reports_deleted.connect(_on_reports_deleted)
@@ -0,0 +1,261 @@
+import bisect
+import threading
+import time
+from collections import Counter, deque
+from flask import before_render_template, g, has_request_context, request, template_rendered
+from sqlalchemy import event
+from app import db
+
+# Batas bucket histogram (detik), gaya Prometheus
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+# ====================================
+# REGISTRY
+# ====================================
+class Histogram:
+    """Histogram kumulatif + jendela observasi terakhir untuk kuantil bergulir."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, window=1024):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)    # terakhir = +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.recent.append(value)
+
+    def quantile(self, q):
+        values = sorted(self.recent)
+        if not values:
+            return 0.0
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class Registry:
+    """Metrik per proses (tiap worker gunicorn punya registry sendiri)."""
+
+    def __init__(self, window=1024):
+        self.window = window
+        self._help = {}
+        self._types = {}
+        self._histograms = {}    # (name, labels) -> Histogram
+        self._counters = Counter()
+        self._gauges = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name, kind, help_text):
+        self._types[name] = kind
+        self._help[name] = help_text
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(window=self.window)
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        with self._lock:
+            self._counters[(name, tuple(sorted(labels.items())))] += amount
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self._gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def render(self):
+        """Format teks Prometheus (text/plain; version=0.0.4)."""
+        lines = []
+        with self._lock:
+            histograms = sorted(self._histograms.items(), key=_sort_key)
+            counters = sorted(self._counters.items(), key=_sort_key)
+            gauges = sorted(self._gauges.items(), key=_sort_key)
+
+        for name in sorted(self._types):
+            lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} {self._types[name]}")
+            if self._types[name] in ("counter", "gauge"):
+                values = counters if self._types[name] == "counter" else gauges
+                for (metric, labels), value in values:
+                    if metric == name:
+                        lines.append(f"{name}{_labels(labels)} {value}")
+                continue
+
+            for (metric, labels), histogram in histograms:
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', bound),))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {histogram.sum:.6f}")
+                lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+
+        # Kuantil dari jendela terakhir, sebagai gauge terpisah supaya tipe histogram tetap valid
+        lines.append("# HELP lostnfound_recent_seconds Kuantil durasi dari observasi terakhir per metrik.")
+        lines.append("# TYPE lostnfound_recent_seconds gauge")
+        for (metric, labels), histogram in histograms:
+            for q in QUANTILES:
+                extra = labels + (("metric", metric), ("quantile", q))
+                lines.append(f"lostnfound_recent_seconds{_labels(extra)} {histogram.quantile(q):.6f}")
+        return "\n".join(lines) + "\n"
+
+
+def _sort_key(item):
+    (name, labels), _ = item
+    return name, [(key, str(value)) for key, value in labels]
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def get_registry(app):
+    return app.extensions["metrics"]
+
+
+# ====================================
+# HOOKS
+# ====================================
+def _endpoint():
+    return request.endpoint or "unmatched"
+
+
+def _stats():
+    """Statistik request aktif, atau None di luar request (CLI, worker gambar)."""
+    if not has_request_context():
+        return None
+    return g.get("_metrics")
+
+
+def _sql_hooks(app, registry):
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["metrics_started"].pop()
+        elapsed = time.perf_counter() - started
+        stats = _stats()
+        # Di luar request (job, CLI) dicatat sebagai "background"
+        endpoint = _endpoint() if has_request_context() else "background"
+        registry.observe("lostnfound_sql_duration_seconds", elapsed, endpoint=endpoint)
+        if stats is not None:
+            stats["queries"].append((elapsed, statement))
+
+    def handle_error(exception_context):
+        started = exception_context.connection.info.get("metrics_started") \
+            if exception_context.connection is not None else None
+        if started:
+            started.pop()
+
+    with app.app_context():
+        engine = db.engine
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", after_cursor_execute)
+        event.listen(engine, "handle_error", handle_error)
+
+
+def _template_hooks(app, registry):
+    def before_render(sender, template, context, **extra):
+        stats = _stats()
+        if stats is not None:
+            stats["templates"].append(time.perf_counter())
+
+    def rendered(sender, template, context, **extra):
+        stats = _stats()
+        if stats is not None and stats["templates"]:
+            elapsed = time.perf_counter() - stats["templates"].pop()
+            registry.observe("lostnfound_template_render_seconds", elapsed,
+                             template=template.name or "string")
+
+    before_render_template.connect(before_render, app, weak=False)
+    template_rendered.connect(rendered, app, weak=False)
+
+
+def _request_hooks(app, registry):
+    slow_ms = app.config.get("METRICS_SLOW_REQUEST_MS", 0)
+    repeat_limit = app.config.get("METRICS_N_PLUS_ONE", 10)
+
+    def start():
+        g._metrics = {"started": time.perf_counter(), "queries": [], "templates": []}
+
+    def record(stats, endpoint, method, status, path):
+        elapsed = time.perf_counter() - stats["started"]
+        queries = stats["queries"]
+
+        registry.observe("lostnfound_request_duration_seconds", elapsed, endpoint=endpoint,
+                         method=method, status=status)
+        registry.inc("lostnfound_sql_queries_total", len(queries), endpoint=endpoint)
+
+        # N+1: statement yang sama (parameter beda) berulang kali dalam satu request
+        repeated = [(sql, n) for sql, n in Counter(q[1] for q in queries).items()
+                    if n >= repeat_limit and sql.lstrip().upper().startswith("SELECT")]
+        if repeated:
+            registry.inc("lostnfound_sql_repeated_statements_total", len(repeated), endpoint=endpoint)
+            for sql, n in repeated:
+                app.logger.warning("Kemungkinan N+1 di %s: %dx %s", endpoint, n, " ".join(sql.split())[:200])
+
+        if slow_ms and elapsed * 1000 >= slow_ms:
+            slowest = sorted(queries, reverse=True)[:5]
+            app.logger.warning(
+                "Request lambat %s %s (%s): %.0f ms, %d query %.0f ms\n%s",
+                method, path, endpoint, elapsed * 1000,
+                len(queries), sum(q[0] for q in queries) * 1000,
+                "\n".join(f"  {t * 1000:7.1f} ms  {' '.join(sql.split())[:300]}" for t, sql in slowest),
+            )
+
+    def finish(response):
+        stats = g.get("_metrics")
+        if stats is None:
+            return response
+        args = (stats, _endpoint(), request.method, response.status_code, request.full_path.rstrip("?"))
+        if response.is_streamed:
+            # Body di-stream setelah after_request: query & template halaman baru jalan
+            # saat itu, jadi stats tetap di g dan dicatat setelah byte terakhir terkirim
+            response.call_on_close(lambda: record(*args))
+        else:
+            g.pop("_metrics")
+            record(*args)
+        return response
+
+    app.before_request(start)
+    app.after_request(finish)
+
+
+def init_app(app):
+    registry = Registry(window=app.config.get("METRICS_WINDOW", 1024))
+    registry.describe("lostnfound_request_duration_seconds", "histogram",
+                      "Durasi request per endpoint blueprint.")
+    registry.describe("lostnfound_sql_duration_seconds", "histogram",
+                      "Durasi statement SQL per endpoint (background = di luar request).")
+    registry.describe("lostnfound_template_render_seconds", "histogram",
+                      "Durasi render template Jinja.")
+    registry.describe("lostnfound_image_process_seconds", "histogram",
+                      "Durasi membuat turunan foto.")
+    registry.describe("lostnfound_job_duration_seconds", "histogram",
+                      "Durasi job background per nama job.")
+    registry.describe("lostnfound_jobs_total", "counter",
+                      "Job background yang dijalankan per nama dan hasil (done/retry/failed).")
+    registry.describe("lostnfound_sql_queries_total", "counter",
+                      "Jumlah statement SQL per endpoint.")
+    registry.describe("lostnfound_sql_repeated_statements_total", "counter",
+                      "Statement SELECT yang berulang >= METRICS_N_PLUS_ONE kali dalam satu request.")
+    app.extensions["metrics"] = registry
+
+    if not app.config.get("METRICS_ENABLED", True):
+        return
+    _sql_hooks(app, registry)
+    _template_hooks(app, registry)
+    _request_hooks(app, registry)
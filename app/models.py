@@ -1,19 +1,35 @@
 from . import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from app import passwords
 from datetime import datetime, timezone
 import pytz   
 
+# Dibuat sekali; dipakai created_at_wib di setiap kartu laporan
+JAKARTA = pytz.timezone("Asia/Jakarta")
+
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(50), unique=True, nullable=False)
     email = db.Column(db.String(100), unique=True, nullable=False)
     password_hash = db.Column(db.String(200), nullable=False)
 
+    # Hashing jalan di process pool (app/passwords.py); bisa raise passwords.HashingBusy
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = passwords.hash_password(password)
+
+    def set_unusable_password(self):
+        # Akun Google: tidak bisa login pakai password, tanpa biaya hashing
+        self.password_hash = passwords.UNUSABLE_PASSWORD
+
+    @property
+    def has_usable_password(self):
+        return self.password_hash != passwords.UNUSABLE_PASSWORD
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        """Cek password; kalau parameter hash berubah, hash diganti (commit oleh pemanggil)."""
+        ok, new_hash = passwords.verify_password(self.password_hash, password)
+        if new_hash:
+            self.password_hash = new_hash
+        return ok
 
 class Project(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -36,17 +52,192 @@ class Report(db.Model):
         default=lambda: datetime.now(timezone.utc).replace(tzinfo=timezone.utc)
     )
 
+    # Index mengikuti pola akses di blueprint (cek dengan: flask audit queries)
+    __table_args__ = (
+        db.Index('ix_report_user_id_id', 'user_id', 'id'),              # profil
+        db.Index('ix_report_type_status_id', 'report_type', 'status', 'id'),
+        db.Index('ix_report_status_id', 'status', 'id'),
+        db.Index('ix_report_created_at', 'created_at'),
+        db.Index('ix_report_location_id', 'location', 'id'),        # facet lokasi
+        # Hitungan facet (GROUP BY) cukup membaca index sempit ini, bukan tabel
+        db.Index('ix_report_facets', 'report_type', 'status', 'location', 'created_at'),
+        # Id laporan yang dihapus / diarsip tidak dipakai ulang (report_archive memakai id asli)
+        {'sqlite_autoincrement': True},
+    )
+
     @property
     def created_at_wib(self):
         """Konversi waktu UTC atau naive ke WIB"""
         if not self.created_at:
             return None
 
-        jakarta = pytz.timezone("Asia/Jakarta")
         utc_time = self.created_at
 
         # kalau masih naive, anggap UTC
         if utc_time.tzinfo is None:
-            utc_time = pytz.utc.localize(utc_time)
+            utc_time = utc_time.replace(tzinfo=pytz.utc)
+
+        return utc_time.astimezone(JAKARTA)
+
+
+class ArchivedReport(db.Model):
+    """Laporan lama / sudah selesai yang dipindah dari tabel report (app/archive.py).
 
-        return utc_time.astimezone(jakarta)
\ No newline at end of file
+    Kolom sama dengan Report (id tetap id aslinya), supaya template kartu
+    laporan bisa dipakai apa adanya. Tabel report tetap kecil; arsip hanya
+    dibaca saat user memintanya (halaman /arsip).
+    """
+    __tablename__ = "report_archive"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    name = db.Column(db.String(100), nullable=False)
+    item_name = db.Column(db.String(100), nullable=False)
+    image_url = db.Column(db.String(255))
+    description = db.Column(db.Text, nullable=True)
+    location = db.Column(db.String(120), nullable=False)
+    contact = db.Column(db.String(100), nullable=False)
+    status = db.Column(db.String(20))
+    report_type = db.Column(db.String(10), nullable=False)
+    created_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_report_archive_user_id_id', 'user_id', 'id'),
+        db.Index('ix_report_archive_image_url', 'image_url'),    # sweeper upload
+    )
+
+    created_at_wib = Report.created_at_wib
+
+
+class ReportMatch(db.Model):
+    """Pasangan laporan 'lost' <-> 'found' yang kemungkinan barangnya sama."""
+    id = db.Column(db.Integer, primary_key=True)
+    lost_id = db.Column(db.Integer, db.ForeignKey('report.id'), nullable=False, index=True)
+    found_id = db.Column(db.Integer, db.ForeignKey('report.id'), nullable=False, index=True)
+    score = db.Column(db.Float, nullable=False)
+    created_at = db.Column(
+        db.DateTime,
+        default=lambda: datetime.now(timezone.utc).replace(tzinfo=timezone.utc)
+    )
+
+    # Ikut terhapus kalau salah satu laporannya dihapus lewat ORM
+    lost = db.relationship('Report', foreign_keys=[lost_id],
+                           backref=db.backref('matches_as_lost', cascade='all, delete-orphan'))
+    found = db.relationship('Report', foreign_keys=[found_id],
+                            backref=db.backref('matches_as_found', cascade='all, delete-orphan'))
+
+    __table_args__ = (db.UniqueConstraint('lost_id', 'found_id'),)
+
+
+class Upload(db.Model):
+    """Satu file foto di UPLOAD_FOLDER (nama = sha256 isinya).
+
+    refcount = jumlah laporan yang memakai file ini, supaya foto yang sama
+    yang diunggah dua kali cukup disimpan sekali dan aman dihapus.
+    """
+    filename = db.Column(db.String(255), primary_key=True)
+    refcount = db.Column(db.Integer, nullable=False, default=0)
+    size = db.Column(db.Integer)
+    created_at = db.Column(
+        db.DateTime,
+        default=lambda: datetime.now(timezone.utc).replace(tzinfo=timezone.utc)
+    )
+
+
+class DataVersion(db.Model):
+    """Nomor versi per tabel, naik di transaksi yang sama dengan setiap perubahan.
+
+    Dipakai sebagai validator HTTP (ETag / Last-Modified) tanpa perlu
+    membaca tabel datanya sendiri.
+    """
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False)
+
+
+class ReportStat(db.Model):
+    """Jumlah laporan per (user, jenis, status); user_id 0 = total semua user.
+
+    Dinaikkan/diturunkan di transaksi yang sama dengan perubahan laporan
+    (app/stats.py), jadi halaman cukup membaca beberapa baris, bukan COUNT(*).
+    """
+    user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    report_type = db.Column(db.String(10), primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class Job(db.Model):
+    """Satu pekerjaan background (app/jobs.py), disimpan di database supaya
+    tetap ada walaupun proses/mesin berhenti sebelum sempat dijalankan.
+
+    status: queued -> running -> done | failed. Job running yang lease-nya
+    (locked_until) lewat dianggap ditinggal worker-nya dan diambil ulang.
+    """
+    __table_args__ = (
+        db.Index("ix_job_status_run_at", "status", "run_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.Text, nullable=False, default="{}")
+    # Paling banyak satu job antre per key (lihat jobs.enqueue)
+    idempotency_key = db.Column(db.String(200), unique=True)
+    status = db.Column(db.String(10), nullable=False, default="queued")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_at = db.Column(db.DateTime, nullable=False)
+    locked_by = db.Column(db.String(120))
+    locked_until = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, nullable=False)
+    finished_at = db.Column(db.DateTime)
+
+
+class SavedSearch(db.Model):
+    """Pencarian (kata kunci + filter) yang disimpan user dari halaman utama.
+
+    Laporan baru dicocokkan ke semua pencarian tersimpan sekaligus oleh job
+    background (app/alerts.py); hasilnya masuk ke tabel notification, jadi
+    user tidak perlu mengulang pencarian yang sama terus-menerus.
+    """
+    __tablename__ = "saved_search"
+    __table_args__ = (
+        db.Index("ix_saved_search_user_id_id", "user_id", "id"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    keywords = db.Column(db.String(200), nullable=False)
+    # Filter facet opsional (lihat app/facets.py); None = semua
+    report_type = db.Column(db.String(10))
+    status = db.Column(db.String(20))
+    location = db.Column(db.String(120))
+    created_at = db.Column(
+        db.DateTime,
+        default=lambda: datetime.now(timezone.utc).replace(tzinfo=timezone.utc)
+    )
+
+
+class Notification(db.Model):
+    """Laporan baru yang cocok dengan pencarian tersimpan milik user.
+
+    Ringkasan laporan ikut disimpan, jadi daftar notifikasi di profil cukup
+    membaca satu range index tanpa join (dan tetap ada walau laporannya
+    sudah diarsip / dihapus).
+    """
+    __table_args__ = (
+        db.UniqueConstraint("saved_search_id", "report_id"),    # job boleh diulang
+        db.Index("ix_notification_user_id_id", "user_id", "id"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    saved_search_id = db.Column(db.Integer, db.ForeignKey('saved_search.id'), nullable=False)
+    report_id = db.Column(db.Integer, nullable=False)
+    item_name = db.Column(db.String(100), nullable=False)
+    location = db.Column(db.String(120))
+    report_type = db.Column(db.String(10))
+    created_at = db.Column(db.DateTime, nullable=False)
+    read_at = db.Column(db.DateTime)
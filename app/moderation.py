@@ -0,0 +1,114 @@
+from collections import Counter
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import and_, bindparam, delete, or_, select, update
+from app import stats, storage
+from app.models import db, Report, ReportMatch, Upload
+from app.signals import reports_deleted, reports_saving, reports_updated
+
+STATUSES = ("Belum ditemukan", "Sudah ditemukan")
+REPORT_TYPES = ("lost", "found")
+
+# Filter tanggal admin dalam WIB; created_at disimpan UTC
+WIB = timedelta(hours=7)
+
+
+# ====================================
+# FILTER
+# ====================================
+def parse_date(value):
+    """'YYYY-MM-DD' -> datetime (tengah malam WIB, dalam UTC naive). None kalau kosong."""
+    if not value:
+        return None
+    return datetime.strptime(value, "%Y-%m-%d") - WIB
+
+
+def filter_condition(user_id=None, date_from=None, date_to=None, report_type=None, status=None):
+    """Kondisi WHERE untuk hapus/ubah massal. None kalau tidak ada filter sama sekali,
+    supaya form kosong tidak pernah berarti "semua laporan"."""
+    clauses = []
+    if user_id is not None:
+        clauses.append(Report.user_id == user_id)
+    if date_from is not None:
+        clauses.append(Report.created_at >= date_from)
+    if date_to is not None:
+        # date_to inklusif: sampai akhir hari itu
+        clauses.append(Report.created_at < date_to + timedelta(days=1))
+    if report_type:
+        clauses.append(Report.report_type == report_type)
+    if status:
+        clauses.append(Report.status == status)
+    return and_(*clauses) if clauses else None
+
+
+def count_reports(condition):
+    return db.session.scalar(select(db.func.count(Report.id)).where(condition))
+
+
+# ====================================
+# AKSI MASSAL
+# ====================================
+def delete_reports(condition):
+    """Hapus semua laporan yang cocok dengan satu DELETE ... RETURNING.
+
+    Pasangan matching dihapus dengan satu statement, refcount foto diturunkan
+    dengan satu executemany, lalu file fisiknya dibuang oleh satu job
+    background setelah commit. Return daftar snapshot laporan yang terhapus.
+    """
+    ids = select(Report.id).where(condition)
+    db.session.execute(
+        delete(ReportMatch).where(or_(ReportMatch.lost_id.in_(ids), ReportMatch.found_id.in_(ids))),
+        execution_options={"synchronize_session": False},
+    )
+    rows = db.session.execute(
+        delete(Report).where(condition).returning(*Report.__table__.columns),
+        execution_options={"synchronize_session": False},
+    ).mappings().all()
+    deleted = [dict(row) for row in rows]
+    stats.apply(db.session, stats.count_rows(deleted, -1))
+
+    images = Counter(r["image_url"] for r in deleted if r["image_url"])
+    if images:
+        upload = Upload.__table__
+        db.session.execute(
+            update(upload)
+            .where(upload.c.filename == bindparam("f"))
+            .values(refcount=upload.c.refcount - bindparam("n")),
+            [{"f": filename, "n": n} for filename, n in images.items()],
+        )
+        storage.collect_later(images)
+    db.session.commit()
+    # Objek Report yang masih ada di identity map sudah basi
+    db.session.expire_all()
+
+    if deleted:
+        reports_deleted.send(current_app._get_current_object(), reports=deleted)
+    return deleted
+
+
+def update_status(condition, status):
+    """Ubah status semua laporan yang cocok dengan satu UPDATE ... RETURNING."""
+    # Status lama dibaca (dan dikunci di Postgres) dulu untuk counter report_stat
+    changed = db.session.execute(
+        select(Report.user_id, Report.report_type, Report.status)
+        .where(condition, or_(Report.status != status, Report.status.is_(None)))
+        .with_for_update()
+    ).mappings().all()
+    deltas = stats.count_rows(changed, -1)
+    deltas.update(stats.count_rows(({**row, "status": status} for row in changed), 1))
+    stats.apply(db.session, deltas)
+
+    rows = db.session.execute(
+        update(Report).where(condition).values(status=status)
+        .returning(*Report.__table__.columns),
+        execution_options={"synchronize_session": False},
+    ).mappings().all()
+    updated = [dict(row) for row in rows]
+    if updated:
+        reports_saving.send(current_app._get_current_object(), ids=[r["id"] for r in updated])
+    db.session.commit()
+    db.session.expire_all()
+
+    if updated:
+        reports_updated.send(current_app._get_current_object(), reports=updated)
+    return updated
@@ -0,0 +1,200 @@
+import base64
+import json
+import math
+from datetime import datetime
+from flask import current_app, request
+from sqlalchemy import and_, or_
+from app import db
+
+DEFAULT_PER_PAGE = 24
+MAX_PER_PAGE = 100
+
+
+class Page:
+    """Satu halaman hasil keyset pagination."""
+
+    def __init__(self, items, next_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    # Template bisa memakai Page dan StreamPage dengan cara yang sama
+    def __iter__(self):
+        return iter(self.items)
+
+    def __bool__(self):
+        return bool(self.items)
+
+
+class StreamPage:
+    """Seperti Page, tapi baris dibaca dari cursor database selama template mengiterasinya.
+
+    Hanya bisa diiterasi sekali. next_cursor baru terisi setelah iterasi
+    selesai, jadi pakai di bawah daftar (tombol "Muat lebih banyak").
+    """
+
+    def __init__(self, load, columns, per_page):
+        self._load = load
+        self._result = None
+        self._columns = columns
+        self._per_page = per_page
+        self._first = None
+        self._peeked = False
+        self.next_cursor = None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def _peek(self):
+        if not self._peeked:
+            # Query baru jalan di sini (saat render), bukan di view: Flask sudah
+            # menutup db.session view sebelum body streaming dikirim
+            self._result = self._load()
+            self._rows = iter(self._result)
+            self._first = next(self._rows, None)
+            self._peeked = True
+        return self._first
+
+    def __bool__(self):
+        return self._peek() is not None
+
+    def __iter__(self):
+        row = self._peek()
+        last = None
+        count = 0
+        try:
+            while row is not None:
+                if count == self._per_page:
+                    # Baris ke per_page+1 hanya tanda masih ada halaman berikutnya
+                    self.next_cursor = encode_cursor([getattr(last, c.key) for c in self._columns])
+                    break
+                yield row
+                last = row
+                count += 1
+                row = next(self._rows, None)
+        finally:
+            # Cursor yang berhenti di tengah menahan koneksi sampai di-GC
+            close = getattr(self._result, "close", None)
+            if close is not None:
+                close()
+
+
+# ====================================
+# CURSOR
+# ====================================
+def encode_cursor(values):
+    """Bungkus nilai kolom terakhir jadi token opaque (aman untuk URL)."""
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values],
+                     separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+# Batas BIGINT: nilai di luar ini membuat driver database error, bukan halaman kosong
+_INT_RANGE = (-2 ** 63, 2 ** 63 - 1)
+
+
+def _coerce(value, column):
+    """Nilai cursor sesuai tipe kolom urutan; raise ValueError kalau tidak cocok."""
+    kind = column.type.python_type
+    if isinstance(value, bool):
+        raise ValueError(value)
+    if kind is int and isinstance(value, int) and _INT_RANGE[0] <= value <= _INT_RANGE[1]:
+        return value
+    if kind is float and isinstance(value, (int, float)) and math.isfinite(value):
+        return float(value)
+    if kind is datetime and isinstance(value, str):
+        return datetime.fromisoformat(value)
+    raise ValueError(value)
+
+
+def decode_cursor(token, columns=None):
+    """Kebalikan encode_cursor; token rusak dianggap halaman pertama (None).
+
+    Kalau columns diberikan, jumlah dan tipe nilainya harus cocok dengan kolom
+    urutan (int id, float skor, datetime ISO): cursor buatan tangan seperti
+    [null] atau [{}] tidak pernah sampai ke query.
+    """
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+    except ValueError:
+        return None
+    if not isinstance(values, list):
+        return None
+    if columns is None:
+        return values
+    if len(values) != len(columns):
+        return None
+    try:
+        return [_coerce(value, column) for value, column in zip(values, columns)]
+    except (ValueError, NotImplementedError):
+        return None
+
+
+def get_per_page(limit=None):
+    default = current_app.config.get("REPORTS_PER_PAGE", DEFAULT_PER_PAGE)
+    if limit is None:
+        limit = current_app.config.get("REPORTS_MAX_PER_PAGE", MAX_PER_PAGE)
+    per_page = request.args.get("per_page", default, type=int) or default
+    return max(1, min(per_page, limit))
+
+
+# ====================================
+# KEYSET PAGINATION
+# ====================================
+def keyset_after(columns, values):
+    # (a, b) < (x, y)  ->  a < x OR (a = x AND b < y)
+    clauses = []
+    for i, col in enumerate(columns):
+        prefix = [columns[j] == values[j] for j in range(i)]
+        clauses.append(and_(*prefix, col < values[i]))
+    return or_(*clauses)
+
+
+def _keyset_query(query, columns, cursor, per_page):
+    values = decode_cursor(cursor, columns)
+    if values is not None:
+        query = query.filter(keyset_after(columns, values))
+    return query.order_by(*[c.desc() for c in columns]).limit(per_page + 1)
+
+
+def keyset_paginate(query, columns, cursor=None, per_page=None):
+    """Ambil satu halaman urut DESC berdasarkan `columns`.
+
+    Kolom terakhir wajib unik (biasanya primary key) supaya urutan stabil.
+    Tidak pakai OFFSET, jadi halaman ke-100 sama murahnya dengan halaman pertama.
+    """
+    if per_page is None:
+        per_page = get_per_page()
+
+    rows = _keyset_query(query, columns, cursor, per_page).all()
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor([getattr(rows[-1], c.key) for c in columns])
+
+    return Page(rows, next_cursor)
+
+
+def keyset_stream(query, columns, cursor=None, per_page=None, batch_size=200):
+    """Seperti keyset_paginate, tapi return StreamPage yang lazy.
+
+    Objek dibangun per batch (yield_per) saat template merender, jadi memori
+    tetap konstan walaupun per_page besar (daftar admin).
+    """
+    if per_page is None:
+        per_page = get_per_page()
+
+    statement = _keyset_query(query, columns, cursor, per_page).statement
+
+    def load():
+        return db.session.scalars(statement, execution_options={"yield_per": batch_size})
+
+    return StreamPage(load, columns, per_page)
@@ -0,0 +1,122 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# Akun OAuth saja: tidak pernah cocok dengan password apa pun, tanpa hashing
+UNUSABLE_PASSWORD = "!"
+
+DEFAULT_METHOD = "scrypt:32768:8:1"
+
+
+class HashingBusy(Exception):
+    """Antrian hashing penuh / terlalu lama. Route membalas 503 + Retry-After."""
+
+
+# ====================================
+# FUNGSI DI PROSES WORKER
+# ====================================
+def _hash(password, method, salt_length):
+    return generate_password_hash(password, method=method, salt_length=salt_length)
+
+
+def _check(pwhash, password, method, salt_length):
+    """(cocok, hash_baru). hash_baru diisi kalau parameter hash-nya sudah usang."""
+    if not check_password_hash(pwhash, password):
+        return False, None
+    if pwhash.split("$", 1)[0] != method:
+        return True, _hash(password, method, salt_length)
+    return True, None
+
+
+# ====================================
+# EXECUTOR
+# ====================================
+class HashingPool:
+    """Process pool kecil dengan batas antrian.
+
+    scrypt memakan CPU penuh dan menahan GIL; di proses terpisah thread
+    gunicorn lain tetap bisa melayani request. Kalau pekerjaan yang sedang
+    jalan + antri sudah mencapai batas, request baru langsung ditolak
+    (load shedding) daripada menumpuk dan membuat semua request timeout.
+    """
+
+    def __init__(self, workers=1, max_queue=8, timeout=10):
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        # Dibuat saat pertama dipakai, jadi setelah fork worker gunicorn.
+        # Konteks "spawn": fork dari proses multi-thread tidak aman.
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise HashingBusy() from None
+
+
+def _pool():
+    return current_app.extensions["passwords"]
+
+
+def _run(fn, *args):
+    try:
+        return _pool().run(fn, *args)
+    except HashingBusy:
+        metrics = current_app.extensions.get("metrics")
+        if metrics is not None:
+            metrics.inc("lostnfound_password_shed_total")
+        raise
+
+
+def _params():
+    return (current_app.config.get("PASSWORD_METHOD", DEFAULT_METHOD),
+            current_app.config.get("PASSWORD_SALT_LENGTH", 16))
+
+
+# ====================================
+# API
+# ====================================
+def hash_password(password):
+    return _run(_hash, password, *_params())
+
+
+def verify_password(pwhash, password):
+    """Return (cocok, hash_baru). Simpan hash_baru kalau tidak None (upgrade transparan)."""
+    if not pwhash or pwhash == UNUSABLE_PASSWORD:
+        return False, None
+    return _run(_check, pwhash, password, *_params())
+
+
+def init_app(app):
+    app.extensions["passwords"] = HashingPool(
+        workers=app.config.get("PASSWORD_WORKERS", 1),
+        max_queue=app.config.get("PASSWORD_MAX_QUEUE", 8),
+        timeout=app.config.get("PASSWORD_TIMEOUT", 10),
+    )
+    metrics = app.extensions.get("metrics")
+    if metrics is not None:
+        metrics.describe("lostnfound_password_shed_total", "counter",
+                         "Login/signup yang ditolak karena antrian hashing password penuh.")
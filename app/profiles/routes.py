@@ -1,5 +1,8 @@
-from flask import Blueprint, render_template, session, redirect, url_for, flash
-from app.models import User, Report
+from flask import Blueprint, render_template, request, session, redirect, url_for, flash
+from app import alerts
+from app.facets import Filters
+from app.models import db, User, Report
+from app.matching import matches_for_user
 
 profiles_bp = Blueprint('profiles_bp', __name__, template_folder='templates')
 
@@ -22,5 +25,57 @@ def profile():
     # Ambil laporan
     reports = Report.query.filter_by(user_id=user.id).all()
 
-    return render_template('profiles/profile.html', user=user, reports=reports)
+    # Laporan lawan (lost <-> found) yang kemungkinan barangnya sama
+    matches = matches_for_user(user.id)
 
+    # Laporan baru yang cocok dengan pencarian tersimpan (diisi job app/alerts.py)
+    notifications = alerts.notifications(user.id)
+    saved_searches = alerts.saved_searches(user.id)
+
+    return render_template('profiles/profile.html', user=user, reports=reports,
+                           matches=matches, notifications=notifications,
+                           saved_searches=saved_searches)
+
+
+@profiles_bp.route('/pencarian', methods=['POST'])
+def save_search():
+    if 'user_id' not in session:
+        flash('Login dulu untuk menyimpan pencarian!', 'warning')
+        return redirect(url_for('auth_bp.login'))
+
+    # Kata kunci + filter facet yang sedang aktif di halaman utama
+    query = request.form.get('q', '')
+    filters = Filters.from_args(request.form)
+    try:
+        alerts.save_search(session['user_id'], query, filters)
+    except alerts.SearchRejected as e:
+        flash(str(e), 'warning')
+    else:
+        db.session.commit()
+        flash('Pencarian disimpan. Laporan baru yang cocok akan muncul di profil kamu.', 'success')
+    return redirect(url_for('main_bp.index', q=query.strip() or None, **filters.params(since=None)))
+
+
+@profiles_bp.route('/pencarian/<int:search_id>/hapus', methods=['POST'])
+def delete_search(search_id):
+    if 'user_id' not in session:
+        flash('Kamu harus login dulu untuk membuka profil!', 'warning')
+        return redirect(url_for('auth_bp.login'))
+
+    if alerts.delete_search(session['user_id'], search_id):
+        db.session.commit()
+        flash('Pencarian tersimpan dihapus.', 'success')
+    else:
+        flash('Pencarian tidak ditemukan.', 'danger')
+    return redirect(url_for('profiles_bp.profile'))
+
+
+@profiles_bp.route('/notifikasi/baca', methods=['POST'])
+def read_notifications():
+    if 'user_id' not in session:
+        flash('Kamu harus login dulu untuk membuka profil!', 'warning')
+        return redirect(url_for('auth_bp.login'))
+
+    alerts.mark_read(session['user_id'])
+    db.session.commit()
+    return redirect(url_for('profiles_bp.profile'))
@@ -0,0 +1,324 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, g, jsonify, request, session
+
+# ====================================
+# ATURAN
+# ====================================
+# endpoint[:METHOD][?arg] -> (batas per IP, batas per user login, kelompok konkurensi).
+# "?q" = hanya kalau argumen q diisi (pencarian), bukan semua request ke endpoint itu.
+# Pengunjung tanpa login dihitung per IP; user login per akun (banyak user kampus
+# berbagi satu IP NAT), kecuali batas user-nya None.
+DEFAULT_RULES = {
+    "main_bp.index?q": ("30/minute", "60/minute", "search"),
+    "main_bp.archive?q": ("30/minute", "60/minute", "search"),
+    "api_bp.list_reports?q": ("60/minute", "120/minute", "search"),
+    "report_bp.report:POST": (None, "20/hour", "upload"),
+    "report_bp.edit_report:POST": (None, "60/hour", "upload"),
+    # Hashing password sudah dibatasi pool-nya sendiri (app/passwords.py)
+    "auth_bp.login:POST": ("20/minute", None, None),
+    "auth_bp.signup:POST": ("5/hour", None, None),
+}
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+OFF = ("", "-", "0", "off", "none")
+
+
+def parse_limit(value):
+    """'30/minute' -> (30, 60): bucket 30 token, terisi lagi 30 per 60 detik. '-' / None -> None."""
+    if value is None or str(value).strip().lower() in OFF:
+        return None
+    count, _, period = str(value).strip().partition("/")
+    period = period.strip().lower() or "second"
+    seconds = PERIODS.get(period.rstrip("s"))
+    if seconds is None:
+        seconds = float(period.rstrip("s"))    # "30/10s"
+    return int(count), seconds
+
+
+def parse_rules(value):
+    """'main_bp.index?q=20/minute,40/minute,search;auth_bp.login:POST=off' -> dict aturan.
+    Nilai yang tidak disebut tetap dari DEFAULT_RULES."""
+    if isinstance(value, dict):
+        return {**DEFAULT_RULES, **value}
+    rules = dict(DEFAULT_RULES)
+    for item in filter(None, (part.strip() for part in (value or "").split(";"))):
+        spec, _, limits = item.partition("=")
+        spec, limits = spec.strip(), limits.strip()
+        if limits.lower() in OFF:
+            rules.pop(spec, None)
+            continue
+        parts = [p.strip() or None for p in limits.split(",")] + [None, None]
+        rules[spec] = tuple(parts[:3])
+    return rules
+
+
+def parse_pools(value):
+    """'search=2,upload=2' -> {'search': 2, 'upload': 2}."""
+    if isinstance(value, dict):
+        return value
+    pools = {}
+    for item in filter(None, (part.strip() for part in (value or "").split(","))):
+        name, _, size = item.partition("=")
+        pools[name.strip()] = int(size)
+    return pools
+
+
+class Rule:
+    def __init__(self, spec, ip=None, user=None, pool=None):
+        endpoint, _, self.arg = spec.partition("?")
+        self.endpoint, _, methods = endpoint.partition(":")
+        self.spec = spec
+        self.methods = frozenset(methods.upper().split("|")) if methods else None
+        self.ip = parse_limit(ip)
+        self.user = parse_limit(user)
+        self.pool = pool
+
+    def applies(self, req):
+        return ((self.methods is None or req.method in self.methods)
+                and (not self.arg or req.args.get(self.arg, "").strip() != ""))
+
+
+# ====================================
+# STORE TOKEN BUCKET
+# ====================================
+def _refill(tokens, stamp, capacity, per_seconds, now):
+    """(token tersisa, detik tunggu) setelah mengambil satu token; tunggu 0 = boleh."""
+    rate = capacity / per_seconds
+    tokens = min(capacity, tokens + max(0.0, now - stamp) * rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / rate
+
+
+class MemoryStore:
+    """Bucket per key di memori proses. Key paling lama tidak dipakai dibuang
+    kalau melebihi max_keys (bucket-nya mulai penuh lagi)."""
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()    # key -> (tokens, stamp)
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, per_seconds):
+        now = time.monotonic()
+        with self._lock:
+            tokens, stamp = self._buckets.pop(key, (capacity, now))
+            tokens, wait = _refill(tokens, stamp, capacity, per_seconds, now)
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class SQLiteStore:
+    """Bucket bersama untuk semua worker gunicorn di satu mesin (file SQLite terpisah)."""
+
+    # Bucket yang tidak dipakai selama ini pasti sudah penuh lagi: aman dihapus
+    EXPIRE_SECONDS = PERIODS["day"]
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._calls = 0
+        self._conn().execute("CREATE TABLE IF NOT EXISTS ratelimit "
+                             "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, stamp REAL NOT NULL)")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = conn
+        return conn
+
+    def take(self, key, capacity, per_seconds):
+        now = time.time()
+        conn = self._conn()
+        # IMMEDIATE: baca-hitung-tulis tidak bisa diselingi worker lain
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, stamp FROM ratelimit WHERE key = ?", (key,)).fetchone()
+            tokens, wait = _refill(*(row or (capacity, now)), capacity, per_seconds, now)
+            conn.execute("INSERT OR REPLACE INTO ratelimit VALUES (?, ?, ?)", (key, tokens, now))
+            self._calls += 1
+            if self._calls % 1000 == 0:
+                conn.execute("DELETE FROM ratelimit WHERE stamp < ?", (now - self.EXPIRE_SECONDS,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+
+# ====================================
+# BATAS KONKURENSI
+# ====================================
+class Pools:
+    """Jumlah request mahal yang boleh jalan bersamaan per kelompok (per proses).
+
+    Request berikutnya menunggu paling lama `timeout` detik, lalu ditolak 503
+    daripada menumpuk di thread gunicorn dan membuat semua request lambat.
+    """
+
+    def __init__(self, sizes, timeout=2.0):
+        self.timeout = timeout
+        self._slots = {name: threading.BoundedSemaphore(size) for name, size in sizes.items() if size > 0}
+
+    def acquire(self, name):
+        slots = self._slots.get(name)
+        return slots is None or slots.acquire(timeout=self.timeout)
+
+    def release(self, name):
+        slots = self._slots.get(name)
+        if slots is not None:
+            slots.release()
+
+
+# ====================================
+# LIMITER
+# ====================================
+class Limiter:
+    def __init__(self, rules, store, pools, ip_header=None):
+        self.store = store
+        self.pools = pools
+        self.ip_header = ip_header
+        self.rules = {}    # endpoint -> [Rule]
+        for spec, limits in rules.items():
+            rule = Rule(spec, *limits)
+            self.rules.setdefault(rule.endpoint, []).append(rule)
+
+    def client_ip(self):
+        # Di belakang proxy Fly, remote_addr = proxy; IP asli ada di Fly-Client-IP
+        if self.ip_header:
+            value = request.headers.get(self.ip_header)
+            if value:
+                return value.split(",")[0].strip()
+        return request.remote_addr or "-"
+
+    def bucket(self, rule):
+        """(key, batas) untuk pengirim request ini, atau (None, None) kalau tidak dibatasi."""
+        user_id = session.get("user_id")
+        if user_id is not None and rule.user is not None:
+            return f"{rule.spec}|u:{user_id}", rule.user
+        if rule.ip is not None:
+            return f"{rule.spec}|ip:{self.client_ip()}", rule.ip
+        return None, None
+
+    def wait(self, rule):
+        """Detik sampai request boleh lagi (0 = boleh sekarang)."""
+        key, limit = self.bucket(rule)
+        if key is None:
+            return 0.0
+        try:
+            return self.store.take(key, *limit)
+        except Exception:
+            # Store bermasalah (mis. file SQLite terkunci): lebih baik lolos daripada 500
+            current_app.logger.exception("Rate limit store gagal; request diloloskan")
+            return 0.0
+
+
+def _metrics():
+    return current_app.extensions.get("metrics")
+
+
+def _reject(status, retry_after, rule, reason):
+    metrics = _metrics()
+    if metrics is not None:
+        metrics.inc("lostnfound_ratelimit_rejected_total", endpoint=rule.spec, reason=reason)
+    seconds = max(1, math.ceil(retry_after))
+    if status == 429:
+        message = f"Terlalu banyak permintaan, coba lagi dalam {seconds} detik."
+    else:
+        message = "Server sedang sibuk, coba lagi beberapa detik lagi."
+    # Respons pendek tanpa template / query: penolakan harus murah
+    if request.blueprint == "api_bp":
+        response = jsonify(error=message)
+    else:
+        response = current_app.response_class(message, mimetype="text/plain")
+    response.status_code = status
+    response.headers["Retry-After"] = str(seconds)
+    return response
+
+
+def _before_request():
+    limiter = current_app.extensions["ratelimit"]
+    rules = limiter.rules.get(request.endpoint)
+    if not rules:
+        return None
+    for rule in rules:
+        if not rule.applies(request):
+            continue
+        retry_after = limiter.wait(rule)
+        if retry_after:
+            return _reject(429, retry_after, rule, "rate")
+        if rule.pool is not None:
+            started = time.perf_counter()
+            if not limiter.pools.acquire(rule.pool):
+                return _reject(503, limiter.pools.timeout, rule, "concurrency")
+            g.setdefault("ratelimit_pools", []).append(rule.pool)
+            metrics = _metrics()
+            if metrics is not None:
+                metrics.observe("lostnfound_admission_wait_seconds", time.perf_counter() - started,
+                                pool=rule.pool)
+    return None
+
+
+def _release(pools, names):
+    for name in names:
+        pools.release(name)
+
+
+def _after_request(response):
+    names = g.pop("ratelimit_pools", None)
+    if names:
+        # Halaman di-stream: slot dilepas setelah body terakhir terkirim, bukan saat view selesai
+        pools = current_app.extensions["ratelimit"].pools
+        response.call_on_close(lambda: _release(pools, names))
+    return response
+
+
+def _teardown_request(exc):
+    # View error (after_request tidak jalan): slot tetap harus dilepas
+    names = g.pop("ratelimit_pools", None)
+    if names:
+        _release(current_app.extensions["ratelimit"].pools, names)
+
+
+def init_app(app):
+    config = app.config
+    if not config.get("RATELIMIT_ENABLED", True):
+        return
+
+    store = config.get("RATELIMIT_STORE", "memory")
+    if store == "sqlite":
+        path = config.get("RATELIMIT_STORE_PATH") or os.path.join(app.instance_path, "ratelimit.db")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        store = SQLiteStore(path)
+    elif store == "memory":
+        store = MemoryStore(max_keys=config.get("RATELIMIT_MAX_KEYS", 10000))
+    # Store lain (mis. Redis) cukup punya take(key, capacity, per_seconds) -> detik tunggu
+
+    app.extensions["ratelimit"] = Limiter(
+        rules=parse_rules(config.get("RATELIMITS")),
+        store=store,
+        pools=Pools(parse_pools(config.get("RATELIMIT_CONCURRENCY", "search=2,upload=2")),
+                    timeout=config.get("RATELIMIT_QUEUE_SECONDS", 2.0)),
+        ip_header=config.get("RATELIMIT_IP_HEADER"),
+    )
+
+    metrics = app.extensions.get("metrics")
+    if metrics is not None:
+        metrics.describe("lostnfound_ratelimit_rejected_total", "counter",
+                         "Request yang ditolak admission control per aturan dan alasan (rate/concurrency).")
+        metrics.describe("lostnfound_admission_wait_seconds", "histogram",
+                         "Lama menunggu slot konkurensi per kelompok (search/upload).")
+
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
@@ -1,6 +1,9 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session, current_app
 from app.models import Report, db
-import os, uuid
+from app import storage
+from app import streaming
+from app.pagination import keyset_stream
+from app.signals import report_saved, reports_deleted, reports_saving, snapshot
 
 report_bp = Blueprint('report_bp', __name__, template_folder='templates')
 
@@ -14,11 +17,12 @@ def report_page():
         file = request.files.get('image')
         filename = None
         if file and file.filename.strip():
-            ext = file.filename.rsplit('.', 1)[-1].lower()
-            filename = f"{uuid.uuid4().hex}.{ext}"
-            upload_dir = os.path.abspath(os.path.join(current_app.root_path, '..', 'static', 'uploads'))
-            os.makedirs(upload_dir, exist_ok=True)
-            file.save(os.path.join(upload_dir, filename))
+            # Disimpan per isi file (sha256); thumbnail dibuat di background
+            try:
+                filename = storage.ingest(file)
+            except storage.UploadRejected as e:
+                flash(str(e), 'danger')
+                return redirect(url_for('report_bp.report'))
         
         new_report = Report(
             user_id=session['user_id'],
@@ -31,12 +35,15 @@ def report_page():
             image_url=filename
         )
         db.session.add(new_report)
+        db.session.flush()    # id untuk job matching & notifikasi, di transaksi yang sama
+        reports_saving.send(current_app._get_current_object(), ids=[new_report.id], created=True)
         db.session.commit()
+        report_saved.send(current_app._get_current_object(), report=new_report, created=True)
         flash('Laporan berhasil dikirim!', 'success')
         return redirect(url_for('main_bp.index'))
     
-    reports = Report.query.all()
-    return render_template('report/index.html', reports=reports)
+    page = keyset_stream(Report.query, [Report.id], request.args.get('cursor'))
+    return streaming.render_page('report/index.html', reports=page)
 
 
 @report_bp.route('/edit/<int:report_id>', methods=['GET', 'POST'])
@@ -49,21 +56,20 @@ def edit_report(report_id):
         return redirect(url_for('profiles_bp.profile'))
     
     if request.method == 'POST':
+        previous = snapshot(report)
+
         # Update gambar jika ada file baru
         file = request.files.get('image')
         if file and file.filename.strip():
-            # Hapus gambar lama jika ada
-            if report.image_url:
-                old_file = os.path.join(current_app.root_path, '..', 'static', 'uploads', report.image_url)
-                if os.path.exists(old_file):
-                    os.remove(old_file)
-            
-            # Simpan gambar baru
-            ext = file.filename.rsplit('.', 1)[-1].lower()
-            filename = f"{uuid.uuid4().hex}.{ext}"
-            upload_dir = os.path.abspath(os.path.join(current_app.root_path, '..', 'static', 'uploads'))
-            os.makedirs(upload_dir, exist_ok=True)
-            file.save(os.path.join(upload_dir, filename))
+            try:
+                filename = storage.ingest(file)
+            except storage.UploadRejected as e:
+                flash(str(e), 'danger')
+                return redirect(url_for('report_bp.edit_report', report_id=report.id))
+
+            # Gambar lama dilepas; file-nya dihapus job background kalau tidak dipakai laporan lain
+            storage.release(report.image_url)
+            storage.collect_later([report.image_url])
             report.image_url = filename
         
         # Update data laporan
@@ -73,7 +79,10 @@ def edit_report(report_id):
         report.contact = request.form['contact']
         report.status = request.form.get('status', report.status)
         
+        reports_saving.send(current_app._get_current_object(), ids=[report.id], created=False)
         db.session.commit()
+        report_saved.send(current_app._get_current_object(), report=report,
+                          created=False, previous=previous)
         flash('Laporan berhasil diperbarui!', 'success')
         return redirect(url_for('profiles_bp.profile'))
     
@@ -88,15 +97,15 @@ def delete_report(report_id):
         flash('Kamu tidak punya izin untuk menghapus laporan ini.', 'danger')
         return redirect(url_for('profiles_bp.profile'))
     
-    # Hapus gambar jika ada
-    if report.image_url:
-        image_path = os.path.join(current_app.root_path, '..', 'static', 'uploads', report.image_url)
-        if os.path.exists(image_path):
-            os.remove(image_path)
-    
-    # Hapus record dari database
+    # Lepas gambar (refcount), lalu hapus record dari database. File fisiknya
+    # dihapus job background setelah commit, hanya kalau sudah tidak dipakai
+    deleted = snapshot(report)
+    storage.release(report.image_url)
+    storage.collect_later([report.image_url])
     db.session.delete(report)
     db.session.commit()
+
+    reports_deleted.send(current_app._get_current_object(), reports=[deleted])
     
     flash('Laporan berhasil dihapus!', 'success')
     return redirect(url_for('profiles_bp.profile'))
\ No newline at end of file
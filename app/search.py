@@ -0,0 +1,238 @@
+import re
+from markupsafe import Markup, escape
+from sqlalchemy import Float, Integer, String, and_, column, or_, select, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from app.models import db, Report
+from app.pagination import Page, decode_cursor, encode_cursor, get_per_page, keyset_paginate
+
+# Index teks per tabel: SQLite = tabel FTS5 <tabel>_fts, PostgreSQL = kolom tsvector
+# search_vector + index GIN (keduanya dibuat migrasi)
+FTS_TABLE = "report_fts"
+TSVECTOR_COLUMN = "search_vector"
+TS_CONFIG = "simple"
+
+# Bobot BM25 per kolom: item_name, location, description
+BM25_WEIGHTS = "10.0, 5.0, 1.0"
+# Bobot ts_rank_cd per label {D, C, B, A}: description = C, location = B, item_name = A
+TS_RANK_WEIGHTS = "{0.1, 0.1, 0.5, 1.0}"
+
+# Query FTS gagal karena index hilang (fts5 tidak ada, migrasi belum / di-downgrade)
+FTS_ERRORS = (OperationalError, ProgrammingError)
+
+# Penanda sementara untuk highlight; diganti <mark> setelah teks di-escape
+_HL_START, _HL_END = "\x02", "\x03"
+
+_fts_status = {}   # (engine url, tabel) -> bool
+
+
+def fts_available(model=Report):
+    """Cek sekali per proses apakah index teks tabel model sudah dibuat migrasi."""
+    engine = db.engine
+    table = model.__tablename__
+    key = (str(engine.url), table)
+    if key not in _fts_status:
+        available = False
+        if engine.dialect.name == "sqlite":
+            with engine.connect() as conn:
+                available = conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                    {"name": f"{table}_fts"},
+                ).first() is not None
+        elif engine.dialect.name == "postgresql":
+            with engine.connect() as conn:
+                available = conn.execute(
+                    text("SELECT 1 FROM information_schema.columns "
+                         "WHERE table_schema = current_schema() AND table_name = :table AND column_name = :column"),
+                    {"table": table, "column": TSVECTOR_COLUMN},
+                ).first() is not None
+        _fts_status[key] = available
+    return _fts_status[key]
+
+
+def mark_fts_unavailable(model=Report):
+    """Dipanggil kalau query FTS gagal (mis. modul fts5 hilang); selanjutnya pakai ilike."""
+    _fts_status[(str(db.engine.url), model.__tablename__)] = False
+
+
+def _is_postgresql():
+    return db.engine.dialect.name == "postgresql"
+
+
+def build_match_query(query):
+    """Ubah input user jadi query FTS: semua kata wajib ada, dengan prefix match.
+
+    SQLite: '"dompet"* "kulit"*' (FTS5), setiap kata dikutip supaya operator
+    FTS5 (AND, NEAR, *, ") dari user tidak pernah diinterpretasi.
+    PostgreSQL: 'dompet:* & kulit:*' untuk to_tsquery; kata hanya berisi \\w
+    jadi operator tsquery (& | ! ( ) :) juga tidak bisa masuk.
+    """
+    terms = re.findall(r"\w+", query.lower())[:8]
+    if _is_postgresql():
+        return " & ".join(f"{t}:*" for t in terms)
+    return " ".join(f'"{t}"*' for t in terms)
+
+
+def _highlight(value):
+    if not value:
+        return None
+    marked = str(escape(value)).replace(_HL_START, "<mark>").replace(_HL_END, "</mark>")
+    return Markup(marked)
+
+
+# ====================================
+# FTS5 (BM25) / TSVECTOR (ts_rank_cd)
+# ====================================
+_FTS_SQL = """
+SELECT {table}.rowid AS id,
+       bm25({table}, {weights}) AS score,
+       highlight({table}, 0, :hl_start, :hl_end) AS title,
+       snippet({table}, 2, :hl_start, :hl_end, '…', 16) AS snip
+FROM {table}
+WHERE {table} MATCH :match
+"""
+
+# Skor dinegatifkan supaya urutannya sama dengan bm25 (kecil = paling relevan).
+# ts_headline mahal, tapi PostgreSQL baru menghitungnya setelah ORDER BY ... LIMIT
+_TSVECTOR_SQL = """
+SELECT {table}.id AS id,
+       -ts_rank_cd('{weights}', {table}.{column}, q.query)::float8 AS score,
+       ts_headline('{config}', {table}.item_name, q.query, :hl_title) AS title,
+       ts_headline('{config}', coalesce({table}.description, ''), q.query, :hl_snip) AS snip
+FROM {table}, to_tsquery('{config}', :match) AS q(query)
+WHERE {table}.{column} @@ q.query
+"""
+
+_HL_TITLE = f"StartSel={_HL_START}, StopSel={_HL_END}, HighlightAll=true"
+_HL_SNIP = f"StartSel={_HL_START}, StopSel={_HL_END}, MaxWords=16, MinWords=8"
+
+
+def _ranked_sql(match, table):
+    if _is_postgresql():
+        sql = _TSVECTOR_SQL.format(table=table, column=TSVECTOR_COLUMN, config=TS_CONFIG, weights=TS_RANK_WEIGHTS)
+        return text(sql).bindparams(match=match, hl_title=_HL_TITLE, hl_snip=_HL_SNIP)
+    sql = _FTS_SQL.format(table=f"{table}_fts", weights=BM25_WEIGHTS)
+    return text(sql).bindparams(match=match, hl_start=_HL_START, hl_end=_HL_END)
+
+
+def fts_rows(match, cursor, per_page, condition=None, model=Report):
+    """Satu halaman (id, score, title, snip) urut relevansi dari index teks tabel model
+    (kolom item_name, location, description). condition hanya untuk tabel report."""
+    ranked = _ranked_sql(match, model.__tablename__).columns(
+        column("id", Integer), column("score", Float), column("title", String), column("snip", String),
+    ).subquery("ranked")
+
+    stmt = select(ranked)
+    values = decode_cursor(cursor, [ranked.c.score, ranked.c.id])
+    if values is not None:
+        cur_score, cur_id = values
+        stmt = stmt.where(or_(ranked.c.score > cur_score,
+                              and_(ranked.c.score == cur_score, ranked.c.id < cur_id)))
+    if condition is not None:
+        # Filter facet (jenis, status, lokasi, tanggal) lewat index tabel report
+        stmt = stmt.where(ranked.c.id.in_(select(Report.id).where(condition)))
+    rows = db.session.execute(
+        stmt.order_by(ranked.c.score, ranked.c.id.desc()).limit(per_page + 1)
+    ).all()
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor([rows[-1].score, rows[-1].id])
+    return rows, next_cursor
+
+
+def _fts_search(match, cursor, per_page, condition=None):
+    rows, next_cursor = fts_rows(match, cursor, per_page, condition)
+
+    # Ambil objek Report sekali jalan, lalu susun ulang sesuai ranking
+    return Page(ranked_objects(Report, rows), next_cursor)
+
+
+def ranked_objects(model, rows):
+    """Objek model untuk baris fts_rows (satu query), urut ranking, dengan highlight."""
+    by_id = {r.id: r for r in model.query.filter(model.id.in_([row.id for row in rows]))}
+    objects = []
+    for row in rows:
+        obj = by_id.get(row.id)
+        if obj is None:
+            continue
+        obj.search_title = _highlight(row.title)
+        obj.search_snippet = _highlight(row.snip)
+        objects.append(obj)
+    return objects
+
+
+# ====================================
+# FALLBACK: ILIKE
+# ====================================
+def ilike_filter(query, model=Report):
+    return or_(
+        model.item_name.ilike(f"%{query}%"),
+        model.location.ilike(f"%{query}%"),
+        model.description.ilike(f"%{query}%")
+    )
+
+
+def _ilike_search(query, cursor, per_page, condition=None):
+    reports_query = Report.query.filter(ilike_filter(query))
+    if condition is not None:
+        reports_query = reports_query.filter(condition)
+    return keyset_paginate(reports_query, [Report.id], cursor, per_page)
+
+
+def search_reports(query, cursor=None, per_page=None, condition=None):
+    """Cari laporan; pakai FTS5 / tsvector kalau tersedia, kalau tidak fallback ke ilike.
+
+    condition (opsional) = filter tambahan pada tabel report, mis. dari facet.
+    """
+    if per_page is None:
+        per_page = get_per_page()
+
+    match = build_match_query(query)
+    if match and fts_available():
+        try:
+            return _fts_search(match, cursor, per_page, condition)
+        except FTS_ERRORS:
+            # Misal modul fts5 hilang di build SQLite produksi
+            db.session.rollback()
+            mark_fts_unavailable()
+
+    return _ilike_search(query, cursor, per_page, condition)
+
+
+def search_ids(query, cursor=None, per_page=None, condition=None):
+    """Seperti search_reports, tapi hanya id urut relevansi (tanpa objek ORM).
+
+    Return Page berisi id; dipakai API yang mengambil kolomnya sendiri.
+    """
+    if per_page is None:
+        per_page = get_per_page()
+
+    match = build_match_query(query)
+    if match and fts_available():
+        try:
+            rows, next_cursor = fts_rows(match, cursor, per_page, condition)
+            return Page([row.id for row in rows], next_cursor)
+        except FTS_ERRORS:
+            db.session.rollback()
+            mark_fts_unavailable()
+
+    ids_query = db.session.query(Report.id).filter(ilike_filter(query))
+    if condition is not None:
+        ids_query = ids_query.filter(condition)
+    page = keyset_paginate(ids_query, [Report.id], cursor, per_page)
+    return Page([row.id for row in page.items], page.next_cursor)
+
+
+def search_condition(query):
+    """Kondisi WHERE "laporan cocok dengan kata kunci" (tanpa ranking), untuk hitungan facet."""
+    match = build_match_query(query)
+    if match and fts_available():
+        if _is_postgresql():
+            # Langsung di tabel report: index GIN digabung (BitmapAnd) dengan index facet
+            return text(f"report.{TSVECTOR_COLUMN} @@ to_tsquery('{TS_CONFIG}', :match)") \
+                .bindparams(match=match)
+        matched = text(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match") \
+            .bindparams(match=match).columns(column("rowid", Integer))
+        return Report.id.in_(matched)
+    return ilike_filter(query)
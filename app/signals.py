@@ -0,0 +1,24 @@
+from blinker import Namespace
+
+# Dikirim SETELAH commit, sender = app.
+#   report_saved:     report=<Report>, created=bool, previous=<dict|None>
+#   reports_deleted:  reports=[<dict snapshot>, ...]
+#   reports_updated:  reports=[<dict snapshot sesudah update>, ...]  (update massal admin)
+#   reports_created:  reports=[<dict snapshot>, ...]  (impor massal, per batch)
+#
+# Dikirim SEBELUM commit, di transaksi yang sama, sender = app. Receiver hanya
+# menulis lewat db.session tanpa commit (mis. jobs.enqueue), jadi pekerjaan
+# lanjutannya tersimpan atau batal bersama laporannya.
+#   reports_saving:   ids=[id, ...], created=bool  (form, edit, moderasi, impor)
+_signals = Namespace()
+
+report_saved = _signals.signal("report-saved")
+reports_deleted = _signals.signal("reports-deleted")
+reports_updated = _signals.signal("reports-updated")
+reports_created = _signals.signal("reports-created")
+reports_saving = _signals.signal("reports-saving")
+
+
+def snapshot(report):
+    """Salin kolom Report ke dict, aman dipakai setelah baris dihapus/di-commit."""
+    return {c.key: getattr(report, c.key) for c in report.__table__.columns}
@@ -0,0 +1,211 @@
+import os
+import time
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+templates_cli = AppGroup("templates", help="Kelola template Jinja.")
+
+
+# ====================================
+# FLASK-MIGRATE (LAZY)
+# ====================================
+def init_migrate(app):
+    """Pasang Flask-Migrate. Alembic cukup berat diimport, jadi hanya untuk CLI/seeding."""
+    from flask_migrate import Migrate
+    from app import db
+
+    if "migrate" not in app.extensions:
+        Migrate(app, db)
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
+# Skema versi awal (run.py lama memakai db.create_all(), tanpa Alembic) sama
+# dengan migrasi awal; kolom image_url yang sudah ada dilewati afc09d610b5d
+BASELINE_TABLES = {"user", "project", "report"}
+BASELINE_REVISION = "b00cdd4b5053"
+
+
+def upgrade_schema(app):
+    """`flask db upgrade` dari kode, dipanggil sekali saat server start.
+
+    Beda dengan db.create_all(): tabel FTS5 + trigger-nya dan index dari
+    migrasi ikut dibuat. Database versi awal (hasil create_all, tanpa tabel
+    alembic_version) di-stamp dulu ke migrasi awal lalu di-upgrade; skema
+    lain tanpa alembic_version ditolak supaya tabelnya tidak dibuat ulang.
+    """
+    from flask_migrate import stamp, upgrade
+    from sqlalchemy import inspect
+    from app import db
+
+    init_migrate(app)
+    with app.app_context():
+        tables = set(inspect(db.engine).get_table_names())
+        if tables and "alembic_version" not in tables:
+            if "report" not in tables or not tables <= BASELINE_TABLES:
+                raise RuntimeError(
+                    "Database dibuat tanpa migrasi (tidak ada tabel alembic_version) dan "
+                    f"skemanya bukan versi awal ({', '.join(sorted(tables))}). Jalankan "
+                    "`flask db stamp <revisi>` untuk skema yang sudah ada, lalu start ulang."
+                )
+            app.logger.info("Database tanpa alembic_version: di-stamp ke %s", BASELINE_REVISION)
+            stamp(directory=MIGRATIONS_DIR, revision=BASELINE_REVISION)
+        upgrade(directory=MIGRATIONS_DIR)
+
+
+class LazyMigrateGroup(click.Group):
+    """`flask db ...` yang baru mengimport Flask-Migrate ketika perintahnya dipanggil.
+
+    Context dibuat oleh group asli Flask-Migrate, jadi opsi & callback-nya
+    (mis. --directory) tetap berlaku.
+    """
+
+    def make_context(self, info_name, args, parent=None, **extra):
+        from flask_migrate.cli import db as db_cli
+
+        init_migrate(current_app)
+        return db_cli.make_context(info_name, args, parent=parent, **extra)
+
+
+# ====================================
+# INSTRUMENTASI
+# ====================================
+def process_age():
+    """Detik sejak proses ini dimulai (Linux, dari /proc). None kalau tidak tersedia."""
+    try:
+        with open("/proc/self/stat") as f:
+            # Field ke-22 = starttime dalam clock tick sejak boot; nama proses bisa berisi spasi
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+
+
+class StartupTimer:
+    """Durasi tiap fase boot; ringkasannya di-log dan diekspor ke /admin/metrics."""
+
+    def __init__(self, imports=None):
+        self.phases = {}
+        if imports is not None:
+            self.phases["imports"] = imports
+        self._last = time.perf_counter()
+
+    def mark(self, name):
+        """Tutup fase `name` (waktu sejak mark sebelumnya)."""
+        now = time.perf_counter()
+        self.phases[name] = now - self._last
+        self._last = now
+
+    def summary(self):
+        total = sum(self.phases.values())
+        parts = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.phases.items())
+        return f"{parts} (total {total * 1000:.0f} ms)"
+
+    def export(self, registry):
+        registry.describe("lostnfound_startup_seconds", "gauge", "Durasi fase boot aplikasi.")
+        for name, seconds in self.phases.items():
+            registry.set("lostnfound_startup_seconds", round(seconds, 6), phase=name)
+
+
+def _first_request_hook(app):
+    done = []
+
+    def first_request():
+        if done:
+            return
+        done.append(True)
+        age = process_age()
+        if age is not None:
+            app.logger.info("Request pertama %.2f detik setelah proses dimulai", age)
+            metrics = app.extensions.get("metrics")
+            if metrics is not None:
+                metrics.describe("lostnfound_first_request_seconds", "gauge",
+                                 "Detik dari start proses sampai request pertama.")
+                metrics.set("lostnfound_first_request_seconds", round(age, 3))
+
+    app.before_request(first_request)
+
+
+# ====================================
+# JINJA BYTECODE CACHE
+# ====================================
+def setup_bytecode_cache(app):
+    from jinja2 import FileSystemBytecodeCache
+
+    directory = app.config.get("JINJA_CACHE_DIR")
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory)
+
+
+@templates_cli.command("compile")
+def compile_templates():
+    """Kompilasi semua template ke bytecode cache (dijalankan saat build image)."""
+    env = current_app.jinja_env
+    if env.bytecode_cache is None:
+        raise click.ClickException("JINJA_CACHE_DIR belum diset.")
+    names = env.list_templates()
+    for name in names:
+        env.get_template(name)
+    click.echo(f"{len(names)} template dikompilasi ke {current_app.config['JINJA_CACHE_DIR']}.")
+
+
+# ====================================
+# WARM-UP
+# ====================================
+def _read_file(path, limit):
+    """Baca file database sekali supaya halamannya sudah ada di page cache OS."""
+    read = 0
+    with open(path, "rb") as f:
+        while read < limit:
+            chunk = f.read(min(1024 * 1024, limit - read))
+            if not chunk:
+                break
+            read += len(chunk)
+    return read
+
+
+def warm_up(app):
+    """Panaskan worker sebelum request sungguhan datang.
+
+    - file SQLite dibaca ke page cache OS (maks WARMUP_MAX_BYTES),
+    - halaman utama & API dirender sekali lewat test client, sehingga cache
+      halaman SQLite, template Jinja, fragment cache dan koneksi DB sudah siap.
+    """
+    timer = app.extensions.get("startup")
+    started = time.perf_counter()
+
+    from app import db
+    with app.app_context():
+        engine = db.engine
+        path = engine.url.database if engine.dialect.name == "sqlite" else None
+    if path and os.path.exists(path):
+        _read_file(path, app.config.get("WARMUP_MAX_BYTES", 32 * 1024 * 1024))
+
+    client = app.test_client()
+    # /suggest sekaligus membangun index saran sebelum request pertama
+    for url in app.config.get("WARMUP_URLS", ("/", "/api/v1/reports?per_page=1", "/api/v1/suggest?q=a")):
+        try:
+            client.get(url).close()
+        except Exception:
+            app.logger.exception("Warm-up %s gagal", url)
+
+    elapsed = time.perf_counter() - started
+    if timer is not None:
+        timer.phases["warmup"] = elapsed
+        metrics = app.extensions.get("metrics")
+        if metrics is not None:
+            timer.export(metrics)
+    app.logger.info("Warm-up selesai dalam %.0f ms", elapsed * 1000)
+
+
+def init_app(app, timer):
+    app.extensions["startup"] = timer
+    setup_bytecode_cache(app)
+    _first_request_hook(app)
+    app.cli.add_command(templates_cli)
+    app.cli.add_command(LazyMigrateGroup("db", help="Migrasi database (Flask-Migrate)."))
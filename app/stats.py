@@ -0,0 +1,215 @@
+from collections import Counter
+import click
+from flask import g, has_app_context
+from flask.cli import AppGroup
+from sqlalchemy import bindparam, delete, event, func, inspect, select
+from app.database import dialect_insert
+from app.models import db, ArchivedReport, Report, ReportStat
+
+stats_cli = AppGroup("stats", help="Counter statistik laporan.")
+
+# Baris user_id 0 = total semua user (laporan tanpa user hanya masuk ke sini)
+GLOBAL = 0
+RESOLVED = "Sudah ditemukan"
+
+_DEFAULT_TYPE = Report.__table__.c.report_type.default.arg
+_DEFAULT_STATUS = Report.__table__.c.status.default.arg
+
+
+class Stats:
+    """Counter satu user (atau global) dalam bentuk yang enak dipakai template."""
+
+    def __init__(self, counts):
+        self.counts = counts    # (report_type, status) -> jumlah
+
+    def count(self, report_type=None, status=None):
+        return sum(n for (t, s), n in self.counts.items()
+                   if report_type in (None, t) and status in (None, s))
+
+    @property
+    def total(self):
+        return self.count()
+
+    @property
+    def lost(self):
+        return self.count(report_type="lost")
+
+    @property
+    def found(self):
+        return self.count(report_type="found")
+
+    @property
+    def resolved(self):
+        return self.count(status=RESOLVED)
+
+    @property
+    def open(self):
+        return self.total - self.resolved
+
+
+# ====================================
+# DELTA
+# ====================================
+def _key(user_id, report_type, status):
+    return user_id, report_type or _DEFAULT_TYPE, status or _DEFAULT_STATUS
+
+
+def count_rows(rows, sign=1):
+    """Delta dari baris laporan (mapping / dict): +1 atau -1 per baris."""
+    deltas = Counter()
+    for row in rows:
+        deltas[_key(row.get("user_id"), row.get("report_type"), row.get("status"))] += sign
+    return deltas
+
+
+def apply(session, deltas):
+    """Tambahkan delta ke counter (upsert count = count + n), di transaksi session.
+
+    INSERT lewat ORM terhitung otomatis; UPDATE/DELETE massal wajib memanggil
+    ini sendiri (lihat app/moderation.py) karena baris lamanya tidak terlihat.
+    """
+    merged = Counter()
+    for (user_id, report_type, status), n in deltas.items():
+        merged[(GLOBAL, report_type, status)] += n
+        if user_id is not None:
+            merged[(user_id, report_type, status)] += n
+    rows = [{"u": u, "t": t, "s": s, "n": n} for (u, t, s), n in merged.items() if n]
+    if not rows:
+        return
+
+    connection = session.connection()
+    table = ReportStat.__table__
+    insert = dialect_insert(connection.dialect.name)
+    stmt = insert(table).values(user_id=bindparam("u"), report_type=bindparam("t"),
+                                status=bindparam("s"), count=bindparam("n"))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "report_type", "status"],
+        set_={"count": table.c.count + stmt.excluded.count},
+    )
+    connection.execute(stmt, rows)
+
+
+# ====================================
+# LISTENER
+# ====================================
+def _committed(state, name):
+    """Nilai kolom sebelum flush ini (untuk laporan yang diedit / dihapus)."""
+    history = state.attrs[name].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return state.attrs[name].value
+
+
+def _after_flush(session, flush_context):
+    deltas = Counter()
+    for obj in session.new:
+        if isinstance(obj, Report):
+            deltas[_key(obj.user_id, obj.report_type, obj.status)] += 1
+    for obj in session.deleted:
+        if isinstance(obj, Report):
+            state = inspect(obj)
+            deltas[_key(*(_committed(state, c) for c in ("user_id", "report_type", "status")))] -= 1
+    for obj in session.dirty:
+        if isinstance(obj, Report) and session.is_modified(obj):
+            state = inspect(obj)
+            deltas[_key(*(_committed(state, c) for c in ("user_id", "report_type", "status")))] -= 1
+            deltas[_key(obj.user_id, obj.report_type, obj.status)] += 1
+    apply(session, deltas)
+
+
+def _do_orm_execute(state):
+    # INSERT massal (seeding, impor): barisnya ada di parameter
+    if not state.is_insert or state.bind_mapper is None or state.bind_mapper.class_ is not Report:
+        return None
+    params = state.parameters
+    if isinstance(params, dict):
+        params = [params]
+    if not params:
+        return None
+    result = state.invoke_statement()
+    apply(state.session, count_rows(params))
+    return result
+
+
+# ====================================
+# BACA
+# ====================================
+def for_user(user_id=None):
+    """Stats satu user, atau global kalau user_id None. Satu range scan primary key,
+    disimpan di g supaya pemanggilan berulang dalam satu request gratis."""
+    user_id = GLOBAL if user_id is None else user_id
+    cache = g.setdefault("_report_stats", {}) if has_app_context() else {}
+    if user_id not in cache:
+        rows = db.session.execute(
+            select(ReportStat.report_type, ReportStat.status, ReportStat.count)
+            .where(ReportStat.user_id == user_id)
+        ).all()
+        cache[user_id] = Stats({(t, s): n for t, s, n in rows})
+    return cache[user_id]
+
+
+# ====================================
+# REBUILD
+# ====================================
+def _actual():
+    # Laporan yang sudah diarsip (app/archive.py) tetap dihitung
+    rows = [row for model in (Report, ArchivedReport) for row in db.session.execute(
+        select(model.user_id, model.report_type, model.status, func.count())
+        .group_by(model.user_id, model.report_type, model.status)
+    )]
+    actual = Counter()
+    for user_id, report_type, status, n in rows:
+        user_id, report_type, status = _key(user_id, report_type, status)
+        actual[(GLOBAL, report_type, status)] += n
+        if user_id is not None:
+            actual[(user_id, report_type, status)] += n
+    return actual
+
+
+def drift(actual=None):
+    """[(key, counter, sebenarnya)] untuk counter yang tidak cocok dengan tabel report."""
+    stored = {(r.user_id, r.report_type, r.status): r.count
+              for r in db.session.scalars(select(ReportStat))}
+    if actual is None:
+        actual = _actual()
+    return [(key, stored.get(key, 0), actual.get(key, 0))
+            for key in sorted(set(stored) | set(actual), key=str)
+            if stored.get(key, 0) != actual.get(key, 0)]
+
+
+def rebuild():
+    """Hitung ulang semua counter dari tabel report + arsip. Return drift sebelum rebuild."""
+    actual = _actual()
+    found = drift(actual)
+    db.session.execute(delete(ReportStat))
+    if actual:
+        db.session.execute(ReportStat.__table__.insert(), [
+            {"user_id": u, "report_type": t, "status": s, "count": n}
+            for (u, t, s), n in actual.items()
+        ])
+    db.session.commit()
+    return found
+
+
+@stats_cli.command("rebuild")
+@click.option("--check", is_flag=True, help="Hanya laporkan selisih, tanpa memperbaiki.")
+def rebuild_command(check):
+    """Samakan counter report_stat dengan isi tabel report."""
+    found = drift() if check else rebuild()
+    for (user_id, report_type, status), stored, actual in found:
+        click.echo(f"  user {user_id} {report_type}/{status}: {stored} -> {actual}")
+    if check and found:
+        click.echo(f"{len(found)} counter tidak cocok.", err=True)
+        raise SystemExit(1)
+    click.echo(f"{len(found)} counter {'tidak cocok' if check else 'diperbaiki'}.")
+
+
+def init_app(app):
+    session_class = db.session.session_factory.class_
+    if not event.contains(session_class, "after_flush", _after_flush):
+        event.listen(session_class, "after_flush", _after_flush)
+        event.listen(session_class, "do_orm_execute", _do_orm_execute)
+    app.add_template_global(for_user, "report_stats")
+    app.cli.add_command(stats_cli)
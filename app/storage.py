@@ -0,0 +1,409 @@
+import hashlib
+import mimetypes
+import os
+import tempfile
+import threading
+import time
+import click
+from datetime import datetime, timezone
+from flask import Request, Response, abort, current_app, flash, redirect, request, send_from_directory, url_for
+from flask.cli import AppGroup
+from sqlalchemy import delete, select, text
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.security import safe_join
+from app import images, jobs
+from app.assets import file_digest
+from app.models import db, ArchivedReport, Report, Upload
+
+try:
+    import fcntl
+except ImportError:  # Windows: sweeper tetap jalan, hanya tanpa lock antar worker
+    fcntl = None
+
+CHUNK_SIZE = 64 * 1024
+SPOOL_PREFIX = ".upload-"
+
+uploads_cli = AppGroup("uploads", help="Kelola file di UPLOAD_FOLDER.")
+
+# Tanda tangan file (magic bytes) -> ekstensi yang disimpan
+_SIGNATURES = [
+    (b"\xff\xd8\xff", "jpg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+]
+
+
+NOT_AN_IMAGE = "File harus berupa gambar JPG, PNG, GIF, atau WEBP."
+
+
+class UploadRejected(Exception):
+    """File upload ditolak (bukan gambar, kosong, dll). Pesan siap ditampilkan ke user."""
+
+
+def sniff_image_type(head):
+    for signature, ext in _SIGNATURES:
+        if head.startswith(signature):
+            return ext
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+# ====================================
+# STREAMING INGEST
+# ====================================
+class HashingSpool:
+    """File sementara di UPLOAD_FOLDER yang menghitung sha256 sambil ditulis.
+
+    Dipakai langsung oleh parser multipart Werkzeug, jadi body upload
+    mengalir ke disk per chunk tanpa pernah ditampung utuh di memori, dan
+    file final cukup di-rename (satu filesystem, tanpa salin ulang).
+    """
+
+    def __init__(self, directory, limit=None):
+        fd, self.path = tempfile.mkstemp(dir=directory, prefix=SPOOL_PREFIX, suffix=".part")
+        self._file = os.fdopen(fd, "w+b")
+        self.limit = limit
+        self.size = 0
+        self.head = b""
+        self.sha256 = hashlib.sha256()
+        self.claimed = False
+
+    def write(self, data):
+        self.size += len(data)
+        if self.limit is not None and self.size > self.limit:
+            raise RequestEntityTooLarge()
+        if len(self.head) < 16:
+            self.head += data[:16 - len(self.head)]
+        self.sha256.update(data)
+        return self._file.write(data)
+
+    def close(self):
+        self._file.close()
+        # Belum di-rename ke nama final -> sisa upload, buang
+        if not self.claimed and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+
+class UploadRequest(Request):
+    def _get_file_stream(self, total_content_length, content_type, filename=None,
+                         content_length=None):
+        return HashingSpool(current_app.config["UPLOAD_FOLDER"],
+                            current_app.config.get("MAX_CONTENT_LENGTH"))
+
+
+def upload_folder():
+    return current_app.config["UPLOAD_FOLDER"]
+
+
+def save_upload(file):
+    """Simpan FileStorage dengan nama sha256 isinya. Return (filename, is_new, size).
+
+    EXIF dibuang dulu (images.strip_metadata), jadi nama file = hash isi yang
+    benar-benar disajikan. Foto identik cukup disimpan sekali; refcount-nya
+    dinaikkan lewat attach().
+    """
+    spool = file.stream
+    if not isinstance(spool, HashingSpool):
+        # Bukan dari UploadRequest (mis. dipanggil dari CLI): spool manual
+        source = spool
+        spool = HashingSpool(upload_folder(), current_app.config.get("MAX_CONTENT_LENGTH"))
+        try:
+            while True:
+                chunk = source.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                spool.write(chunk)
+            spool.flush()
+        except Exception:
+            spool.close()
+            raise
+
+    try:
+        if spool.size == 0:
+            raise UploadRejected("File gambar kosong.")
+        ext = sniff_image_type(spool.head)
+        if ext is None:
+            raise UploadRejected(NOT_AN_IMAGE)
+
+        spool.flush()
+        digest, size = spool.sha256.hexdigest(), spool.size
+        try:
+            stripped = images.strip_metadata(spool.path)
+        except images.DECODE_ERRORS:
+            # Magic bytes cocok tapi isinya bukan gambar yang bisa dibaca
+            raise UploadRejected(NOT_AN_IMAGE)
+        if stripped:
+            # EXIF dibuang sebelum diberi nama: hash & ukuran dari isi yang disimpan
+            digest, size = file_digest(spool.path, length=64), os.path.getsize(spool.path)
+        filename = f"{digest}.{ext}"
+        final_path = os.path.join(upload_folder(), filename)
+        is_new = not os.path.exists(final_path)
+        if is_new:
+            os.replace(spool.path, final_path)
+            spool.claimed = True
+        else:
+            # Dipakai lagi: segarkan mtime supaya sweeper tidak menganggapnya yatim
+            os.utime(final_path)
+        return filename, is_new, size
+    finally:
+        if not isinstance(file.stream, HashingSpool):
+            spool.close()
+
+
+def ingest(file):
+    """save_upload + attach + antrekan turunan. Return nama file untuk Report.image_url."""
+    filename, is_new, size = save_upload(file)
+    attach(filename, size)
+    if is_new:
+        images.schedule(filename)
+    return filename
+
+
+# ====================================
+# REFERENCE COUNTING
+# ====================================
+def _insert(table):
+    if db.session.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+
+def attach(filename, size=None):
+    """Naikkan refcount (di transaksi yang sama dengan insert/update Report)."""
+    stmt = _insert(Upload.__table__).values(
+        filename=filename, refcount=1, size=size,
+        created_at=datetime.now(timezone.utc),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["filename"],
+        set_={"refcount": Upload.__table__.c.refcount + 1},
+    )
+    db.session.execute(stmt)
+
+
+def release(filename):
+    """Turunkan refcount. File fisiknya baru dihapus oleh collect() setelah commit
+    (antrekan lewat collect_later() di transaksi yang sama)."""
+    if not filename:
+        return
+    db.session.execute(
+        text("UPDATE upload SET refcount = refcount - 1 WHERE filename = :f"),
+        {"f": filename},
+    )
+
+
+def collect(filenames):
+    """Hapus file yang sudah tidak dipakai laporan mana pun. Panggil setelah commit.
+
+    Satu SELECT untuk semua refcount dan satu DELETE untuk barisnya, berapa
+    pun jumlah file (bulk delete admin bisa melepas ratusan foto sekaligus).
+    """
+    filenames = set(filter(None, filenames))
+    if not filenames:
+        return []
+
+    directory = upload_folder()
+    in_use = {
+        row.filename for row in
+        db.session.query(Upload.filename)
+        .filter(Upload.filename.in_(filenames), Upload.refcount > 0)
+    }
+    removed = sorted(filenames - in_use)
+    for filename in removed:
+        remove_file(directory, filename)
+
+    if removed:
+        # Baris dihapus terakhir dan hanya kalau masih 0, jadi upload ulang
+        # foto yang sama di antara dua langkah ini tetap tercatat.
+        db.session.execute(
+            delete(Upload).where(Upload.filename.in_(removed), Upload.refcount <= 0)
+        )
+    db.session.commit()
+    return removed
+
+
+def collect_later(filenames):
+    """Antrekan collect() sebagai job; ikut commit bersama release() yang memanggilnya."""
+    filenames = sorted(set(filter(None, filenames)))
+    if filenames:
+        jobs.enqueue("uploads.collect", {"filenames": filenames})
+
+
+@jobs.handler("uploads.collect")
+def _collect_job(payload):
+    collect(payload["filenames"])
+
+
+def remove_file(directory, filename):
+    path = os.path.join(directory, filename)
+    if os.path.exists(path):
+        os.remove(path)
+    images.remove_derivatives(directory, filename)
+
+
+# ====================================
+# SWEEPER (FILE YATIM)
+# ====================================
+def orphan_candidates(directory, min_age):
+    """File lebih tua dari min_age detik yang mungkin yatim.
+
+    Turunan hanya jadi kandidat kalau foto aslinya sudah tidak ada; sisanya
+    ikut terhapus bersama foto asli lewat remove_file().
+    """
+    cutoff = time.time() - min_age
+    entries = [e for e in os.scandir(directory) if e.is_file()]
+    sources = {e.name.rsplit(".", 1)[0] for e in entries
+               if not images.is_derivative(e.name) and not e.name.startswith(SPOOL_PREFIX)}
+    for entry in entries:
+        if entry.stat().st_mtime > cutoff:
+            continue
+        if images.is_derivative(entry.name):
+            if entry.name.rsplit(".", 1)[0].rsplit("_", 1)[0] in sources:
+                continue
+        yield entry.name
+
+
+def sweep(batch_size=200, pause=1.0, min_age=3600, dry_run=False):
+    """Cocokkan UPLOAD_FOLDER dengan image_url laporan (aktif + arsip), hapus yang tidak direferensikan.
+
+    Dihapus per batch dengan jeda supaya disk & lock database tidak dimonopoli.
+    min_age melindungi upload yang transaksinya belum commit (save_upload
+    juga menyegarkan mtime foto yang dipakai ulang). Return jumlah file dihapus.
+    """
+    directory = upload_folder()
+    referenced = {
+        name for model in (Report, ArchivedReport) for name in db.session.scalars(
+            select(model.image_url).where(model.image_url.isnot(None)).distinct())
+    }
+    candidates = [name for name in orphan_candidates(directory, min_age) if name not in referenced]
+    if dry_run:
+        return candidates
+
+    removed = []
+    for start in range(0, len(candidates), batch_size):
+        batch = candidates[start:start + batch_size]
+        # Cek ulang tepat sebelum hapus: bisa saja baru dipakai laporan lain
+        still_used = {
+            name for model in (Report, ArchivedReport) for name in db.session.scalars(
+                select(model.image_url).where(model.image_url.in_(batch)))
+        }
+        batch = [name for name in batch if name not in still_used]
+        for name in batch:
+            remove_file(directory, name)
+        db.session.execute(delete(Upload).where(Upload.filename.in_(batch)))
+        db.session.commit()
+        removed.extend(batch)
+        if pause and start + batch_size < len(candidates):
+            time.sleep(pause)
+    return removed
+
+
+def _sweep_due(app, interval):
+    """Hanya satu worker yang menyapu per interval (lock + mtime file penanda)."""
+    path = os.path.join(app.instance_path, "upload-sweep.lock")
+    os.makedirs(app.instance_path, exist_ok=True)
+    with open(path, "a") as lock:
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return False
+        if time.time() - os.path.getmtime(path) < interval and os.path.getsize(path):
+            return False
+        lock.seek(0)
+        lock.truncate()
+        lock.write(str(os.getpid()))
+        lock.flush()
+        with app.app_context():
+            removed = sweep(
+                batch_size=app.config.get("UPLOAD_SWEEP_BATCH", 200),
+                pause=app.config.get("UPLOAD_SWEEP_PAUSE", 1.0),
+                min_age=app.config.get("UPLOAD_SWEEP_MIN_AGE", 3600),
+            )
+        if removed:
+            app.logger.info("Sweeper upload: %d file yatim dihapus", len(removed))
+        return True
+
+
+def _sweeper_loop(app, interval):
+    while True:
+        time.sleep(interval)
+        try:
+            _sweep_due(app, interval)
+        except Exception:
+            app.logger.exception("Sweeper upload gagal")
+
+
+def _start_sweeper(app):
+    """Thread dimulai saat request pertama, jadi CLI/master gunicorn tidak ikut menyapu."""
+    interval = app.config.get("UPLOAD_SWEEP_INTERVAL", 0)
+    started = threading.Event()
+
+    def start():
+        if started.is_set():
+            return
+        started.set()
+        threading.Thread(target=_sweeper_loop, args=(app, interval),
+                         name="upload-sweeper", daemon=True).start()
+
+    if interval > 0:
+        app.before_request(start)
+
+
+@uploads_cli.command("sweep")
+@click.option("--dry-run", is_flag=True, help="Hanya tampilkan file yang akan dihapus.")
+@click.option("--min-age", default=3600, show_default=True, help="Umur minimal file (detik).")
+@click.option("--batch-size", default=200, show_default=True)
+@click.option("--pause", default=1.0, show_default=True, help="Jeda antar batch (detik).")
+def sweep_command(dry_run, min_age, batch_size, pause):
+    """Hapus file di UPLOAD_FOLDER yang tidak dipakai laporan mana pun."""
+    result = sweep(batch_size=batch_size, pause=pause, min_age=min_age, dry_run=dry_run)
+    for name in result:
+        click.echo(f"  {name}")
+    click.echo(f"{len(result)} file {'akan dihapus' if dry_run else 'dihapus'}.")
+
+
+# ====================================
+# SERVING & ERRORS
+# ====================================
+def serve_upload(filename):
+    """Kirim foto dari UPLOAD_FOLDER.
+
+    UPLOAD_ACCEL = "x-accel-redirect" (nginx) atau "x-sendfile" (Apache/lighttpd):
+    Flask cuma membalas header, byte gambarnya dikirim oleh proxy di depan.
+    """
+    mode = current_app.config.get("UPLOAD_ACCEL")
+    if not mode:
+        return send_from_directory(upload_folder(), filename)
+
+    path = safe_join(upload_folder(), filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+
+    response = Response(mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream")
+    if mode == "x-accel-redirect":
+        prefix = current_app.config.get("UPLOAD_ACCEL_PREFIX", "/protected-uploads/")
+        response.headers["X-Accel-Redirect"] = prefix.rstrip("/") + "/" + filename
+    else:
+        response.headers["X-Sendfile"] = os.path.abspath(path)
+    return response
+
+
+def _too_large(error):
+    limit_mb = (current_app.config.get("MAX_CONTENT_LENGTH") or 0) // (1024 * 1024)
+    flash(f"Ukuran file terlalu besar (maksimal {limit_mb} MB).", "danger")
+    return redirect(request.referrer or url_for("report_bp.report"))
+
+
+def init_app(app):
+    app.request_class = UploadRequest
+    app.register_error_handler(413, _too_large)
+    app.cli.add_command(uploads_cli)
+    _start_sweeper(app)
@@ -0,0 +1,43 @@
+from flask import Response, current_app, get_flashed_messages, render_template, stream_template
+
+# Potongan pertama dikirim secepatnya (shell halaman), sisanya per ~8 KB
+FIRST_CHUNK = 1024
+CHUNK_SIZE = 8 * 1024
+
+
+def enabled():
+    return current_app.config.get("STREAM_TEMPLATES", True)
+
+
+def buffered(chunks, size=CHUNK_SIZE, first=FIRST_CHUNK):
+    """Gabungkan output Jinja (banyak potongan kecil) jadi potongan ~size byte."""
+    buffer = []
+    length = 0
+    limit = first
+    for chunk in chunks:
+        buffer.append(chunk)
+        length += len(chunk)
+        if length >= limit:
+            yield "".join(buffer)
+            buffer, length, limit = [], 0, size
+    if buffer:
+        yield "".join(buffer)
+
+
+def render_page(template_name, **context):
+    """render_template, atau dikirim bertahap kalau STREAM_TEMPLATES aktif.
+
+    Dengan streaming, header + navbar sampai ke browser sebelum query daftar
+    selesai, dan kartu laporan ditulis sambil dibaca dari database.
+    """
+    if not enabled():
+        return render_template(template_name, **context)
+
+    # Flash diambil sekarang: setelah header terkirim, perubahan session tidak tersimpan
+    get_flashed_messages()
+    size = current_app.config.get("STREAM_CHUNK_BYTES", CHUNK_SIZE)
+    response = Response(buffered(stream_template(template_name, **context), size),
+                        mimetype="text/html")
+    # Minta proxy (nginx / Fly) meneruskan potongan tanpa menunggu respons lengkap
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,251 @@
+import heapq
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+from flask import current_app
+from sqlalchemy import select
+from app import data_version
+from app.models import db, Report
+from app.signals import report_saved, reports_created, reports_deleted
+
+# Kolom yang diindeks: jenis saran -> kolom Report
+KINDS = (("item", "item_name"), ("location", "location"))
+
+# Per istilah, kata ke-1..MAX_WORDS juga jadi awal kunci ("kulit" -> "dompet kulit")
+MAX_WORDS = 4
+MAX_TERM_LENGTH = 60
+RESULT_CACHE_SIZE = 2048
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def normalize(text):
+    """'  Dompet  KULIT-coklat ' -> 'dompet kulit coklat' (NFKC, casefold, tanpa tanda baca)."""
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    return " ".join(_WORD_RE.findall(text))[:MAX_TERM_LENGTH]
+
+
+def _keys(norm):
+    words = norm.split(" ")
+    return [" ".join(words[i:]) for i in range(min(len(words), MAX_WORDS))]
+
+
+class SuggestIndex:
+    """Index prefix di memori: array kunci terurut + bobot frekuensi per istilah.
+
+    Istilah = nilai item_name / location yang sudah dinormalisasi. Setiap
+    istilah disimpan dengan beberapa kunci (mulai dari tiap kata), jadi
+    "kul" menemukan "dompet kulit". Pencarian = dua bisect + top-k atas
+    rentangnya; hasil per prefix di-cache sampai index berubah.
+
+    Jumlah istilah dibatasi max_terms: saat build yang disimpan istilah
+    paling sering, setelah itu istilah baru diabaikan sampai rebuild.
+    """
+
+    def __init__(self, max_terms=20000):
+        self.max_terms = max_terms
+        self.version = None             # data_version saat terakhir dibangun
+        self.dropped = 0                # istilah yang tidak masuk karena batas
+        self._terms = {}                # (kind, norm) -> [teks asli, bobot]
+        self._keys = []                 # kunci terurut
+        self._refs = []                 # _refs[i] = (kind, norm) pemilik _keys[i]
+        self._results = OrderedDict()   # (prefix, limit) -> hasil (LRU)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._terms)
+
+    # ---------- build ----------
+    def load(self, rows, version=None):
+        """Bangun ulang dari iterable (kind, teks). Struktur lama diganti sekaligus."""
+        counts = Counter()
+        display = {}
+        for kind, text in rows:
+            norm = normalize(text)
+            if norm:
+                counts[(kind, norm)] += 1
+                display.setdefault((kind, norm), text.strip())
+
+        kept = counts.most_common(self.max_terms)
+        terms = {ref: [display[ref], n] for ref, n in kept}
+        entries = sorted((key, ref) for ref in terms for key in _keys(ref[1]))
+
+        with self._lock:
+            self._terms = terms
+            self._keys = [key for key, _ in entries]
+            self._refs = [ref for _, ref in entries]
+            self._results.clear()
+            self.dropped = len(counts) - len(kept)
+            self.version = version
+
+    # ---------- update inkremental ----------
+    def add(self, kind, text, delta=1):
+        norm = normalize(text)
+        if not norm or not delta:
+            return
+        ref = (kind, norm)
+        with self._lock:
+            term = self._terms.get(ref)
+            if term is None:
+                if delta < 0:
+                    return
+                if len(self._terms) >= self.max_terms:
+                    self.dropped += 1
+                    return
+                self._terms[ref] = [text.strip(), delta]
+                for key in _keys(norm):
+                    i = bisect_left(self._keys, key)
+                    self._keys.insert(i, key)
+                    self._refs.insert(i, ref)
+            else:
+                term[1] += delta
+                if term[1] <= 0:
+                    del self._terms[ref]
+                    self._remove(ref)
+            self._results.clear()
+
+    def _remove(self, ref):
+        for key in _keys(ref[1]):
+            i = bisect_left(self._keys, key)
+            while i < len(self._keys) and self._keys[i] == key:
+                if self._refs[i] == ref:
+                    del self._keys[i]
+                    del self._refs[i]
+                    break
+                i += 1
+
+    # ---------- query ----------
+    def suggest(self, prefix, limit=8):
+        """[(teks, kind, bobot)] paling sering yang diawali prefix (di kata mana pun)."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        cache_key = (prefix, limit)
+        with self._lock:
+            cached = self._results.get(cache_key)
+            if cached is not None:
+                self._results.move_to_end(cache_key)
+                return cached
+
+            lo = bisect_left(self._keys, prefix)
+            hi = bisect_left(self._keys, prefix + "\uffff", lo)
+            refs = set(self._refs[lo:hi])
+            best = heapq.nsmallest(limit, refs, key=lambda ref: (-self._terms[ref][1], ref[1]))
+            result = [(self._terms[ref][0], ref[0], self._terms[ref][1]) for ref in best]
+
+            self._results[cache_key] = result
+            if len(self._results) > RESULT_CACHE_SIZE:
+                self._results.popitem(last=False)
+        return result
+
+
+# ====================================
+# SINKRONISASI DENGAN DATABASE
+# ====================================
+def _rows():
+    columns = [getattr(Report, column) for _, column in KINDS]
+    result = db.session.execute(select(*columns).execution_options(yield_per=2000))
+    for row in result:
+        for (kind, _), text in zip(KINDS, row):
+            yield kind, text
+
+
+def rebuild(index):
+    # Versi dibaca dulu: perubahan selama build membuat index dianggap basi lagi
+    version = data_version.current()[0]
+    index.load(_rows(), version)
+
+
+class _Refresher:
+    """Cek data_version paling sering tiap `interval` detik; kalau berubah (mis. laporan
+    dibuat lewat worker gunicorn lain), index dibangun ulang di thread background."""
+
+    def __init__(self, app, index, interval):
+        self.app = app
+        self.index = index
+        self.interval = interval
+        self._checked = 0.0
+        self._running = False
+        self._lock = threading.Lock()
+
+    def maybe_refresh(self):
+        now = time.monotonic()
+        if now - self._checked < self.interval or self._running:
+            return
+        with self._lock:
+            if self._running or now - self._checked < self.interval:
+                return
+            self._checked = now
+            if data_version.current()[0] == self.index.version:
+                return
+            self._running = True
+        threading.Thread(target=self._run, name="suggest-rebuild", daemon=True).start()
+
+    def _run(self):
+        try:
+            with self.app.app_context():
+                rebuild(self.index)
+        except Exception:
+            self.app.logger.exception("Rebuild index saran gagal")
+        finally:
+            self._running = False
+
+
+def get_index():
+    """Index saran proses ini; dibangun saat pertama dipakai (warm-up atau request pertama)."""
+    app = current_app._get_current_object()
+    index = app.extensions["suggest"]
+    if index.version is None:
+        with app.extensions["suggest_build_lock"]:
+            if index.version is None:
+                rebuild(index)
+    else:
+        app.extensions["suggest_refresher"].maybe_refresh()
+    return index
+
+
+def _built_index(app):
+    # Belum dibangun: perubahan sudah ikut terbaca saat build pertama nanti
+    index = app.extensions.get("suggest")
+    return index if index is not None and index.version is not None else None
+
+
+def _on_report_saved(app, report, created, previous=None, **extra):
+    index = _built_index(app)
+    if index is None:
+        return
+    for kind, column in KINDS:
+        if previous is not None:
+            index.add(kind, previous.get(column), -1)
+        index.add(kind, getattr(report, column), 1)
+
+
+def _add_rows(app, reports, delta):
+    index = _built_index(app)
+    if index is None:
+        return
+    for report in reports:
+        for kind, column in KINDS:
+            index.add(kind, report.get(column), delta)
+
+
+def _on_reports_deleted(app, reports, **extra):
+    _add_rows(app, reports, -1)
+
+
+def _on_reports_created(app, reports, **extra):
+    _add_rows(app, reports, 1)
+
+
+def init_app(app):
+    index = SuggestIndex(max_terms=app.config.get("SUGGEST_MAX_TERMS", 20000))
+    app.extensions["suggest"] = index
+    app.extensions["suggest_build_lock"] = threading.Lock()
+    app.extensions["suggest_refresher"] = _Refresher(
+        app, index, app.config.get("SUGGEST_REFRESH_SECONDS", 30))
+    report_saved.connect(_on_report_saved)
+    reports_deleted.connect(_on_reports_deleted)
+    reports_created.connect(_on_reports_created)
@@ -0,0 +1,28 @@
+import re
+import unicodedata
+
+# Kata umum (Indonesia + sedikit Inggris) yang tidak membantu membedakan barang
+STOPWORDS = frozenset("""
+ada adalah agak akan aku atau bagi bahwa banyak baru belum beberapa begitu bekas
+bisa buah dan dari dalam dekat dengan depan di dia hilang ini itu jam juga kalau
+kami kamu karena ke kemarin ketemu ketinggalan lagi lain mau mohon nya oleh pada
+para pagi punya saat saja sama samping sang satu saya sekitar sebuah sedang siang
+sore sudah tadi tapi tas telah tentang tersebut tertinggal ya yang
+a an and at for in is it lost found my of on or the to with
+""".split())
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def normalize(value):
+    """Huruf kecil, tanpa diakritik, spasi dirapikan."""
+    if not value:
+        return ""
+    value = unicodedata.normalize("NFKD", value)
+    value = "".join(ch for ch in value if not unicodedata.combining(ch))
+    return " ".join(_WORD_RE.findall(value.lower()))
+
+
+def tokenize(value, stopwords=STOPWORDS):
+    """Pecah teks jadi token ternormalisasi (tanpa stopword, minimal 2 huruf)."""
+    return [t for t in normalize(value).split() if len(t) > 1 and t not in stopwords]
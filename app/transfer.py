@@ -0,0 +1,328 @@
+import csv
+import io
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+import click
+from flask import current_app
+from sqlalchemy import insert, select
+from werkzeug.datastructures import FileStorage
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.security import safe_join
+from app import images, storage
+from app.archive import reports_cli
+from app.models import db, ArchivedReport, Report, User
+from app.moderation import REPORT_TYPES, STATUSES, WIB
+from app.signals import reports_created, reports_saving
+
+# Kolom file impor/ekspor (urutan kolom CSV ekspor)
+EXPORT_FIELDS = ("id", "user_id", "name", "item_name", "description", "location", "contact",
+                 "status", "report_type", "created_at", "image_url")
+REQUIRED = ("item_name", "location", "contact")
+MAX_ERRORS_SHOWN = 20
+
+
+class RowError(Exception):
+    """Baris impor tidak valid; pesan ditampilkan bersama nomor barisnya."""
+
+
+def _format(path, fmt):
+    if fmt:
+        return fmt
+    return "jsonl" if path.endswith((".jsonl", ".ndjson", ".json")) else "csv"
+
+
+def _rate(count, started):
+    elapsed = time.perf_counter() - started
+    return f"{count} laporan dalam {elapsed:.1f} detik ({count / elapsed if elapsed else 0:.0f} baris/detik)"
+
+
+# ====================================
+# BACA FILE IMPOR
+# ====================================
+def read_rows(stream, fmt):
+    """Yield (nomor baris, dict) satu per satu; file tidak pernah dibaca utuh ke memori."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            # line_num = baris fisik terakhir yang dibaca (sel boleh berisi newline)
+            yield reader.line_num, {k.strip().lower(): v for k, v in row.items() if k}
+        return
+    for line_no, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_no, RowError(f"JSON tidak valid: {e}")
+            continue
+        yield line_no, row if isinstance(row, dict) else RowError("Baris JSONL harus berupa object.")
+
+
+def _text(row, field):
+    value = row.get(field)
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _parse_created_at(value):
+    """ISO 8601; tanpa zona waktu dianggap WIB (seperti filter tanggal admin). Hasil UTC naive."""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise RowError(f"created_at bukan tanggal ISO (YYYY-MM-DD[ HH:MM]): {value!r}")
+    if parsed.tzinfo is None:
+        return parsed - WIB
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def validate(row, defaults, now):
+    """Dict baris file -> kolom Report (tanpa foto). Raise RowError kalau tidak valid."""
+    values = {field: _text(row, field) for field in ("name", "item_name", "description", "location", "contact")}
+    values["name"] = values["name"] or defaults.get("name")
+    values["user_id"] = defaults.get("user_id")
+    missing = [field for field in ("name",) + REQUIRED if not values[field]]
+    if missing:
+        raise RowError(f"kolom wajib kosong: {', '.join(missing)}")
+
+    report_type = (_text(row, "report_type") or defaults["report_type"]).lower()
+    if report_type not in REPORT_TYPES:
+        raise RowError(f"report_type harus salah satu dari {', '.join(REPORT_TYPES)}: {report_type!r}")
+    status = _text(row, "status") or STATUSES[0]
+    if status not in STATUSES:
+        raise RowError(f"status harus salah satu dari {', '.join(STATUSES)}: {status!r}")
+    values.update(report_type=report_type, status=status)
+
+    created_at = _text(row, "created_at")
+    values["created_at"] = _parse_created_at(created_at) if created_at else now
+
+    # Batas panjang kolom (PostgreSQL menolak, SQLite diam-diam menerima)
+    for field, value in values.items():
+        length = getattr(Report.__table__.c[field].type, "length", None)
+        if length and isinstance(value, str) and len(value) > length:
+            raise RowError(f"{field} lebih dari {length} karakter")
+    return values
+
+
+def save_image(row, images_dir, dry_run=False):
+    """Salin foto baris ini ke UPLOAD_FOLDER (nama sha256, sama seperti upload form).
+
+    Return (filename, is_new, size), atau None kalau baris tanpa foto / tanpa
+    --images. Refcount & job thumbnail baru dibuat saat batch-nya disimpan.
+    Foto rusak / tidak terbaca = RowError (baris dilewati), bukan impor gagal.
+    """
+    name = _text(row, "image_url")
+    if not name or images_dir is None:
+        return None
+    path = safe_join(images_dir, name)
+    if path is None or not os.path.isfile(path):
+        raise RowError(f"foto tidak ditemukan di {images_dir}: {name!r}")
+    if dry_run:
+        return None
+    try:
+        f = open(path, "rb")
+    except OSError as e:
+        raise RowError(f"foto {name!r} tidak bisa dibaca: {e.strerror or e}")
+    with f:
+        try:
+            # Isi yang tidak bisa di-decode juga UploadRejected (lihat save_upload)
+            return storage.save_upload(FileStorage(stream=f, filename=name))
+        except storage.UploadRejected as e:
+            raise RowError(f"foto {name!r}: {e}")
+        except RequestEntityTooLarge:
+            raise RowError(f"foto {name!r} melebihi MAX_UPLOAD_MB")
+
+
+# ====================================
+# IMPOR
+# ====================================
+def insert_batch(rows, saved_images=()):
+    """Satu INSERT executemany + commit. Return snapshot laporan yang dibuat.
+
+    Lewat ORM (session.execute(insert(Report), rows)), jadi counter report_stat
+    dan data_version ikut diperbarui di transaksi yang sama. Refcount foto juga,
+    baru di sini supaya transaksi tulis (lock SQLite) tetap singkat.
+    """
+    for filename, is_new, size in saved_images:
+        storage.attach(filename, size)
+        if is_new:
+            images.schedule(filename)
+    created = [dict(row) for row in db.session.execute(
+        insert(Report).returning(*Report.__table__.columns, sort_by_parameter_order=True), rows
+    ).mappings()]
+    # Job matching & notifikasi satu batch, di-commit bersama laporannya
+    reports_saving.send(current_app._get_current_object(), ids=[r["id"] for r in created], created=True)
+    db.session.commit()
+    return created
+
+
+def import_reports(rows, defaults, images_dir=None, batch_size=500, dry_run=False, progress=None):
+    """Impor (nomor baris, dict) per batch. Baris tidak valid dilewati.
+
+    Return (jumlah diimpor, jumlah dilewati, [(nomor baris, pesan)] maks MAX_ERRORS_SHOWN).
+    """
+    app = current_app._get_current_object()
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    imported, failed, errors = 0, 0, []
+    batch, saved_images = [], []
+
+    def flush():
+        nonlocal imported, batch, saved_images
+        if not batch:
+            return
+        if dry_run:
+            imported += len(batch)
+        else:
+            created = insert_batch(batch, saved_images)
+            imported += len(created)
+            # Index matching & saran, cache halaman (satu kali per batch)
+            reports_created.send(app, reports=created)
+        batch, saved_images = [], []
+        if progress is not None:
+            progress(imported, failed)
+
+    for line_no, row in rows:
+        try:
+            if isinstance(row, RowError):
+                raise row
+            values = validate(row, defaults, now)
+            saved = save_image(row, images_dir, dry_run)
+        except RowError as e:
+            failed += 1
+            if len(errors) < MAX_ERRORS_SHOWN:
+                errors.append((line_no, str(e)))
+            continue
+        values["image_url"] = saved[0] if saved else None
+        if saved:
+            saved_images.append(saved)
+        batch.append(values)
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    return imported, failed, errors
+
+
+@reports_cli.command("import")
+@click.argument("path", type=click.Path(dir_okay=False, allow_dash=True))
+@click.option("--format", "fmt", type=click.Choice(["csv", "jsonl"]), help="Default dari ekstensi file.")
+@click.option("--type", "report_type", type=click.Choice(REPORT_TYPES), default="found", show_default=True,
+              help="report_type untuk baris yang kolomnya kosong.")
+@click.option("--user", "username", help="Username / email pemilik semua laporan (mis. akun satpam).")
+@click.option("--name", help="Nama pelapor untuk baris yang kolom name-nya kosong.")
+@click.option("--images", "images_dir", type=click.Path(file_okay=False, exists=True),
+              help="Folder foto; kolom image_url berisi path relatif terhadap folder ini.")
+@click.option("--batch-size", type=int, default=500, show_default=True)
+@click.option("--dry-run", is_flag=True, help="Hanya validasi, tidak ada yang disimpan.")
+def import_command(path, fmt, report_type, username, name, images_dir, batch_size, dry_run):
+    """Impor laporan dari CSV (baris pertama = header) atau JSONL ("-" = stdin).
+
+    Kolom: item_name, location, contact (wajib), name, description,
+    report_type, status, created_at (ISO; tanpa zona waktu = WIB), image_url.
+    Kolom id dan user_id diabaikan, jadi hasil `flask reports export` bisa
+    diimpor ke database lain. Satu transaksi per batch: kalau berhenti di
+    tengah, batch yang sudah tersimpan tidak diulang otomatis.
+    """
+    defaults = {"report_type": report_type, "name": name}
+    if username:
+        user = db.session.scalar(select(User).where((User.username == username) | (User.email == username)))
+        if user is None:
+            raise click.UsageError(f"User {username!r} tidak ditemukan.")
+        defaults.update(user_id=user.id, name=name or user.username)
+
+    fmt = _format(path, fmt)
+    started = time.perf_counter()
+
+    def progress(imported, failed):
+        click.echo(f"  {_rate(imported, started)}, {failed} baris dilewati", err=True)
+
+    # newline="" untuk modul csv; utf-8-sig membuang BOM dari ekspor Excel
+    if path == "-":
+        stream = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8-sig", newline="")
+    else:
+        stream = open(path, "r", encoding="utf-8-sig", newline="")
+    with stream:
+        imported, failed, errors = import_reports(read_rows(stream, fmt), defaults, images_dir,
+                                                  batch_size, dry_run, progress)
+
+    for line_no, message in errors:
+        click.echo(f"  baris {line_no}: {message}", err=True)
+    if failed > len(errors):
+        click.echo(f"  ... dan {failed - len(errors)} baris lain", err=True)
+    verb = "valid (dry run, tidak disimpan)" if dry_run else "diimpor"
+    click.echo(f"{imported} laporan {verb}; {_rate(imported, started)}.", err=True)
+    if failed:
+        click.echo(f"{failed} baris tidak valid dilewati.", err=True)
+        raise SystemExit(1)
+
+
+# ====================================
+# EKSPOR
+# ====================================
+def _serialize(row):
+    item = dict(row)
+    if item.get("created_at") is not None:
+        item["created_at"] = item["created_at"].replace(tzinfo=timezone.utc).isoformat()
+    return item
+
+
+def export_rows(model=Report, condition=None, batch_size=1000):
+    """Yield dict per laporan urut id dari server-side cursor (yield_per):
+    memori konstan berapa pun jumlah laporan."""
+    stmt = select(*(model.__table__.c[field] for field in EXPORT_FIELDS)).order_by(model.id)
+    if condition is not None:
+        stmt = stmt.where(condition)
+    for row in db.session.execute(stmt, execution_options={"yield_per": batch_size}).mappings():
+        yield _serialize(row)
+
+
+def write_rows(rows, stream, fmt, progress=None, every=5000):
+    count = 0
+    if fmt == "csv":
+        writer = csv.DictWriter(stream, fieldnames=EXPORT_FIELDS)
+        writer.writeheader()
+        write = writer.writerow
+    else:
+        def write(row):
+            stream.write(json.dumps(row, ensure_ascii=False) + "\n")
+    for row in rows:
+        write(row)
+        count += 1
+        if progress is not None and count % every == 0:
+            progress(count)
+    return count
+
+
+@reports_cli.command("export")
+@click.argument("path", type=click.Path(dir_okay=False, allow_dash=True), default="-")
+@click.option("--format", "fmt", type=click.Choice(["csv", "jsonl"]), help="Default dari ekstensi file.")
+@click.option("--archived", is_flag=True, help="Ekspor report_archive, bukan laporan aktif.")
+@click.option("--type", "report_type", type=click.Choice(REPORT_TYPES))
+@click.option("--status", type=click.Choice(STATUSES))
+@click.option("--batch-size", type=int, default=1000, show_default=True)
+def export_command(path, fmt, archived, report_type, status, batch_size):
+    """Ekspor laporan ke CSV / JSONL (default stdout). created_at dalam UTC (ISO 8601)."""
+    model = ArchivedReport if archived else Report
+    clauses = []
+    if report_type:
+        clauses.append(model.report_type == report_type)
+    if status:
+        clauses.append(model.status == status)
+    condition = db.and_(*clauses) if clauses else None
+
+    fmt = _format(path, fmt) if path != "-" else (fmt or "jsonl")
+    started = time.perf_counter()
+
+    def progress(count):
+        click.echo(f"  {_rate(count, started)}", err=True)
+
+    stream = sys.stdout if path == "-" else open(path, "w", encoding="utf-8", newline="")
+    try:
+        count = write_rows(export_rows(model, condition, batch_size), stream, fmt, progress)
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+    click.echo(f"Ekspor selesai: {_rate(count, started)}.", err=True)
@@ -0,0 +1 @@
+"""Benchmark & load test Lost n Found (lihat: python -m bench --help)."""
@@ -0,0 +1,99 @@
+"""Benchmark Lost n Found.
+
+    python -m bench seed --users 200 --reports 20000 --photos 30
+    python -m bench run --concurrency 8 --requests 500 --out bench/results.json
+    python -m bench run --url http://127.0.0.1:8080      # server gunicorn lokal (RATELIMIT_ENABLED=0)
+    python -m bench compare bench/results.json bench/baseline.json
+
+Database & folder upload benchmark terpisah dari data asli
+(default /tmp/lostnfound-bench.db dan /tmp/lostnfound-bench-uploads).
+"""
+import argparse
+import json
+import sys
+from app import create_app
+from bench import runner
+from bench.seed import seed
+
+
+def _app(args):
+    config = {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{args.db}",
+        "UPLOAD_FOLDER": args.uploads,
+        # Semua request datang dari satu IP: rate limit akan mengukur penolakan, bukan app
+        "RATELIMIT_ENABLED": False,
+    }
+    if getattr(args, "no_page_cache", False):
+        config["PAGE_CACHE_ENABLED"] = False
+    return create_app(config)
+
+
+def _echo(message="", nl=True):
+    sys.stdout.write(message + ("\n" if nl else "\r"))
+    sys.stdout.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="/tmp/lostnfound-bench.db")
+    parser.add_argument("--uploads", default="/tmp/lostnfound-bench-uploads")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_seed = sub.add_parser("seed", help="isi database dengan data sintetis")
+    p_seed.add_argument("--users", type=int, default=200)
+    p_seed.add_argument("--reports", type=int, default=5000)
+    p_seed.add_argument("--photos", type=int, default=0, help="jumlah foto unik (butuh Pillow)")
+    p_seed.add_argument("--seed", type=int, default=42)
+
+    p_run = sub.add_parser("run", help="jalankan skenario beban")
+    p_run.add_argument("--scenarios", default=",".join(runner.SCENARIOS))
+    p_run.add_argument("--requests", type=int, default=200, help="request per skenario")
+    p_run.add_argument("--concurrency", type=int, default=4)
+    p_run.add_argument("--url", help="base URL server WSGI lokal; default: Flask test client")
+    p_run.add_argument("--no-page-cache", action="store_true")
+    p_run.add_argument("--seed", type=int, default=42)
+    p_run.add_argument("--out", help="tulis hasil JSON ke file ini")
+    p_run.add_argument("--baseline", help="bandingkan langsung dengan hasil JSON lain")
+    p_run.add_argument("--tolerance", type=float, default=0.15)
+
+    p_cmp = sub.add_parser("compare", help="bandingkan dua hasil JSON")
+    p_cmp.add_argument("current")
+    p_cmp.add_argument("baseline")
+    p_cmp.add_argument("--tolerance", type=float, default=0.15)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        with open(args.current) as f:
+            current = json.load(f)
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        return 0 if runner.compare(current, baseline, args.tolerance) else 1
+
+    app = _app(args)
+    with app.app_context():
+        if args.command == "seed":
+            _echo(f"Seeding {args.db} ...")
+            seed(users=args.users, reports=args.reports, photos=args.photos,
+                 seed_value=args.seed, echo=_echo)
+            return 0
+
+        scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+        _echo(f"Menjalankan {', '.join(scenarios)} ({args.requests} request, "
+              f"concurrency {args.concurrency})")
+        result = runner.run(app, scenarios, args.requests, args.concurrency,
+                            base_url=args.url, seed_value=args.seed, echo=_echo)
+        _echo(f"  peak RSS {result['peak_rss_mb']} MB")
+        if args.out:
+            runner.write_json(result, args.out)
+            _echo(f"Hasil ditulis ke {args.out}")
+        if args.baseline:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+            return 0 if runner.compare(result, baseline, args.tolerance, echo=_echo) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+import io
+import random
+
+# Teks sintetis bergaya laporan kampus UGM
+ITEMS = [
+    "Dompet kulit", "Dompet lipat", "Kunci motor Honda", "Kunci motor Yamaha", "Kunci kos",
+    "KTM", "KTP", "SIM C", "Laptop ASUS", "Laptop Lenovo", "MacBook Air", "Charger laptop",
+    "Charger HP", "Powerbank Xiaomi", "HP Samsung", "iPhone 11", "Earphone", "Headset Bluetooth",
+    "TWS", "Jam tangan Casio", "Kacamata minus", "Botol minum Tupperware", "Tumbler Starbucks",
+    "Jaket almamater UGM", "Jaket hoodie", "Payung lipat", "Tas ransel Eiger", "Tas laptop",
+    "Totebag", "Flashdisk 32GB", "Buku catatan kalkulus", "Buku Fisika Dasar", "Kalkulator Casio",
+    "Helm bogo", "Helm KYT", "Sepatu futsal", "Mukena", "Sajadah", "Topi", "Cincin perak",
+]
+COLORS = ["hitam", "putih", "biru", "biru dongker", "merah", "hijau", "abu-abu", "cokelat",
+          "pink", "kuning", "silver", "navy", "krem"]
+LOCATIONS = [
+    "Perpustakaan Pusat UGM", "Gedung SGLC FT", "Kantin Bonbin", "Masjid Kampus UGM",
+    "Fakultas MIPA", "Grha Sabha Pramana", "Halte Trans Jogja Bundaran UGM", "Parkiran FEB",
+    "Lapangan Pancasila", "Gelanggang Mahasiswa", "Fakultas Kedokteran", "Fisipol Gedung BB",
+    "Fakultas Hukum", "Fakultas Teknik DTETI", "Kantin Sospol", "Pusat Kebudayaan Koesnadi",
+    "Balairung", "GOR Pancasila", "Fakultas Psikologi", "Sekolah Vokasi", "Stadion UGM",
+    "Wisdom Park", "Klinik GMC", "Asrama Darmaputera", "Jalan Kaliurang km 5",
+]
+DETAILS = [
+    "ada stiker di belakangnya", "ada gantungan kunci boneka", "isinya KTP dan KTM",
+    "tertinggal di meja belajar lantai 2", "jatuh di dekat tangga", "ada inisial nama",
+    "casingnya retak sedikit", "terakhir dipakai sore tadi", "di dalamnya ada uang tunai",
+    "ada tali lanyard", "tertinggal setelah kuliah pagi", "ditemukan di bawah kursi",
+    "sudah dititipkan ke satpam", "ada goresan di sudut", "merknya sudah agak pudar",
+]
+FIRST_NAMES = ["Budi", "Siti", "Agus", "Dewi", "Rizky", "Putri", "Andi", "Ayu", "Fajar", "Nadia",
+               "Yoga", "Intan", "Bayu", "Rina", "Dimas", "Laras", "Arif", "Wulan", "Hendra", "Citra"]
+LAST_NAMES = ["Santoso", "Wibowo", "Saputra", "Lestari", "Pratama", "Utami", "Nugroho",
+              "Kurniawan", "Rahayu", "Hidayat", "Setiawan", "Permata", "Wijaya", "Anggraini"]
+SEARCH_TERMS = ["dompet", "kunci", "laptop", "ktm", "charger", "jaket", "payung", "botol",
+                "perpus", "kantin", "helm", "tas", "hitam", "biru", "hp", "flashdisk"]
+
+
+def person(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def report_fields(rng):
+    item = f"{rng.choice(ITEMS)} {rng.choice(COLORS)}"
+    details = rng.sample(DETAILS, k=rng.randint(0, 2))
+    return {
+        "item_name": item,
+        "description": (item + ", " + ", ".join(details)) if details else None,
+        "location": rng.choice(LOCATIONS),
+        "contact": f"08{rng.randint(1000000000, 9999999999)}",
+        "report_type": rng.choice(["lost", "lost", "found"]),
+        "status": "Belum ditemukan" if rng.random() < 0.7 else "Sudah ditemukan",
+    }
+
+
+def photo_bytes(rng, size=(1600, 1200)):
+    """JPEG sintetis (butuh Pillow). Gradasi acak supaya ukurannya mirip foto asli."""
+    from PIL import Image
+
+    image = Image.new("RGB", size, tuple(rng.randint(0, 255) for _ in range(3)))
+    noise = Image.effect_noise(size, rng.randint(20, 60)).convert("RGB")
+    image = Image.blend(image, noise, 0.4)
+    buf = io.BytesIO()
+    image.save(buf, "JPEG", quality=88)
+    return buf.getvalue()
+
+
+def make_rng(seed):
+    return random.Random(seed)
@@ -0,0 +1,220 @@
+import json
+import platform
+import resource
+import statistics
+import subprocess
+import threading
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from sqlalchemy import event
+from app import db
+from app.models import User
+from bench.data import SEARCH_TERMS, make_rng, report_fields
+
+SCENARIOS = ["index", "search", "profile", "report_post", "admin"]
+
+
+# ====================================
+# REQUEST
+# ====================================
+def build_request(scenario, rng, user_ids):
+    """(method, path, user_id di session, form data)."""
+    if scenario == "index":
+        return "GET", "/", None, None
+    if scenario == "search":
+        return "GET", "/?" + urllib.parse.urlencode({"q": rng.choice(SEARCH_TERMS)}), None, None
+    if scenario == "profile":
+        return "GET", "/profile/", rng.choice(user_ids), None
+    if scenario == "report_post":
+        fields = report_fields(rng)
+        fields.pop("status")
+        return "POST", "/report/", rng.choice(user_ids), fields
+    if scenario == "admin":
+        return "GET", "/admin/reports", 1, None
+    raise ValueError(f"skenario tidak dikenal: {scenario}")
+
+
+class SqlCounter:
+    """Hitung statement SQL per thread (hanya mode in-process)."""
+
+    def __init__(self, engine):
+        self._local = threading.local()
+        event.listen(engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args, **kwargs):
+        self._local.count = getattr(self._local, "count", 0) + 1
+
+    def reset(self):
+        self._local.count = 0
+
+    @property
+    def count(self):
+        return getattr(self._local, "count", 0)
+
+
+class InProcessDriver:
+    """Flask test client, satu client per thread."""
+
+    def __init__(self, app):
+        self.app = app
+        self.sql = SqlCounter(db.engine)
+        self._local = threading.local()
+
+    def request(self, method, path, user_id, form):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        with client.session_transaction() as session:
+            session.clear()
+            if user_id is not None:
+                session["user_id"] = user_id
+                session["username"] = f"bench{user_id}"
+        self.sql.reset()
+        response = client.open(path, method=method, data=form)
+        # Body dibaca penuh: halaman streaming baru merender (dan query) di sini
+        response.get_data()
+        response.close()
+        return response.status_code, self.sql.count
+
+
+class HttpDriver:
+    """Server WSGI lokal (gunicorn/run.py); cookie session ditandatangani pakai SECRET_KEY app."""
+
+    def __init__(self, app, base_url):
+        self.base_url = base_url.rstrip("/")
+        self.serializer = app.session_interface.get_signing_serializer(app)
+        self.cookie_name = app.config["SESSION_COOKIE_NAME"]
+
+    def request(self, method, path, user_id, form):
+        headers = {}
+        if user_id is not None:
+            cookie = self.serializer.dumps({"user_id": user_id, "username": f"bench{user_id}"})
+            headers["Cookie"] = f"{self.cookie_name}={cookie}"
+        data = urllib.parse.urlencode(form).encode() if form else None
+        req = urllib.request.Request(self.base_url + path, data=data, headers=headers, method=method)
+        opener = urllib.request.build_opener(_NoRedirect)
+        try:
+            with opener.open(req, timeout=30) as response:
+                response.read()
+                return response.status, None
+        except urllib.error.HTTPError as e:
+            return e.code, None
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+# ====================================
+# RUN
+# ====================================
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def run_scenario(driver, scenario, requests, concurrency, user_ids, seed_value):
+    rng = make_rng(f"{seed_value}-{scenario}")
+    plan = [build_request(scenario, rng, user_ids) for _ in range(requests)]
+
+    def one(req):
+        started = time.perf_counter()
+        status, sql = driver.request(*req)
+        # GET harus 200; POST sukses selalu redirect (redirect GET = ditolak/login)
+        ok = status == (302 if req[0] == "POST" else 200)
+        return (time.perf_counter() - started) * 1000, ok, sql
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, plan))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(r[0] for r in results)
+    errors = sum(1 for r in results if not r[1])
+    sql_counts = [r[2] for r in results if r[2] is not None]
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "throughput_rps": round(requests / elapsed, 2),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies), 2),
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(latencies[-1], 2),
+        },
+        "sql_per_request": {
+            "mean": round(statistics.fmean(sql_counts), 2),
+            "max": max(sql_counts),
+        } if sql_counts else None,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(app, scenarios, requests, concurrency, base_url=None, seed_value=42, warmup=20, echo=print):
+    user_ids = [row.id for row in db.session.query(User.id).limit(1000)]
+    if not user_ids:
+        raise RuntimeError("Database kosong, jalankan 'python -m bench seed' dulu.")
+
+    driver = HttpDriver(app, base_url) if base_url else InProcessDriver(app)
+    results = {}
+    for scenario in scenarios:
+        if warmup:
+            run_scenario(driver, scenario, warmup, 1, user_ids, f"warmup-{seed_value}")
+        results[scenario] = run_scenario(driver, scenario, requests, concurrency, user_ids, seed_value)
+        lat = results[scenario]["latency_ms"]
+        echo(f"  {scenario:<12} {results[scenario]['throughput_rps']:>8} req/s  "
+             f"p50 {lat['p50']:>7} ms  p95 {lat['p95']:>7} ms  p99 {lat['p99']:>7} ms  "
+             f"err {results[scenario]['errors']}")
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "mode": "http" if base_url else "in-process",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        # ru_maxrss di Linux dalam KiB
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "scenarios": results,
+    }
+
+
+# ====================================
+# COMPARE
+# ====================================
+def compare(current, baseline, tolerance=0.15, echo=print):
+    """Bandingkan dua hasil; return False kalau p95 ada yang memburuk melebihi toleransi."""
+    ok = True
+    echo(f"{'skenario':<12} {'p95 base':>10} {'p95 now':>10} {'delta':>8} {'rps base':>10} {'rps now':>10}")
+    for name, now in current["scenarios"].items():
+        base = baseline["scenarios"].get(name)
+        if base is None:
+            echo(f"{name:<12} (tidak ada di baseline)")
+            continue
+        p95_base, p95_now = base["latency_ms"]["p95"], now["latency_ms"]["p95"]
+        delta = (p95_now - p95_base) / p95_base if p95_base else 0.0
+        regressed = delta > tolerance
+        ok = ok and not regressed
+        echo(f"{name:<12} {p95_base:>10} {p95_now:>10} {delta:>+7.0%} "
+             f"{base['throughput_rps']:>10} {now['throughput_rps']:>10}"
+             + ("  <-- REGRESI" if regressed else ""))
+    return ok
+
+
+def write_json(result, path):
+    with open(path, "w") as f:
+        json.dump(result, f, indent=2)
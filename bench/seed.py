@@ -0,0 +1,99 @@
+import io
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import insert, text
+from werkzeug.datastructures import FileStorage
+from werkzeug.security import generate_password_hash
+from app import images, storage
+from app.models import db, Report, User
+from bench.data import make_rng, person, photo_bytes, report_fields
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
+
+def prepare_schema():
+    """Skema lewat Alembic (termasuk FTS5 & index), sama seperti produksi."""
+    from flask import current_app
+    from flask_migrate import upgrade
+    from app.startup import init_migrate
+    init_migrate(current_app)
+    upgrade(directory=MIGRATIONS_DIR)
+
+
+def _seed_photos(rng, count):
+    names = []
+    for i in range(count):
+        file = FileStorage(io.BytesIO(photo_bytes(rng)), filename=f"seed-{i}.jpg")
+        filename, is_new, _ = storage.save_upload(file)
+        if is_new and images.enabled():
+            images.process_image(storage.upload_folder(), filename, images.output_format())
+        names.append(filename)
+    return names
+
+
+def _print(message="", nl=True):
+    print(message, end="\n" if nl else "\r", flush=True)
+
+
+def seed(users=200, reports=5000, photos=0, photo_ratio=0.3, seed_value=42, batch_size=1000,
+         echo=_print):
+    """Isi database dengan user & laporan sintetis. Deterministik untuk seed yang sama."""
+    rng = make_rng(seed_value)
+    started = time.perf_counter()
+    prepare_schema()
+
+    # Satu hash untuk semua user; hashing per user cuma bikin seeding lambat
+    password_hash = generate_password_hash("benchmark")
+    existing = db.session.query(db.func.count(User.id)).scalar()
+    user_rows = [
+        {"username": f"bench{existing + i}", "email": f"bench{existing + i}@mail.ugm.ac.id",
+         "password_hash": password_hash}
+        for i in range(users)
+    ]
+    if user_rows:
+        db.session.execute(insert(User), user_rows)
+        db.session.commit()
+    user_ids = [row.id for row in db.session.query(User.id)]
+    names = {uid: person(rng) for uid in user_ids}
+    echo(f"  {len(user_rows)} user")
+
+    photo_names = _seed_photos(rng, photos) if photos else []
+    if photo_names:
+        echo(f"  {len(photo_names)} foto")
+
+    now = datetime.now(timezone.utc)
+    # Laporan dibuat urut waktu supaya id naik searah created_at, seperti produksi
+    offsets = sorted((rng.uniform(0, 365 * 24 * 3600) for _ in range(reports)), reverse=True)
+    batch = []
+    for n, offset in enumerate(offsets, 1):
+        user_id = rng.choice(user_ids)
+        row = report_fields(rng)
+        row.update(
+            user_id=user_id,
+            name=names[user_id],
+            created_at=now - timedelta(seconds=offset),
+            image_url=rng.choice(photo_names) if photo_names and rng.random() < photo_ratio else None,
+        )
+        batch.append(row)
+        if len(batch) >= batch_size or n == reports:
+            db.session.execute(insert(Report), batch)
+            db.session.commit()
+            batch = []
+            echo(f"  {n}/{reports} laporan", nl=False)
+
+    if photo_names:
+        # Refcount dihitung ulang dari tabel report (sama seperti migrasi upload)
+        db.session.execute(text("DELETE FROM upload"))
+        db.session.execute(text(
+            "INSERT INTO upload (filename, refcount, created_at) "
+            "SELECT image_url, COUNT(*), CURRENT_TIMESTAMP FROM report "
+            "WHERE image_url IS NOT NULL GROUP BY image_url"
+        ))
+        db.session.commit()
+
+    if db.engine.dialect.name == "sqlite":
+        with db.engine.connect() as conn:
+            conn.exec_driver_sql("ANALYZE")
+
+    echo(f"\n  selesai dalam {time.perf_counter() - started:.1f} detik")
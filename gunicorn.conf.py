@@ -0,0 +1,50 @@
+import os
+
+# ====================================
+# GUNICORN (PRODUKSI)
+# ====================================
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+
+# Beberapa proses x beberapa thread: request yang menunggu I/O (SQLite, file
+# upload) tidak menahan request lain. VM Fly 1 shared CPU -> default 2 x 4.
+workers = int(os.getenv("WEB_CONCURRENCY", 2))
+threads = int(os.getenv("WEB_THREADS", 4))
+worker_class = "gthread"
+
+timeout = int(os.getenv("WEB_TIMEOUT", 30))
+graceful_timeout = 20
+keepalive = 5
+
+# Worker di-restart berkala supaya memori tidak terus tumbuh
+max_requests = int(os.getenv("WEB_MAX_REQUESTS", 1000))
+max_requests_jitter = 100
+
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    # Migrasi sekali di proses master, bukan di tiap worker.
+    # Bukan release_command Fly: mesin release tidak me-mount volume SQLite /data
+    from app import create_app, db
+    from app.startup import upgrade_schema
+
+    app = create_app()
+    upgrade_schema(app)
+    with app.app_context():
+        # Koneksi pool (PostgreSQL) jangan ikut diwariskan ke worker hasil fork
+        db.engine.dispose()
+
+
+def post_worker_init(worker):
+    # Worker job hanya di proses worker gunicorn (setelah fork), bukan master / CLI
+    from app import jobs
+
+    jobs.start_worker(worker.wsgi)
+
+    # Panaskan worker sebelum request pertama: file SQLite ke page cache OS,
+    # template, fragment cache, koneksi DB (WARMUP=0 untuk mematikan)
+    if os.getenv("WARMUP", "1") == "1":
+        from app.startup import warm_up
+
+        warm_up(worker.wsgi)
@@ -90,9 +90,15 @@ def run_migrations_online():
                 directives[:] = []
                 logger.info('No changes in schema detected.')
 
+    # Kolom search_vector + index GIN-nya (PostgreSQL) hanya ada di migrasi
+    # b5d81f3e6c20, bukan di model; jangan diusulkan untuk di-drop
+    def include_object(object, name, type_, reflected, compare_to):
+        return not (reflected and compare_to is None and (name or '').endswith('search_vector'))
+
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    conf_args.setdefault("include_object", include_object)
 
     connectable = get_engine()
 
@@ -0,0 +1,86 @@
+"""Report FTS5 search index
+
+Revision ID: 421e13650961
+Revises: afc09d610b5d
+Create Date: 2026-10-18 09:12:41.530214
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '421e13650961'
+down_revision = 'afc09d610b5d'
+branch_labels = None
+depends_on = None
+
+
+# External-content FTS5 table: teks tetap disimpan di tabel report,
+# report_fts cuma menyimpan index-nya. Trigger di bawah menjaga sinkron.
+CREATE_FTS = """
+CREATE VIRTUAL TABLE IF NOT EXISTS report_fts USING fts5(
+    item_name, location, description,
+    content='report', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+)
+"""
+
+TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS report_fts_ai AFTER INSERT ON report BEGIN
+        INSERT INTO report_fts(rowid, item_name, location, description)
+        VALUES (new.id, new.item_name, new.location, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS report_fts_ad AFTER DELETE ON report BEGIN
+        INSERT INTO report_fts(report_fts, rowid, item_name, location, description)
+        VALUES ('delete', old.id, old.item_name, old.location, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS report_fts_au
+    AFTER UPDATE OF item_name, location, description ON report BEGIN
+        INSERT INTO report_fts(report_fts, rowid, item_name, location, description)
+        VALUES ('delete', old.id, old.item_name, old.location, old.description);
+        INSERT INTO report_fts(rowid, item_name, location, description)
+        VALUES (new.id, new.item_name, new.location, new.description);
+    END
+    """,
+]
+
+
+def _fts5_supported(bind):
+    if bind.dialect.name != 'sqlite':
+        return False
+    try:
+        bind.exec_driver_sql("CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x)")
+        bind.exec_driver_sql("DROP TABLE temp._fts5_probe")
+    except sa.exc.OperationalError:
+        return False
+    return True
+
+
+def upgrade():
+    bind = op.get_bind()
+    # Tanpa FTS5 aplikasi otomatis fallback ke pencarian ilike
+    if not _fts5_supported(bind):
+        return
+
+    op.execute(CREATE_FTS)
+    for trigger in TRIGGERS:
+        op.execute(trigger)
+    # Isi index dari data yang sudah ada
+    op.execute("INSERT INTO report_fts(report_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS report_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS report_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS report_fts_ai")
+    op.execute("DROP TABLE IF EXISTS report_fts")
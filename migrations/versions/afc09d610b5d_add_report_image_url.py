@@ -0,0 +1,30 @@
+"""Add report.image_url
+
+Revision ID: afc09d610b5d
+Revises: b00cdd4b5053
+Create Date: 2026-10-18 09:05:02.118406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'afc09d610b5d'
+down_revision = 'b00cdd4b5053'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Kolom ini sudah ada di model tapi tidak ikut migrasi awal;
+    # database lama hasil db.create_all() sudah punya kolomnya.
+    columns = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('report')}
+    if 'image_url' not in columns:
+        with op.batch_alter_table('report') as batch_op:
+            batch_op.add_column(sa.Column('image_url', sa.String(length=255), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('report') as batch_op:
+        batch_op.drop_column('image_url')
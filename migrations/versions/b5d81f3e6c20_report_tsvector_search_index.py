@@ -0,0 +1,53 @@
+"""Report tsvector search index (PostgreSQL)
+
+Revision ID: b5d81f3e6c20
+Revises: a7c4e2f9b813
+Create Date: 2026-10-18 21:37:52.204816
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5d81f3e6c20'
+down_revision = 'a7c4e2f9b813'
+branch_labels = None
+depends_on = None
+
+
+# Padanan report_fts / report_archive_fts di PostgreSQL: kolom tsvector yang dihitung
+# server (tanpa trigger) + index GIN. Bobot A/B/C = item_name, location, description,
+# lihat TS_RANK_WEIGHTS di app/search.py. Konfigurasi 'simple' (tanpa stemming),
+# sama seperti tokenizer unicode61 di SQLite.
+SEARCH_VECTOR = """
+ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector
+GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple', coalesce(item_name, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(location, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+) STORED
+"""
+
+TABLES = ('report', 'report_archive')
+
+
+def upgrade():
+    # SQLite memakai tabel FTS5 (421e13650961, a7c4e2f9b813)
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for table in TABLES:
+        op.execute(SEARCH_VECTOR.format(table=table))
+        op.create_index(f'ix_{table}_search_vector', table, ['search_vector'],
+                        unique=False, postgresql_using='gin', if_not_exists=True)
+        op.execute(f'ANALYZE {table}')
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for table in reversed(TABLES):
+        op.drop_index(f'ix_{table}_search_vector', table_name=table, if_exists=True)
+        op.execute(f'ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector')
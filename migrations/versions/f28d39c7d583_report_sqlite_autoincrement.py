@@ -0,0 +1,106 @@
+"""Report ids never reused on SQLite (AUTOINCREMENT)
+
+Revision ID: f28d39c7d583
+Revises: ea5935118ab0
+Create Date: 2026-10-18 18:02:37.114508
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f28d39c7d583'
+down_revision = 'ea5935118ab0'
+branch_labels = None
+depends_on = None
+
+
+# Trigger report_fts ikut terhapus bersama tabel lama; dibuat ulang persis
+# seperti di 421e13650961
+FTS_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS report_fts_ai AFTER INSERT ON report BEGIN
+        INSERT INTO report_fts(rowid, item_name, location, description)
+        VALUES (new.id, new.item_name, new.location, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS report_fts_ad AFTER DELETE ON report BEGIN
+        INSERT INTO report_fts(report_fts, rowid, item_name, location, description)
+        VALUES ('delete', old.id, old.item_name, old.location, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS report_fts_au
+    AFTER UPDATE OF item_name, location, description ON report BEGIN
+        INSERT INTO report_fts(report_fts, rowid, item_name, location, description)
+        VALUES ('delete', old.id, old.item_name, old.location, old.description);
+        INSERT INTO report_fts(rowid, item_name, location, description)
+        VALUES (new.id, new.item_name, new.location, new.description);
+    END
+    """,
+]
+
+
+def _has_fts(bind):
+    return bind.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'report_fts'"
+    ).first() is not None
+
+
+def _renumber_reused_ids(bind):
+    """Laporan aktif yang id-nya sudah dipakai arsip (id dipakai ulang SQLite) diberi id baru,
+    supaya bisa diarsip. Pasangan matching dan notifikasinya ikut dipindah."""
+    reused = [row[0] for row in bind.exec_driver_sql(
+        "SELECT id FROM report WHERE id IN (SELECT id FROM report_archive) ORDER BY id")]
+    next_id = bind.exec_driver_sql(
+        "SELECT max(coalesce((SELECT max(id) FROM report), 0), "
+        "coalesce((SELECT max(id) FROM report_archive), 0))").scalar()
+    for old_id in reused:
+        next_id += 1
+        params = {"old": old_id, "new": next_id}
+        bind.execute(sa.text("UPDATE report SET id = :new WHERE id = :old"), params)
+        bind.execute(sa.text("UPDATE report_match SET lost_id = :new WHERE lost_id = :old"), params)
+        bind.execute(sa.text("UPDATE report_match SET found_id = :new WHERE found_id = :old"), params)
+        bind.execute(sa.text("UPDATE notification SET report_id = :new WHERE report_id = :old"), params)
+    return next_id
+
+
+def upgrade():
+    bind = op.get_bind()
+    # PostgreSQL: sequence SERIAL memang tidak pernah mundur
+    if bind.dialect.name != 'sqlite':
+        return
+
+    fts = _has_fts(bind)
+    with op.batch_alter_table('report', schema=None, recreate='always',
+                              table_kwargs={'sqlite_autoincrement': True}) as batch_op:
+        pass
+
+    last_id = _renumber_reused_ids(bind)
+    # Lanjutkan dari id terbesar yang pernah ada, termasuk yang sudah diarsip
+    bind.exec_driver_sql("DELETE FROM sqlite_sequence WHERE name = 'report'")
+    bind.execute(sa.text("INSERT INTO sqlite_sequence (name, seq) VALUES ('report', :seq)"),
+                 {"seq": last_id})
+
+    if fts:
+        for trigger in FTS_TRIGGERS:
+            op.execute(trigger)
+        # Rowid laporan yang diberi nomor baru berubah: index dibangun ulang
+        op.execute("INSERT INTO report_fts(report_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+
+    fts = _has_fts(bind)
+    with op.batch_alter_table('report', schema=None, recreate='always',
+                              table_kwargs={'sqlite_autoincrement': False}) as batch_op:
+        pass
+
+    if fts:
+        for trigger in FTS_TRIGGERS:
+            op.execute(trigger)
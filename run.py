@@ -1,10 +1,12 @@
-from app import create_app, db
+from app import create_app, jobs
+from app.startup import upgrade_schema
 
 app = create_app()
 
 if __name__ == '__main__':
-    with app.app_context():
-        db.create_all()
+    # Skema lewat migrasi (sama seperti gunicorn.conf.py), termasuk FTS5 & index
+    upgrade_schema(app)
+    jobs.start_worker(app)
     app.run(host="0.0.0.0", 
         port=8080
         )
@@ -0,0 +1,81 @@
+import io
+import os
+import pytest
+from app import create_app, db
+from app.models import Report, Upload, User
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'test.db'}",
+        "UPLOAD_FOLDER": str(tmp_path / "uploads"),
+        "JOBS_WORKERS": 0,
+        "PASSWORD_WORKERS": 0,
+        "RATELIMIT_ENABLED": False,
+        "SESSION_COOKIE_SECURE": False,
+    })
+    os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
+    with app.app_context():
+        db.create_all()
+        user = User(username="pelapor", email="pelapor@example.com")
+        user.set_password("rahasia")
+        db.session.add(user)
+        db.session.commit()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["user_id"] = 1
+        session["username"] = "pelapor"
+    return client
+
+
+def _png_bytes():
+    pytest.importorskip("PIL")
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.new("RGB", (32, 32), (10, 120, 200)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def _post_report(client, data, filename):
+    return client.post("/report/", data={
+        "item_name": "Dompet", "location": "Kantin", "contact": "08123",
+        "report_type": "lost", "image": (io.BytesIO(data), filename),
+    }, content_type="multipart/form-data", buffered=True)
+
+
+def _corrupt(kind):
+    if kind == "jpeg":
+        # Magic bytes JPEG, isinya sampah
+        return b"\xff\xd8\xff" + b"bukan jpeg" * 100, "rusak.jpg"
+    return _png_bytes()[:60], "terpotong.png"
+
+
+@pytest.mark.parametrize("kind", ["jpeg", "png"])
+def test_corrupt_image_is_rejected(app, client, kind):
+    data, filename = _corrupt(kind)
+    response = _post_report(client, data, filename)
+
+    assert response.status_code == 302
+    assert response.headers["Location"].endswith("/report/")
+    with client.session_transaction() as session:
+        assert ("danger", "File harus berupa gambar JPG, PNG, GIF, atau WEBP.") in session["_flashes"]
+    with app.app_context():
+        assert Report.query.count() == 0
+        assert Upload.query.count() == 0
+    # Spool sementara ikut dibuang
+    assert os.listdir(app.config["UPLOAD_FOLDER"]) == []
+
+
+def test_valid_image_is_stored(app, client):
+    response = _post_report(client, _png_bytes(), "foto.png")
+
+    assert response.status_code == 302
+    with app.app_context():
+        report = Report.query.one()
+        assert report.image_url in os.listdir(app.config["UPLOAD_FOLDER"])
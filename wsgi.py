@@ -0,0 +1,12 @@
+import logging
+from app import create_app
+
+# Entry point produksi: gunicorn -c gunicorn.conf.py wsgi:app
+app = create_app()
+
+# Di gunicorn, log aplikasi lewat handler gunicorn supaya INFO (startup, warm-up) ikut tercetak
+gunicorn_logger = logging.getLogger("gunicorn.error")
+if gunicorn_logger.handlers:
+    app.logger.handlers = gunicorn_logger.handlers
+    app.logger.setLevel(gunicorn_logger.level)
+    app.logger.info("Startup: %s", app.extensions["startup"].summary())